@@ -0,0 +1,158 @@
+import asyncio
+import heapq
+import itertools
+import json
+import re
+from typing import List, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.metrics import metrics
+
+# Lower value = admitted first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+# Driver status updates keep deliveries moving and must win under load
+HIGH_PRIORITY_ROUTES = [
+    ("PUT", re.compile(r"^/api/deliveries/\d+/status$")),
+    ("POST", re.compile(r"^/api/tracking/ping$")),
+    ("POST", re.compile(r"^/api/tracking/drivers/\d+/stops/\d+/complete$")),
+]
+LOW_PRIORITY_PREFIXES = ("/api/analytics", "/api/deliveries/export")
+# Long-lived or trivial routes that never hold a slot
+EXEMPT_PATHS = ("/health", "/metrics")
+EXEMPT_SUFFIXES = ("/stream",)
+
+admitted_total = metrics.counter("http_admitted_total", "Requests admitted by admission control")
+shed_total = metrics.counter("http_shed_total", "Requests rejected by admission control")
+in_flight_gauge = metrics.gauge("http_in_flight_requests", "Requests currently being processed")
+queue_depth_gauge = metrics.gauge("http_queued_requests", "Requests waiting for a processing slot")
+
+def request_priority(method: str, path: str) -> Optional[int]:
+    """Priority for a request, or None if it bypasses admission control."""
+    if path in EXEMPT_PATHS or path.endswith(EXEMPT_SUFFIXES):
+        return None
+    for route_method, pattern in HIGH_PRIORITY_ROUTES:
+        if method == route_method and pattern.match(path):
+            return PRIORITY_HIGH
+    if path.startswith(LOW_PRIORITY_PREFIXES):
+        return PRIORITY_LOW
+    return PRIORITY_NORMAL
+
+class AdmissionController:
+    """Bounded in-flight slots with a bounded priority wait queue.
+
+    Runs on the event loop thread only. A released slot is handed directly
+    to the most important waiter. When the queue is full, a newcomer evicts
+    the least important waiter if it outranks it, otherwise it is shed.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def _update_gauges(self):
+        in_flight_gauge.set(self.in_flight)
+        queue_depth_gauge.set(len(self._waiters))
+
+    async def acquire(self, priority: int) -> Optional[str]:
+        """Wait for a slot. Returns None when admitted, else the shed reason."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._update_gauges()
+            return None
+
+        if len(self._waiters) >= self.max_queue:
+            worst = max(self._waiters)
+            if worst[0] <= priority:
+                return "queue_full"
+            self._waiters.remove(worst)
+            heapq.heapify(self._waiters)
+            worst[2].set_result(False)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        self._update_gauges()
+        try:
+            admitted = await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                admitted = future.result()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                future.cancel()
+                self._update_gauges()
+                return "timeout"
+        except asyncio.CancelledError:
+            # Client went away while queued; pass on a slot we may have received
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                future.cancel()
+            self._update_gauges()
+            raise
+        return None if admitted else "evicted"
+
+    def release(self):
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+class AdmissionControlMiddleware:
+    """Per-worker concurrency limit with prioritised queueing and fast 503s."""
+
+    def __init__(self, app: ASGIApp, max_in_flight: int = 64, max_queue: int = 256,
+                 queue_timeout: float = 2.0, retry_after: int = 2):
+        self.app = app
+        self.controller = AdmissionController(max_in_flight, max_queue, queue_timeout)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = request_priority(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        priority_name = PRIORITY_NAMES[priority]
+        reason = await self.controller.acquire(priority)
+        if reason is not None:
+            shed_total.inc(priority=priority_name, reason=reason)
+            await self._reject(send)
+            return
+
+        admitted_total.inc(priority=priority_name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    async def _reject(self, send: Send):
+        body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(self.retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
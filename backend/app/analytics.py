@@ -0,0 +1,318 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Column, Integer, MetaData, Numeric, String, Table, cast, delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+from app import archive
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Delivery, DeliveryRollup, DeliveryStatus
+
+ALL_PERIOD = "all"
+
+# Rollup key: (period, scope, scope_id, status)
+RollupKey = Tuple[str, str, int, DeliveryStatus]
+
+# What a delivery contributes to the rollups: (day, store_id, driver_id, status, amount)
+DeliveryFacts = Tuple[str, int, Optional[int], DeliveryStatus, Decimal]
+
+def _day(value: Optional[datetime]) -> str:
+    return (value or datetime.utcnow()).date().isoformat()
+
+def capture(delivery: Delivery) -> DeliveryFacts:
+    """Snapshot the rollup-relevant fields of a delivery before mutating it."""
+    return (
+        _day(delivery.created_at),
+        delivery.store_id,
+        delivery.driver_id,
+        delivery.status,
+        Decimal(delivery.total_amount or 0),
+    )
+
+def _keys(facts: DeliveryFacts) -> Iterable[RollupKey]:
+    day, store_id, driver_id, status, _ = facts
+    for period in (day, ALL_PERIOD):
+        yield (period, "all", 0, status)
+        yield (period, "store", store_id, status)
+        if driver_id is not None:
+            yield (period, "driver", driver_id, status)
+
+def apply_delivery_change(db: Session, before: Optional[DeliveryFacts], delivery: Delivery):
+    """Fold a created or updated delivery into the rollup tables.
+
+    ``before`` is the result of :func:`capture` taken prior to the change, or
+    None for a new delivery. Runs in the caller's transaction so rollups
+    commit atomically with the delivery itself.
+    """
+    deltas: Dict[RollupKey, list] = defaultdict(lambda: [0, Decimal(0)])
+    if before is not None:
+        for key in _keys(before):
+            deltas[key][0] -= 1
+            deltas[key][1] -= before[4]
+    after = capture(delivery)
+    for key in _keys(after):
+        deltas[key][0] += 1
+        deltas[key][1] += after[4]
+
+    rows = [
+        {
+            "period": period,
+            "scope": scope,
+            "scope_id": scope_id,
+            "status": status,
+            "delivery_count": count,
+            "revenue": revenue,
+        }
+        for (period, scope, scope_id, status), (count, revenue) in deltas.items()
+        if count or revenue
+    ]
+    if rows:
+        _upsert(db, rows)
+        db.info["rollups_changed"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_summaries(session):
+    # Clearing before commit would let a reader cache the old totals again
+    if session.info.pop("rollups_changed", False):
+        summary_cache.invalidate()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_rollup_changes(session):
+    session.info.pop("rollups_changed", None)
+
+def _upsert(db: Session, rows: list):
+    """Add count/revenue deltas to existing rollup rows, creating missing ones."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(DeliveryRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["period", "scope", "scope_id", "status"],
+            set_={
+                "delivery_count": DeliveryRollup.delivery_count + stmt.excluded.delivery_count,
+                "revenue": DeliveryRollup.revenue + stmt.excluded.revenue,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    for row in rows:
+        existing = db.query(DeliveryRollup).filter(
+            DeliveryRollup.period == row["period"],
+            DeliveryRollup.scope == row["scope"],
+            DeliveryRollup.scope_id == row["scope_id"],
+            DeliveryRollup.status == row["status"],
+        ).with_for_update().first()
+        if existing is None:
+            db.add(DeliveryRollup(**row))
+        else:
+            existing.delivery_count += row["delivery_count"]
+            existing.revenue += row["revenue"]
+
+# Rebuilt rollups are written here first, then swapped into delivery_rollups
+_scratch = Table(
+    "delivery_rollups_rebuild", MetaData(),
+    Column("period", String(10), nullable=False),
+    Column("scope", String(10), nullable=False),
+    Column("scope_id", Integer, nullable=False),
+    # Member name, cast back to the rollup table's enum type on the way in
+    Column("status", String(20), nullable=False),
+    Column("delivery_count", Integer, nullable=False),
+    Column("revenue", Numeric(12, 2), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+ROLLUP_FIELDS = ["period", "scope", "scope_id", "status", "delivery_count", "revenue"]
+ARCHIVE_CHECK_BATCH = 1000
+
+def _fold(totals: Dict[RollupKey, list], facts: DeliveryFacts, count: int = 1):
+    """Add ``count`` deliveries with ``facts`` (revenue summed over all of them) to ``totals``."""
+    for key in _keys(facts):
+        totals[key][0] += count
+        totals[key][1] += facts[4]
+
+def _archived_facts(row: dict) -> DeliveryFacts:
+    return (
+        row["created_at"][:10],
+        row["store_id"],
+        row["driver_id"],
+        DeliveryStatus(row["status"]),
+        Decimal(row["total_amount"] or 0),
+    )
+
+def _live_ids(db: Session, ids: Iterable[int]) -> set:
+    return {delivery_id for (delivery_id,) in db.query(Delivery.id).filter(Delivery.id.in_(list(ids)))}
+
+def _fold_archive(db: Session, totals: Dict[RollupKey, list], directory: Optional[str]) -> Dict[int, DeliveryFacts]:
+    """Add archived deliveries to ``totals``.
+
+    Rows still in the live table (an archival run that failed before
+    deleting them) are left to the live query and returned instead, so the
+    caller can fold any that get deleted before it reads the live rows.
+    """
+    still_live: Dict[int, DeliveryFacts] = {}
+    batch: List[dict] = []
+
+    def flush():
+        live = _live_ids(db, (row["id"] for row in batch))
+        for row in batch:
+            if row["id"] in live:
+                still_live[row["id"]] = _archived_facts(row)
+            else:
+                _fold(totals, _archived_facts(row))
+        batch.clear()
+
+    for row in archive.iter_archived_rows(directory=directory):
+        batch.append(row)
+        if len(batch) >= ARCHIVE_CHECK_BATCH:
+            flush()
+    if batch:
+        flush()
+    return still_live
+
+def _lock_rollups(db: Session):
+    """Hold off rollup writers (not readers) until the rebuild commits."""
+    conn = db.connection()
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"LOCK TABLE {DeliveryRollup.__tablename__} IN EXCLUSIVE MODE"))
+    elif conn.dialect.name == "sqlite" and not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def rebuild_rollups(db: Session, archive_dir: Optional[str] = None) -> int:
+    """Recompute every rollup row from live and archived deliveries.
+
+    Compaction job for repairing drift (e.g. after bulk imports that bypass
+    :func:`apply_delivery_change`). Archived orders are read back from the
+    archive files first, without blocking anyone. The live table is then
+    aggregated with rollup writes locked out, so no concurrent
+    :func:`apply_delivery_change` delta is lost or counted twice; those
+    writers wait for the swap and dashboards keep reading the old rows
+    until it commits. Returns the number of rollup rows written.
+    """
+    totals: Dict[RollupKey, list] = defaultdict(lambda: [0, Decimal(0)])
+    still_live = _fold_archive(db, totals, archive_dir)
+    db.commit()
+
+    _lock_rollups(db)
+    if still_live:
+        live = set()
+        ids = list(still_live)
+        for start in range(0, len(ids), ARCHIVE_CHECK_BATCH):
+            live |= _live_ids(db, ids[start:start + ARCHIVE_CHECK_BATCH])
+        for delivery_id, facts in still_live.items():
+            if delivery_id not in live:
+                _fold(totals, facts)
+
+    day = func.date(Delivery.created_at)
+    query = db.query(
+        day, Delivery.store_id, Delivery.driver_id, Delivery.status,
+        func.count(Delivery.id), func.coalesce(func.sum(Delivery.total_amount), 0),
+    ).group_by(day, Delivery.store_id, Delivery.driver_id, Delivery.status)
+
+    for row_day, store_id, driver_id, status, count, revenue in query:
+        _fold(totals, (str(row_day), store_id, driver_id, status, Decimal(revenue)), count)
+
+    conn = db.connection()
+    _scratch.create(conn)
+    if totals:
+        conn.execute(_scratch.insert(), [
+            dict(zip(ROLLUP_FIELDS, (period, scope, scope_id, status.name, count, revenue)))
+            for (period, scope, scope_id, status), (count, revenue) in totals.items()
+        ])
+    conn.execute(delete(DeliveryRollup))
+    columns = [_scratch.c[field] for field in ROLLUP_FIELDS]
+    columns[ROLLUP_FIELDS.index("status")] = cast(_scratch.c.status, DeliveryRollup.__table__.c.status.type)
+    conn.execute(insert(DeliveryRollup).from_select(ROLLUP_FIELDS, select(*columns)))
+    _scratch.drop(conn)
+    db.commit()
+    summary_cache.invalidate()
+    return len(totals)
+
+class SummaryCache:
+    """Short-lived per-caller cache of summary payloads.
+
+    Entries expire after ``ANALYTICS_CACHE_SECONDS`` and are dropped as soon
+    as this process writes a rollup change.
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, Tuple[float, dict]] = {}
+
+    def get(self, key: tuple) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: tuple, value: dict):
+        self._entries[key] = (time.monotonic() + settings.ANALYTICS_CACHE_SECONDS, value)
+
+    def invalidate(self):
+        self._entries.clear()
+
+summary_cache = SummaryCache()
+
+def _breakdown(rows) -> Dict[int, dict]:
+    """Fold (scope_id, status, count, revenue) rows into per-scope summaries."""
+    result: Dict[int, dict] = {}
+    for scope_id, status, count, revenue in rows:
+        entry = result.setdefault(scope_id, {
+            "scope_id": scope_id,
+            "total": 0,
+            "revenue": 0.0,
+            "by_status": {s.value: 0 for s in DeliveryStatus},
+        })
+        entry["total"] += count
+        entry["by_status"][status.value] += count
+        if status == DeliveryStatus.DELIVERED:
+            entry["revenue"] += float(revenue)
+    return result
+
+def _empty_breakdown(scope_id: int = 0) -> dict:
+    return {"scope_id": scope_id, "total": 0, "revenue": 0.0, "by_status": {s.value: 0 for s in DeliveryStatus}}
+
+def build_summary(db: Session, scope: str, scope_ids: Optional[list] = None) -> dict:
+    """Assemble the dashboard summary from rollup rows only.
+
+    ``scope`` is "all" for a global view, otherwise "store" or "driver"
+    restricted to ``scope_ids``. Reads touch only the "all" and today
+    periods, so cost is independent of delivery history length.
+    """
+    today = datetime.utcnow().date().isoformat()
+    columns = (DeliveryRollup.scope_id, DeliveryRollup.status, DeliveryRollup.delivery_count, DeliveryRollup.revenue)
+
+    def rows_for(period: str, row_scope: str, ids: Optional[list]):
+        query = db.query(*columns).filter(DeliveryRollup.period == period, DeliveryRollup.scope == row_scope)
+        if ids is not None:
+            query = query.filter(DeliveryRollup.scope_id.in_(ids))
+        return query.all()
+
+    def combined(period: str) -> dict:
+        if scope == "all":
+            return _breakdown(rows_for(period, "all", None)).get(0, _empty_breakdown())
+        total = _empty_breakdown()
+        for entry in _breakdown(rows_for(period, scope, scope_ids)).values():
+            total["total"] += entry["total"]
+            total["revenue"] += entry["revenue"]
+            for key, value in entry["by_status"].items():
+                total["by_status"][key] += value
+        return total
+
+    stores = _breakdown(rows_for(ALL_PERIOD, "store", scope_ids if scope == "store" else None)) \
+        if scope in ("all", "store") else {}
+    drivers = _breakdown(rows_for(ALL_PERIOD, "driver", scope_ids if scope == "driver" else None)) \
+        if scope in ("all", "driver") else {}
+
+    return {
+        "generated_at": datetime.utcnow(),
+        "overall": combined(ALL_PERIOD),
+        "today": combined(today),
+        "active_stores": sum(1 for entry in stores.values() if entry["total"]),
+        "active_drivers": sum(1 for entry in drivers.values() if entry["total"]),
+        "stores": sorted(stores.values(), key=lambda entry: entry["scope_id"]),
+        "drivers": sorted(drivers.values(), key=lambda entry: entry["scope_id"]),
+    }
@@ -0,0 +1,171 @@
+import gzip
+import heapq
+import io
+import json
+import os
+import re
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.export import EXPORT_COLUMNS, EXPORT_FIELDS, _plain
+from app.models import Delivery, DeliveryStatus
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Settled orders older than ARCHIVE_AFTER_DAYS move out of the live table
+# into one compressed NDJSON file per month and archival run:
+#   deliveries-2026-01-20261018T031500.ndjson.zst   (.ndjson.gz without zstandard)
+# Rows in each file are ordered by (created_at, id) so exports can merge
+# archived and live rows in a single pass.
+
+ARCHIVED_STATUSES = (DeliveryStatus.DELIVERED, DeliveryStatus.CANCELLED)
+ARCHIVE_COLUMNS = EXPORT_COLUMNS + (Delivery.store_owner_id,)
+ARCHIVE_FIELDS = [column.key for column in ARCHIVE_COLUMNS]
+FILE_PATTERN = re.compile(r"^deliveries-(\d{4})-(\d{2})-\w+\.ndjson\.(zst|gz)$")
+DELETE_BATCH_SIZE = 1000
+
+def _extension() -> str:
+    return "zst" if zstandard is not None else "gz"
+
+def _open_for_read(path: str):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+                                encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+class _MonthWriter:
+    """A compressed NDJSON file written under a temporary name."""
+
+    def __init__(self, directory: str, month: date, run_id: str):
+        self.path = os.path.join(directory, f"deliveries-{month:%Y-%m}-{run_id}.ndjson.{_extension()}")
+        self.partial_path = self.path + ".partial"
+        self._raw = open(self.partial_path, "wb")
+        if zstandard is not None:
+            self._stream = zstandard.ZstdCompressor(level=10).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+
+    def write(self, row: dict):
+        self._stream.write((json.dumps(row, separators=(",", ":")) + "\n").encode("utf-8"))
+
+    def publish(self):
+        """Close, flush to disk and move the file to its final name."""
+        self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self.partial_path, self.path)
+
+def archive_deliveries(db: Session, older_than_days: Optional[int] = None, directory: Optional[str] = None) -> int:
+    """Move settled deliveries older than the cutoff into archive files.
+
+    Files are published before the rows are deleted, so a failure can leave
+    a row both archived and live but never lose it; readers drop such
+    duplicates. Analytics rollups are left as they are, so dashboards keep
+    counting archived orders (a full rollup rebuild reads them back from
+    these files).
+    Returns the number of archived deliveries.
+    """
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    directory = directory or settings.ARCHIVE_DIR
+    os.makedirs(directory, exist_ok=True)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+
+    def settled():
+        return db.query(Delivery).filter(
+            Delivery.status.in_(ARCHIVED_STATUSES),
+            Delivery.created_at < cutoff
+        )
+
+    writers: Dict[date, _MonthWriter] = {}
+    ids = array("q")
+    rows = settled().order_by(Delivery.created_at, Delivery.id).with_entities(*ARCHIVE_COLUMNS)
+    for row in rows.yield_per(5000):
+        record = dict(zip(ARCHIVE_FIELDS, row))
+        month = date(record["created_at"].year, record["created_at"].month, 1)
+        writer = writers.get(month)
+        if writer is None:
+            writer = writers[month] = _MonthWriter(directory, month, run_id)
+        writer.write({field: _plain(value) for field, value in record.items()})
+        ids.append(record["id"])
+
+    for writer in writers.values():
+        writer.publish()
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        settled().filter(Delivery.id.in_(ids[start:start + DELETE_BATCH_SIZE].tolist())).delete(
+            synchronize_session=False
+        )
+    db.commit()
+    return len(ids)
+
+def archive_files(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  directory: Optional[str] = None) -> List[str]:
+    """Archive files whose month overlaps ``[start, end)``."""
+    directory = directory or settings.ARCHIVE_DIR
+    if not os.path.isdir(directory):
+        return []
+    first = date(start.year, start.month, 1) if start is not None else None
+    files = []
+    for name in sorted(os.listdir(directory)):
+        match = FILE_PATTERN.match(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if first is not None and month < first:
+            continue
+        if end is not None and month > end.date():
+            continue
+        files.append(os.path.join(directory, name))
+    return files
+
+def _read_file(path: str) -> Iterator[dict]:
+    with _open_for_read(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _sort_key(row: dict):
+    return row["created_at"] or "", row["id"]
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def iter_archived_rows(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       store_owner_id: Optional[int] = None, driver_id: Optional[int] = None,
+                       store_id: Optional[int] = None, directory: Optional[str] = None) -> Iterator[dict]:
+    """Archived deliveries in export row format, ordered by (created_at, id)."""
+    start_utc = _as_utc(start) if start is not None else None
+    end_utc = _as_utc(end) if end is not None else None
+    streams = [_read_file(path) for path in archive_files(start, end, directory)]
+    for row in heapq.merge(*streams, key=_sort_key):
+        if store_owner_id is not None and row.get("store_owner_id") != store_owner_id:
+            continue
+        if driver_id is not None and row.get("driver_id") != driver_id:
+            continue
+        if store_id is not None and row.get("store_id") != store_id:
+            continue
+        if start_utc is not None or end_utc is not None:
+            created_at = _as_utc(datetime.fromisoformat(row["created_at"]))
+            if start_utc is not None and created_at < start_utc:
+                continue
+            if end_utc is not None and created_at >= end_utc:
+                continue
+        yield {field: row.get(field) for field in EXPORT_FIELDS}
+
+def merge_with_archive(live_rows: Iterable[dict], archived_rows: Iterable[dict]) -> Iterator[dict]:
+    """Merge two (created_at, id)-ordered row streams, dropping duplicates."""
+    previous = None
+    for row in heapq.merge(archived_rows, live_rows, key=_sort_key):
+        key = _sort_key(row)
+        if key == previous:
+            continue
+        previous = key
+        yield row
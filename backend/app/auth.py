@@ -1,14 +1,17 @@
+import secrets
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import User
+from app.models import User, UserRole, RefreshToken
 from app.schemas import TokenData
 from app.config import settings
+from app.security import SecurityUtils
+from app.revocation import revocation_store
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -35,34 +38,172 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+class CurrentUser:
+    """Authenticated caller built from access token claims, without a DB lookup.
+    
+    Exposes the subset of ``User`` attributes routes use for authorization.
+    Routes that need other columns load the row explicitly.
+    """
+    __slots__ = ("id", "username", "role", "token_version", "is_active", "token_id", "token_expires_at")
+    
+    def __init__(self, id: int, username: str, role: UserRole, token_version: int = 0,
+                 token_id: Optional[str] = None, token_expires_at: Optional[datetime] = None):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.token_version = token_version
+        self.token_id = token_id
+        self.token_expires_at = token_expires_at
+        # Only active users are issued tokens; deactivate_user() revokes the
+        # user's outstanding access tokens, which get_current_user rejects
+        self.is_active = True
+    
+    def __repr__(self):
+        return f"<CurrentUser(username='{self.username}', role='{self.role}')>"
+
 def verify_token(token: str, credentials_exception):
-    """Verify and decode a JWT token."""
+    """Verify and decode a JWT access token."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("type") != "access" or payload.get("uid") is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        token_data = TokenData(
+            username=username,
+            user_id=payload["uid"],
+            role=payload.get("role"),
+            token_version=payload.get("ver", 0),
+            jti=payload.get("jti"),
+            expires_at=datetime.utcfromtimestamp(payload["exp"])
+        )
+    except (JWTError, ValueError):
         raise credentials_exception
     return token_data
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get the current authenticated user."""
+def token_version_key(user_id: int, token_version: int) -> str:
+    """Revocation id covering every access token issued to a user at ``token_version``."""
+    return f"user:{user_id}:v{token_version}"
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """Get the current authenticated user from token claims alone."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     token_data = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
+    if token_data.role is None or token_data.jti is None:
+        raise credentials_exception
+    if revocation_store.is_revoked(token_data.jti):
+        raise credentials_exception
+    if revocation_store.is_revoked(token_version_key(token_data.user_id, token_data.token_version)):
         raise credentials_exception
-    return user
+    return CurrentUser(
+        token_data.user_id,
+        token_data.username,
+        token_data.role,
+        token_data.token_version,
+        token_data.jti,
+        token_data.expires_at
+    )
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Get the current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def _create_refresh_token(db: Session, user: User, family_id: Optional[str]) -> Tuple[str, str]:
+    """Persist a refresh token row and return ``(token, jti)``."""
+    jti = secrets.token_urlsafe(24)
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(
+        jti=jti,
+        family_id=family_id or jti,
+        user_id=user.id,
+        expires_at=expires_at
+    ))
+    token = SecurityUtils.create_refresh_token(
+        data={"sub": user.username, "uid": user.id, "ver": user.token_version or 0},
+        jti=jti,
+        expires_at=expires_at
+    )
+    return token, jti
+
+def issue_token_pair(db: Session, user: User, family_id: Optional[str] = None) -> dict:
+    """Create an access token and a persisted refresh token for ``user``.
+    
+    The caller commits. ``family_id`` links rotated refresh tokens so reuse of
+    an already-rotated token can revoke the whole chain.
+    """
+    refresh_token, _ = _create_refresh_token(db, user, family_id)
+    return _token_response(user, refresh_token)
+
+def _token_response(user: User, refresh_token: str) -> dict:
+    return {
+        "access_token": SecurityUtils.create_user_access_token(user),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "user": user
+    }
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[Optional[dict], str]:
+    """Exchange a refresh token for a new token pair.
+    
+    Returns ``(tokens, "")`` on success or ``(None, reason)``. Presenting a
+    token that was already rotated revokes its whole family, since either
+    the legitimate client or an attacker holds a stolen copy.
+    """
+    payload = SecurityUtils.verify_token(token)
+    if not payload or payload.get("type") != "refresh" or not payload.get("jti"):
+        return None, "invalid"
+    
+    stored = db.query(RefreshToken).filter(RefreshToken.jti == payload["jti"]).with_for_update().first()
+    if stored is None:
+        return None, "unknown"
+    
+    now = datetime.utcnow()
+    if stored.revoked_at is not None:
+        db.query(RefreshToken).filter(
+            RefreshToken.family_id == stored.family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+        db.commit()
+        return None, "reused"
+    
+    user = db.query(User).filter(User.id == stored.user_id).first()
+    if user is None or not user.is_active or (user.token_version or 0) != payload.get("ver", 0):
+        stored.revoked_at = now
+        db.commit()
+        return None, "revoked"
+    
+    refresh_token, jti = _create_refresh_token(db, user, stored.family_id)
+    tokens = _token_response(user, refresh_token)
+    stored.revoked_at = now
+    stored.replaced_by = jti
+    db.commit()
+    return tokens, ""
+
+def revoke_user_tokens(db: Session, user: User):
+    """Invalidate every outstanding refresh and access token for ``user``. Caller commits.
+
+    Access tokens are not tracked individually, so the user's current token
+    version is revoked for one access token lifetime instead.
+    """
+    version = user.token_version or 0
+    user.token_version = version + 1
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user.id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    revocation_store.revoke(
+        token_version_key(user.id, version),
+        datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        db
+    )
+
+def deactivate_user(db: Session, user: User):
+    """Deactivate ``user`` and revoke their refresh and access tokens. Caller commits."""
+    user.is_active = False
+    revoke_user_tokens(db, user)
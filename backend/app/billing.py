@@ -0,0 +1,171 @@
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Optional, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.analytics import ALL_PERIOD
+from app.config import settings
+from app.models import DeliveryRollup, DeliveryStatus, Invoice, InvoiceStatus, Store
+from app.partitioning import add_months
+
+# Store bills are computed from the per-day store rollups, not from the
+# deliveries table: one grouped query over (days x stores) rollup rows
+# prices a month for every store, and rollups keep counting orders after
+# archival has moved them out of deliveries. A rollup rebuild gets those
+# orders back from the archive files, so ARCHIVE_DIR must be kept for as
+# long as periods with pending invoices may be billed again; paid invoices
+# are never recomputed.
+
+CENTS = Decimal("0.01")
+UPSERT_BATCH_SIZE = 500
+
+# (store_id, store_owner_id, delivered orders, order revenue)
+StoreTotals = Tuple[int, int, int, Decimal]
+
+class OverlappingPeriod(ValueError):
+    """Some store already has an invoice for part of the requested period."""
+
+def month_bounds(month: date) -> Tuple[date, date]:
+    start = date(month.year, month.month, 1)
+    return start, add_months(start, 1)
+
+def store_totals(db: Session, start: date, end: date, store_ids: Optional[List[int]] = None) -> List[StoreTotals]:
+    """Delivered order count and revenue per store for orders created in [start, end)."""
+    query = db.query(
+        DeliveryRollup.scope_id,
+        Store.owner_id,
+        func.sum(DeliveryRollup.delivery_count),
+        func.coalesce(func.sum(DeliveryRollup.revenue), 0),
+    ).join(Store, Store.id == DeliveryRollup.scope_id).filter(
+        DeliveryRollup.scope == "store",
+        DeliveryRollup.status == DeliveryStatus.DELIVERED,
+        DeliveryRollup.period != ALL_PERIOD,
+        DeliveryRollup.period >= start.isoformat(),
+        DeliveryRollup.period < end.isoformat(),
+    )
+    if store_ids is not None:
+        query = query.filter(DeliveryRollup.scope_id.in_(store_ids))
+    rows = query.group_by(DeliveryRollup.scope_id, Store.owner_id).all()
+    return [(store_id, owner_id, int(count), Decimal(revenue)) for store_id, owner_id, count, revenue in rows if count]
+
+def overlapping_invoices(db: Session, start: date, end: date, store_ids: Optional[List[int]] = None) -> int:
+    """Invoices covering part of [start, end) with different bounds, which a run would bill twice."""
+    query = db.query(func.count(Invoice.id)).filter(
+        Invoice.period_start < end,
+        Invoice.period_end > start,
+        or_(Invoice.period_start != start, Invoice.period_end != end),
+    )
+    if store_ids is not None:
+        query = query.filter(Invoice.store_id.in_(store_ids))
+    return query.scalar()
+
+def _lock_stores(db: Session, store_ids: Optional[List[int]] = None):
+    """Serialise billing runs over the same stores until the caller commits.
+
+    Without this two runs with overlapping periods could both pass the
+    overlap check and bill the same orders twice.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite":
+        # Row locks do not exist; take the database write lock up front
+        if not conn.connection.driver_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        return
+    query = db.query(Store.id)
+    if store_ids is not None:
+        query = query.filter(Store.id.in_(store_ids))
+    query.order_by(Store.id).with_for_update().all()
+
+def invoice_amount(order_count: int, rate_per_order: Decimal) -> Decimal:
+    return (Decimal(order_count) * rate_per_order).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def generate_invoices(db: Session, start: date, end: date, rate_per_order: Optional[float] = None,
+                      store_ids: Optional[List[int]] = None) -> int:
+    """Create or refresh every store's invoice for [start, end) and commit.
+
+    Pending invoices for the same store and period are recomputed in place,
+    and removed when the store no longer has delivered orders in it; paid
+    invoices are never changed. Raises OverlappingPeriod when a store
+    already has an invoice for part of the period with different bounds.
+    Returns the number of stores billed.
+    """
+    _lock_stores(db, store_ids)
+    overlapping = overlapping_invoices(db, start, end, store_ids)
+    if overlapping:
+        raise OverlappingPeriod(
+            f"{overlapping} invoice(s) already cover part of {start.isoformat()} to {end.isoformat()}"
+        )
+    rate = Decimal(str(settings.BILLING_RATE_PER_ORDER if rate_per_order is None else rate_per_order)).quantize(CENTS)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "store_id": store_id,
+            "store_owner_id": owner_id,
+            "period_start": start,
+            "period_end": end,
+            "order_count": count,
+            "order_revenue": revenue.quantize(CENTS),
+            "rate_per_order": rate,
+            "amount": invoice_amount(count, rate),
+            "status": InvoiceStatus.PENDING,
+            "generated_at": now,
+        }
+        for store_id, owner_id, count, revenue in store_totals(db, start, end, store_ids)
+    ]
+    for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+        _upsert(db, rows[offset:offset + UPSERT_BATCH_SIZE])
+    # Pending invoices this run did not refresh belong to stores with no
+    # delivered orders left in the period
+    stale = db.query(Invoice).filter(
+        Invoice.period_start == start,
+        Invoice.period_end == end,
+        Invoice.status == InvoiceStatus.PENDING,
+        Invoice.generated_at < now,
+    )
+    if store_ids is not None:
+        stale = stale.filter(Invoice.store_id.in_(store_ids))
+    stale.delete(synchronize_session=False)
+    db.commit()
+    return len(rows)
+
+def _upsert(db: Session, rows: list):
+    """Insert invoices, overwriting pending ones for the same store and period."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(Invoice).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["store_id", "period_start", "period_end"],
+            set_={
+                "store_owner_id": stmt.excluded.store_owner_id,
+                "order_count": stmt.excluded.order_count,
+                "order_revenue": stmt.excluded.order_revenue,
+                "rate_per_order": stmt.excluded.rate_per_order,
+                "amount": stmt.excluded.amount,
+                "generated_at": stmt.excluded.generated_at,
+            },
+            where=Invoice.status != InvoiceStatus.PAID,
+        )
+        db.execute(stmt)
+        return
+
+    existing = {
+        invoice.store_id: invoice
+        for invoice in db.query(Invoice).filter(
+            Invoice.store_id.in_([row["store_id"] for row in rows]),
+            Invoice.period_start == rows[0]["period_start"],
+            Invoice.period_end == rows[0]["period_end"],
+        ).with_for_update()
+    }
+    for row in rows:
+        invoice = existing.get(row["store_id"])
+        if invoice is None:
+            db.add(Invoice(**row))
+        elif invoice.status != InvoiceStatus.PAID:
+            for key in ("store_owner_id", "order_count", "order_revenue", "rate_per_order", "amount", "generated_at"):
+                setattr(invoice, key, row[key])
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import schemas
+from app.auth import CurrentUser
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Store, StockItem, User, UserRole
+
+# Everything a dashboard needs at startup in one response. Each part is
+# loaded on its own session and pooled connection in the threadpool, so the
+# queries run concurrently and the response takes about as long as the
+# slowest one. Stores, drivers and the user row change rarely and are served
+# from a short-lived per-process cache; stock and orders are always fresh.
+
+class BootstrapCache:
+    """Static bootstrap parts per key, expiring after BOOTSTRAP_CACHE_SECONDS.
+
+    Cleared whenever this process creates a store or user.
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, Tuple[float, Any]] = {}
+
+    def get(self, key: tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: tuple, value: Any):
+        self._entries[key] = (time.monotonic() + settings.BOOTSTRAP_CACHE_SECONDS, value)
+
+    def invalidate(self):
+        self._entries.clear()
+
+bootstrap_cache = BootstrapCache()
+
+def load_user(db: Session, user: CurrentUser) -> schemas.User:
+    return schemas.User.model_validate(db.query(User).filter(User.id == user.id).one())
+
+def load_stores(db: Session, user: CurrentUser) -> List[schemas.Store]:
+    if user.role.value == "driver":
+        return []
+    query = db.query(Store)
+    if user.role.value == "store_owner":
+        query = query.filter(Store.owner_id == user.id)
+    return [schemas.Store.model_validate(store) for store in query.order_by(Store.id)]
+
+def load_drivers(db: Session, user: CurrentUser) -> List[schemas.DriverSummary]:
+    if user.role.value == "driver":
+        return []
+    drivers = db.query(User.id, User.username).filter(
+        User.role == UserRole.DRIVER, User.is_active.is_(True)
+    ).order_by(User.username)
+    return [schemas.DriverSummary.model_validate(driver) for driver in drivers]
+
+def load_stock(db: Session, user: CurrentUser) -> List[schemas.StockItem]:
+    if user.role.value == "driver":
+        return []
+    query = db.query(StockItem)
+    if user.role.value == "store_owner":
+        query = query.filter(StockItem.store_id.in_(
+            db.query(Store.id).filter(Store.owner_id == user.id).scalar_subquery()
+        ))
+    return [schemas.StockItem.model_validate(item) for item in query.order_by(StockItem.store_id, StockItem.name)]
+
+# Parts cached per (part, role, user); drivers are the same for every caller
+CACHED_PARTS = {
+    "user": (load_user, False),
+    "stores": (load_stores, False),
+    "drivers": (load_drivers, True),
+}
+
+def _run(engine: Engine, loader: Callable, user: CurrentUser):
+    with SessionLocal(bind=engine) as db:
+        return loader(db, user)
+
+async def gather_parts(engine: Engine, user: CurrentUser, loaders: Dict[str, Callable]) -> Dict[str, Any]:
+    """Load every part concurrently, taking cacheable ones from the cache when fresh."""
+    parts: Dict[str, Any] = {}
+    pending: Dict[str, Callable] = dict(loaders)
+    keys: Dict[str, tuple] = {}
+    for name, (loader, shared) in CACHED_PARTS.items():
+        keys[name] = (name, user.role.value) if shared else (name, user.role.value, user.id)
+        cached = bootstrap_cache.get(keys[name])
+        if cached is not None:
+            parts[name] = cached
+        else:
+            pending[name] = loader
+
+    names = list(pending)
+    results = await asyncio.gather(*(run_in_threadpool(_run, engine, pending[name], user) for name in names))
+    for name, result in zip(names, results):
+        parts[name] = result
+        if name in keys:
+            bootstrap_cache.set(keys[name], result)
+    return parts
@@ -0,0 +1,146 @@
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional dependency: fall back to gzip only
+    brotli = None
+
+# Content types that are already compressed or must not be buffered
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/gzip",
+    "application/zip",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return ""
+
+class _Compressor:
+    """Uniform incremental interface over brotli and gzip compressors."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            impl = brotli.Compressor(quality=brotli_quality)
+            self.compress = impl.process
+            self.finish = impl.finish
+        else:
+            impl = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.compress = impl.compress
+            self.finish = impl.flush
+
+class CompressionMiddleware:
+    """Brotli/gzip response compression with a minimum size threshold.
+
+    Buffered responses smaller than ``minimum_size`` are sent as-is;
+    streaming responses are compressed chunk by chunk. Responses that
+    already carry a Content-Encoding, or whose content type is excluded,
+    pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        compressor = None
+        passthrough = False
+        pending: list = []
+        pending_size = [0]
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+                )
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                if start_message:
+                    await send(start_message)
+                    start_message = {}
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                # Buffer leading chunks until the threshold is reached so that
+                # small bodies re-chunked by inner middleware stay uncompressed
+                pending.append(body)
+                pending_size[0] += len(body)
+                if more_body and pending_size[0] < self.minimum_size:
+                    return
+                body = b"".join(pending)
+                pending.clear()
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = {}
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers and not headers["etag"].startswith("W/"):
+                    headers["ETag"] = "W/" + headers["etag"]
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    start_message = {}
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(start_message)
+                start_message = {}
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -6,12 +6,19 @@ from typing import Optional, List
 class Settings(BaseSettings):
     # Database - Supabase PostgreSQL
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./delivery_app.db")
+    # Comma-separated read replica URLs; reads go to the primary when empty
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    # Users read from the primary for this long after their own writes
+    READ_YOUR_WRITES_SECONDS: float = 5.0
     
     # JWT Settings - Enhanced security
     SECRET_KEY: str = os.getenv("SECRET_KEY", secrets.token_urlsafe(32))
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # How often each worker pulls revocations made by other workers
+    REVOCATION_SYNC_SECONDS: float = 2.0
     
     # Security Headers and CORS
     ALLOWED_ORIGINS: List[str] = [
@@ -21,6 +28,7 @@ class Settings(BaseSettings):
     ]
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
     
@@ -41,6 +49,142 @@ class Settings(BaseSettings):
     API_KEY_HEADER: str = "X-API-Key"
     API_KEY: str = os.getenv("API_KEY", secrets.token_urlsafe(32))
     
+    # Live ETA tracking
+    ETA_DEFAULT_SPEED_KMH: float = 25.0
+    ETA_MIN_SPEED_KMH: float = 5.0
+    ETA_MAX_SPEED_KMH: float = 80.0
+    ETA_SPEED_SMOOTHING: float = 0.3
+    ETA_ROAD_FACTOR: float = 1.3
+    ETA_ARRIVAL_RADIUS_METERS: float = 50.0
+    ETA_STOP_SERVICE_MINUTES: float = 3.0
+    # Routes untouched (no plan, ping or completed stop) this long are dropped
+    ETA_IDLE_MINUTES: float = 120.0
+    ETA_EVICT_INTERVAL_SECONDS: float = 300.0
+    
+    # Responses
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "True").lower() == "true"
+    
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # Analytics
+    ANALYTICS_CACHE_SECONDS: int = 30
+    
+    # SQL instrumentation
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    # Identical statements per request before it is flagged as a likely N+1
+    N_PLUS_ONE_THRESHOLD: int = 5
+    
+    # Request profiling
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_INTERVAL_SECONDS: float = 0.005
+    PROFILE_MAX_STORED: int = 50
+    
+    # Search
+    PHONE_COUNTRY_CODE: str = "91"
+    
+    # Customer typeahead
+    TYPEAHEAD_MAX_STORES: int = 500
+    TYPEAHEAD_REFRESH_SECONDS: float = 300.0
+    TYPEAHEAD_TOP_K: int = 32
+    
+    # Dashboard bootstrap
+    BOOTSTRAP_CACHE_SECONDS: int = 60
+    BOOTSTRAP_ORDER_LIMIT: int = 200
+    
+    # Delta sync
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_MAX_BATCH: int = 100
+    SYNC_MUTATION_RETENTION_DAYS: int = 30
+    
+    # Billing
+    BILLING_RATE_PER_ORDER: float = float(os.getenv("BILLING_RATE_PER_ORDER", "400"))
+    BILLING_RECEIVING_UPI_ID: str = os.getenv("BILLING_RECEIVING_UPI_ID", "")
+    BILLING_RECEIVING_MOBILE: str = os.getenv("BILLING_RECEIVING_MOBILE", "")
+    BILLING_MAX_PERIOD_DAYS: int = 366
+    
+    # Delivery slots
+    SLOT_MINUTES: int = 30
+    SLOT_MAX_WINDOW_MINUTES: int = 240
+    SLOT_STORE_CAPACITY: int = int(os.getenv("SLOT_STORE_CAPACITY", "20"))
+    SLOT_DRIVER_CAPACITY: int = int(os.getenv("SLOT_DRIVER_CAPACITY", "2"))
+    # Bookable hours and day boundaries are local time at this UTC offset
+    SLOT_UTC_OFFSET_MINUTES: int = int(os.getenv("SLOT_UTC_OFFSET_MINUTES", "330"))
+    SLOT_OPEN_HOUR: int = 8
+    SLOT_CLOSE_HOUR: int = 22
+    SLOT_BOOKING_DAYS_AHEAD: int = 30
+    
+    # Proof-of-delivery photos
+    PROOF_DIR: str = os.getenv("PROOF_DIR", "./proofs")
+    PROOF_MAX_BYTES: int = 15 * 1024 * 1024
+    PROOF_THUMBNAIL_SIZE: int = 320
+    # Processes decoding and thumbnailing photos, in each process running jobs
+    PROOF_WORKERS: int = int(os.getenv("PROOF_WORKERS", "2"))
+    
+    # Background jobs
+    # Worker threads each API process runs; serve.py turns these off when it
+    # starts dedicated job processes (JOB_WORKER_PROCESSES)
+    JOB_IN_PROCESS: bool = os.getenv("JOB_IN_PROCESS", "True").lower() == "true"
+    JOB_WORKER_THREADS: int = int(os.getenv("JOB_WORKER_THREADS", "2"))
+    JOB_WORKER_PROCESSES: int = int(os.getenv("JOB_WORKER_PROCESSES", "1"))
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 10.0
+    # Workers refresh running jobs' heartbeat this often; a running job whose
+    # heartbeat is older than the timeout is assumed lost with its worker
+    JOB_HEARTBEAT_SECONDS: float = 15.0
+    JOB_HEARTBEAT_TIMEOUT_SECONDS: int = 120
+    JOB_RETENTION_DAYS: int = 7
+    # Finished jobs averaged into the wait and run time stats
+    JOB_STATS_WINDOW_MINUTES: int = 60
+    
+    # Customer notifications (off unless enabled)
+    NOTIFY_ENABLED: bool = os.getenv("NOTIFY_ENABLED", "False").lower() == "true"
+    # "fake" logs and keeps recent messages in memory and is refused unless
+    # DEBUG is on; "webhook" posts batches to NOTIFY_GATEWAY_URL
+    NOTIFY_PROVIDER: str = os.getenv("NOTIFY_PROVIDER", "fake")
+    NOTIFY_CHANNEL: str = os.getenv("NOTIFY_CHANNEL", "sms")
+    NOTIFY_GATEWAY_URL: str = os.getenv("NOTIFY_GATEWAY_URL", "")
+    NOTIFY_GATEWAY_TOKEN: str = os.getenv("NOTIFY_GATEWAY_TOKEN", "")
+    NOTIFY_GATEWAY_TIMEOUT_SECONDS: float = 10.0
+    NOTIFY_BATCH_SIZE: int = 50
+    NOTIFY_RATE_PER_SECOND: float = float(os.getenv("NOTIFY_RATE_PER_SECOND", "10"))
+    # Status changes within this window go out in the same batch
+    NOTIFY_BATCH_DELAY_SECONDS: float = 2.0
+    NOTIFY_MAX_ATTEMPTS: int = 5
+    NOTIFY_RETRY_BASE_SECONDS: float = 30.0
+    
+    # Archival of settled deliveries
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "./archive")
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    # Monthly partitions created ahead of time (Postgres)
+    PARTITION_MONTHS_AHEAD: int = 2
+    # How often the partitions.ensure job checks for upcoming months
+    PARTITION_CHECK_HOURS: int = 12
+    
+    # Server
+    # Create and upgrade the schema when a worker starts; serve.py does it
+    # once before starting workers and turns this off for them
+    SCHEMA_SETUP_ON_STARTUP: bool = os.getenv("SCHEMA_SETUP_ON_STARTUP", "True").lower() == "true"
+    # Load balancer addresses (comma-separated IPs or CIDRs) whose
+    # X-Forwarded-For / X-Forwarded-Proto headers are trusted; the client
+    # address from anyone else is the socket peer
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    # API worker processes. Live ETAs and their SSE streams, login lockouts
+    # and rate-limit counters are kept in process memory, so each worker
+    # sees only its own; raise this only once they move to shared storage
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    PASSWORD_HASH_WORKERS: int = 4
+    
+    # Admission control (per worker)
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "app.log"
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Customer, Delivery
+from app.search import PHONE_QUERY
+from app.security import InputValidation
+
+BACKFILL_BATCH_SIZE = 1000
+
+def clean_text(value: Optional[str]) -> str:
+    return " ".join((value or "").split())
+
+def _merge_field(current: str, incoming: str) -> str:
+    """Keep the stored spelling for formatting-only differences, else take the newer value."""
+    if not incoming or incoming.casefold() == current.casefold():
+        return current
+    return incoming
+
+def upsert_customer(db: Session, store_id: int, name: str, phone: str, address: str,
+                    location: Optional[str] = None) -> Customer:
+    """Find or create the store's customer for ``phone`` and fold in this order's details.
+
+    Phone numbers are compared in normalized form, so "+91 98765 43210" and
+    "098765-43210" are the same customer. The caller commits.
+    """
+    digits = InputValidation.normalize_phone_number(phone)
+    name, address, location = clean_text(name), clean_text(address), clean_text(location)
+    now = datetime.utcnow()
+
+    def existing():
+        return db.query(Customer).filter(Customer.store_id == store_id, Customer.phone_digits == digits).first()
+
+    customer = existing()
+    if customer is None:
+        try:
+            with db.begin_nested():
+                customer = Customer(store_id=store_id, phone_digits=digits, phone=clean_text(phone), name=name,
+                                    address=address, location=location or None, order_count=1, last_order_at=now)
+                db.add(customer)
+            return customer
+        except IntegrityError:
+            # Created concurrently by another order for the same number
+            customer = existing()
+
+    customer.name = _merge_field(customer.name, name)
+    customer.address = _merge_field(customer.address, address)
+    customer.location = _merge_field(customer.location or "", location) or None
+    customer.phone = clean_text(phone) or customer.phone
+    customer.order_count = (customer.order_count or 0) + 1
+    customer.last_order_at = now
+    return customer
+
+def backfill_customers(conn: Connection) -> int:
+    """Create the address book from existing deliveries while it is still empty.
+
+    One customer per (store, normalized phone), with the details of their
+    latest order, as :func:`upsert_customer` would have left them. Once
+    any customer exists this does nothing, so it runs once, on the first
+    start after upgrading. Returns the number of customers created.
+    """
+    customers = Customer.__table__
+    if conn.execute(select(customers.c.id).limit(1)).first() is not None:
+        return 0
+    deliveries = Delivery.__table__
+    latest = select(
+        func.max(deliveries.c.id).label("id"),
+        func.count(deliveries.c.id).label("order_count"),
+        func.max(deliveries.c.created_at).label("last_order_at"),
+    ).where(
+        deliveries.c.customer_phone_digits.is_not(None), deliveries.c.customer_phone_digits != ""
+    ).group_by(deliveries.c.store_id, deliveries.c.customer_phone_digits).subquery()
+    rows = conn.execution_options(stream_results=True).execute(
+        select(
+            deliveries.c.store_id, deliveries.c.customer_phone_digits, deliveries.c.customer_phone,
+            deliveries.c.customer_name, deliveries.c.customer_address, deliveries.c.customer_location,
+            latest.c.order_count, latest.c.last_order_at,
+        ).join_from(deliveries, latest, latest.c.id == deliveries.c.id)
+    )
+    created = 0
+    for batch in rows.partitions(BACKFILL_BATCH_SIZE):
+        conn.execute(insert(customers), [
+            {
+                "store_id": store_id,
+                "phone_digits": digits,
+                "phone": clean_text(phone),
+                "name": clean_text(name),
+                "address": clean_text(address),
+                "location": clean_text(location) or None,
+                "order_count": order_count,
+                "last_order_at": last_order_at,
+            }
+            for store_id, digits, phone, name, address, location, order_count, last_order_at in batch
+        ])
+        created += len(batch)
+    return created
+
+def suggestion(customer: Customer) -> dict:
+    return {
+        "id": customer.id,
+        "name": customer.name,
+        "phone": customer.phone,
+        "address": customer.address,
+        "location": customer.location,
+        "order_count": customer.order_count or 0,
+        "phone_digits": customer.phone_digits,
+    }
+
+def _keys(entry: dict) -> List[str]:
+    words = f"{entry['name']} {entry['address']}".casefold().split()
+    return words + [entry["phone_digits"]]
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[int] = []
+
+class StoreTrie:
+    """Prefix trie over one store's customer names, address words and phone digits.
+
+    Each node keeps the ids of its ``top_k`` most frequent customers, so a
+    lookup costs one walk down the prefix plus a filter over at most
+    ``top_k`` candidates.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.root = _Node()
+        self.entries: Dict[int, dict] = {}
+        self.loaded_at = time.monotonic()
+
+    def add(self, entry: dict, ranked: bool = False):
+        """Index ``entry``; ``ranked`` skips re-sorting when loading in frequency order."""
+        self.entries[entry["id"]] = entry
+        for key in _keys(entry):
+            node = self.root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+                if entry["id"] in node.top:
+                    if not ranked:
+                        node.top.sort(key=lambda i: -self.entries[i]["order_count"])
+                    continue
+                if ranked:
+                    if len(node.top) < self.top_k:
+                        node.top.append(entry["id"])
+                    continue
+                node.top.append(entry["id"])
+                node.top.sort(key=lambda i: -self.entries[i]["order_count"])
+                del node.top[self.top_k:]
+
+    def search(self, query: str, limit: int) -> List[dict]:
+        tokens = query.casefold().split()
+        if not tokens:
+            return []
+        # The longest token narrows the candidates most
+        node = self.root
+        for char in max(tokens, key=len):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        results = []
+        for entry_id in node.top:
+            entry = self.entries[entry_id]
+            keys = _keys(entry)
+            # Ids linger on old paths after a rename; check against current values
+            if all(any(key.startswith(token) for key in keys) for token in tokens):
+                results.append(entry)
+                if len(results) >= limit:
+                    break
+        return results
+
+class TypeaheadIndex:
+    """Per-store tries, loaded on first use and updated as orders come in.
+
+    Each worker holds its own tries; entries written by other workers appear
+    once the store's trie is older than TYPEAHEAD_REFRESH_SECONDS and is
+    reloaded. Least recently used stores are dropped beyond
+    TYPEAHEAD_MAX_STORES.
+    """
+
+    def __init__(self, max_stores: int, refresh_seconds: float, top_k: int):
+        self.max_stores = max_stores
+        self.refresh_seconds = refresh_seconds
+        self.top_k = top_k
+        self._tries: "OrderedDict[int, StoreTrie]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _trie(self, store_id: int, load: Callable[[], Iterable[Customer]]) -> StoreTrie:
+        with self._lock:
+            trie = self._tries.get(store_id)
+            if trie is not None and time.monotonic() - trie.loaded_at < self.refresh_seconds:
+                self._tries.move_to_end(store_id)
+                return trie
+        trie = StoreTrie(self.top_k)
+        for customer in load():
+            trie.add(suggestion(customer), ranked=True)
+        with self._lock:
+            self._tries[store_id] = trie
+            self._tries.move_to_end(store_id)
+            while len(self._tries) > self.max_stores:
+                self._tries.popitem(last=False)
+        return trie
+
+    def search(self, store_id: int, query: str, limit: int, load: Callable[[], Iterable[Customer]]) -> List[dict]:
+        if PHONE_QUERY.match(query):
+            query = InputValidation.normalize_phone_number(query)
+        trie = self._trie(store_id, load)
+        with self._lock:
+            return trie.search(query, limit)
+
+    def update(self, customer: Customer):
+        """Apply a committed customer change to an already loaded trie."""
+        with self._lock:
+            trie = self._tries.get(customer.store_id)
+            if trie is not None:
+                trie.add(suggestion(customer))
+
+    def clear(self):
+        with self._lock:
+            self._tries.clear()
+
+typeahead_index = TypeaheadIndex(
+    settings.TYPEAHEAD_MAX_STORES,
+    settings.TYPEAHEAD_REFRESH_SECONDS,
+    settings.TYPEAHEAD_TOP_K
+)
@@ -1,13 +1,22 @@
-from sqlalchemy import create_engine
+import itertools
+import math
+import threading
+import time
+from typing import List, Optional
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.instrumentation import instrument_engine
 
 # Database URL
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 # Create engine
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -15,11 +24,127 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
+class ReplicaRouter:
+    """Chooses the engine for read-only sessions.
+
+    Replicas are used round-robin while they pass a ``SELECT 1`` probe, run
+    at most every REPLICA_HEALTH_CHECK_SECONDS; a replica whose connection
+    drops is taken out until the next probe succeeds. Callers that wrote in
+    the last READ_YOUR_WRITES_SECONDS read from the primary so they see
+    their own changes despite replication lag. The write time comes from
+    the client (see ``last_write``), so this holds whichever worker or
+    instance serves the read.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], check_interval: float, sticky_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._healthy = {id(replica): True for replica in replicas}
+        self._cursor = itertools.count()
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        for replica in replicas:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect and context.engine is not None:
+            self._healthy[id(context.engine)] = False
+
+    def check_health(self):
+        """Probe every replica; skipped if another thread is already probing."""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            for replica in self.replicas:
+                try:
+                    with replica.connect() as connection:
+                        connection.execute(text("SELECT 1"))
+                    self._healthy[id(replica)] = True
+                except Exception:
+                    self._healthy[id(replica)] = False
+            self._next_check = time.monotonic() + self.check_interval
+        finally:
+            self._lock.release()
+
+    def engine_for_read(self, last_write: Optional[float] = None) -> Engine:
+        """An engine for a caller whose latest write was at ``last_write`` (epoch seconds), if known."""
+        if not self.replicas:
+            return self.primary
+        # Either side of now, allowing for clock skew between instances
+        if last_write is not None and abs(time.time() - last_write) < self.sticky_seconds:
+            return self.primary
+        if time.monotonic() >= self._next_check:
+            self.check_health()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cursor) % len(self.replicas)]
+            if self._healthy[id(replica)]:
+                return replica
+        return self.primary
+
+def _create_replica(url: str) -> Engine:
+    replica = create_engine(url, pool_pre_ping=True)
+    instrument_engine(replica)
+    return replica
+
+replica_router = ReplicaRouter(
+    engine,
+    [_create_replica(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    settings.REPLICA_HEALTH_CHECK_SECONDS,
+    settings.READ_YOUR_WRITES_SECONDS,
+)
+
+# Read-your-writes marker. A response to a request that committed a write
+# carries the write time in this header and cookie; clients send it back
+# (the cookie does so automatically) and reads within READ_YOUR_WRITES_SECONDS
+# go to the primary. A client can only use it to send its own reads to the
+# primary.
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+
+def last_write(request: Request) -> Optional[float]:
+    """The caller's latest write time, as echoed back by the client."""
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+def set_last_write(request: Request, response: Response):
+    """Pass the time of a write committed by this request on to the client."""
+    written_at = getattr(request.state, "last_write", None)
+    if written_at is None or not replica_router.replicas:
+        return
+    value = f"{written_at:.3f}"
+    response.headers[LAST_WRITE_HEADER] = value
+    response.set_cookie(
+        LAST_WRITE_COOKIE, value, max_age=math.ceil(replica_router.sticky_seconds), httponly=True, samesite="lax"
+    )
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session):
+    state = session.info.get("request_state")
+    if session.info.pop("wrote", False) and state is not None:
+        state.last_write = time.time()
+
 # Dependency to get database session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["request_state"] = request.state
     try:
         yield db
     finally:
         db.close()
 
+# Dependency for read-only routes; served by a replica when one is configured
+def get_read_db(request: Request):
+    db = SessionLocal(bind=replica_router.engine_for_read(last_write(request)))
+    try:
+        yield db
+    finally:
+        db.close()
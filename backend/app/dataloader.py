@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from app.models import Store, User
+
+class NameLoader:
+    """Request-scoped lookup of store and user names for plain delivery rows.
+
+    Rows that are not ORM entities (export and archive dicts) carry only
+    ids. Ids are collected over a batch of rows and the missing ones are
+    fetched with one ``IN`` query per table; results are kept for the rest
+    of the request, so later batches only query ids not seen before.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.stores: Dict[int, Optional[str]] = {}
+        self.users: Dict[int, Optional[str]] = {}
+
+    def _fetch(self, cache: Dict[int, Optional[str]], ids: Iterable[Optional[int]], id_column, name_column):
+        missing = {id_ for id_ in ids if id_ is not None and id_ not in cache}
+        if not missing:
+            return
+        for id_, name in self.db.query(id_column, name_column).filter(id_column.in_(missing)):
+            cache[id_] = name
+        for id_ in missing:
+            cache.setdefault(id_, None)
+
+    def load(self, rows: List[dict]):
+        """Resolve every store and user id referenced by ``rows`` not already known."""
+        self._fetch(self.stores, (row.get("store_id") for row in rows), Store.id, Store.name)
+        user_ids = [row.get("driver_id") for row in rows] + [row.get("store_owner_id") for row in rows]
+        self._fetch(self.users, user_ids, User.id, User.username)
+
+    def attach(self, rows: Iterable[dict], batch_size: int = 1000) -> Iterator[dict]:
+        """Yield ``rows`` with store_name and driver_name added, resolving names per batch."""
+        batch: List[dict] = []
+
+        def flush():
+            self.load(batch)
+            for row in batch:
+                row["store_name"] = self.stores.get(row.get("store_id"))
+                row["driver_name"] = self.users.get(row.get("driver_id"))
+            return batch
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield from flush()
+                batch = []
+        if batch:
+            yield from flush()
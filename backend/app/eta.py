@@ -0,0 +1,262 @@
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from app.config import settings
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+class RouteStop:
+    """A planned stop on a driver's route."""
+
+    __slots__ = ("delivery_id", "latitude", "longitude", "service_seconds")
+
+    def __init__(self, delivery_id: int, latitude: float, longitude: float, service_seconds: float):
+        self.delivery_id = delivery_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.service_seconds = service_seconds
+
+class DriverRoute:
+    """Per-driver route state with incrementally maintained ETAs.
+
+    Road distance between consecutive stops never changes once planned, so
+    it is kept as a prefix sum (``cumulative_km``) together with the summed
+    dwell time at earlier stops (``cumulative_service``).  A position ping
+    only changes the distance to the next stop, which makes every later ETA
+    a constant shift of the prefix sums: the per-ping update is O(1) and
+    materialising the ETA list is a single pass of additions.  Re-planning
+    recomputes the prefix sums only from the first stop that changed.
+    """
+
+    def __init__(self, driver_id: int):
+        self.driver_id = driver_id
+        self.stops: List[RouteStop] = []
+        self.cumulative_km: List[float] = []
+        self.cumulative_service: List[float] = []
+        self.next_index = 0
+        self.latitude: Optional[float] = None
+        self.longitude: Optional[float] = None
+        self.position_at: Optional[float] = None
+        self.distance_to_next_km = 0.0
+        self.speed_kmh = settings.ETA_DEFAULT_SPEED_KMH
+        self.version = 0
+        # Wall-clock time of the last plan, accepted ping or completed stop
+        self.touched_at = time.time()
+        self._cached_version = -1
+        self._cached: Optional[dict] = None
+
+    def plan(self, stops: List[RouteStop]):
+        """Replace the remaining stops, reusing the unchanged prefix."""
+        remaining = self.stops[self.next_index:]
+        first_changed = 0
+        for old, new in zip(remaining, stops):
+            if (old.delivery_id, old.latitude, old.longitude, old.service_seconds) != (
+                new.delivery_id, new.latitude, new.longitude, new.service_seconds
+            ):
+                break
+            first_changed += 1
+
+        self.stops = stops
+        self.cumulative_km = self.cumulative_km[self.next_index:self.next_index + first_changed]
+        self.cumulative_service = self.cumulative_service[self.next_index:self.next_index + first_changed]
+        self.next_index = 0
+        self._extend_prefix(first_changed)
+        self._update_head()
+
+    def _extend_prefix(self, start: int):
+        """Recompute the prefix sums for ``stops[start:]``."""
+        road_factor = settings.ETA_ROAD_FACTOR
+        for i in range(start, len(self.stops)):
+            if i == 0:
+                self.cumulative_km.append(0.0)
+                self.cumulative_service.append(0.0)
+                continue
+            prev, stop = self.stops[i - 1], self.stops[i]
+            leg = haversine_km(prev.latitude, prev.longitude, stop.latitude, stop.longitude) * road_factor
+            self.cumulative_km.append(self.cumulative_km[i - 1] + leg)
+            self.cumulative_service.append(self.cumulative_service[i - 1] + prev.service_seconds)
+
+    def _update_head(self):
+        """Refresh the distance to the next stop after a move or re-plan."""
+        self.version += 1
+        if self.latitude is None or self.next_index >= len(self.stops):
+            self.distance_to_next_km = 0.0
+            return
+        stop = self.stops[self.next_index]
+        self.distance_to_next_km = haversine_km(
+            self.latitude, self.longitude, stop.latitude, stop.longitude
+        ) * settings.ETA_ROAD_FACTOR
+
+    def update_position(self, latitude: float, longitude: float, recorded_at: float) -> bool:
+        """Apply a position ping. Returns False for stale, out-of-order pings."""
+        if self.position_at is not None and recorded_at <= self.position_at:
+            return False
+
+        if self.latitude is not None:
+            elapsed_h = (recorded_at - self.position_at) / 3600.0
+            moved_km = haversine_km(self.latitude, self.longitude, latitude, longitude) * settings.ETA_ROAD_FACTOR
+            if elapsed_h > 0 and moved_km > 0:
+                observed = min(max(moved_km / elapsed_h, settings.ETA_MIN_SPEED_KMH), settings.ETA_MAX_SPEED_KMH)
+                alpha = settings.ETA_SPEED_SMOOTHING
+                self.speed_kmh = alpha * observed + (1 - alpha) * self.speed_kmh
+
+        self.latitude = latitude
+        self.longitude = longitude
+        self.position_at = recorded_at
+
+        # Consume stops the driver has reached
+        arrival_km = settings.ETA_ARRIVAL_RADIUS_METERS / 1000.0
+        while self.next_index < len(self.stops):
+            stop = self.stops[self.next_index]
+            if haversine_km(latitude, longitude, stop.latitude, stop.longitude) > arrival_km:
+                break
+            self.next_index += 1
+
+        self._update_head()
+        return True
+
+    def complete_stop(self, delivery_id: int) -> bool:
+        """Mark a stop as done (e.g. delivery confirmed) and advance past it."""
+        for i in range(self.next_index, len(self.stops)):
+            if self.stops[i].delivery_id == delivery_id:
+                self.next_index = i + 1
+                self._update_head()
+                return True
+        return False
+
+    def snapshot(self) -> dict:
+        """ETAs for every remaining stop, cached until the state changes."""
+        if self._cached_version == self.version:
+            return self._cached
+
+        base = self.position_at if self.position_at is not None else time.time()
+        km_per_second = self.speed_kmh / 3600.0
+        head = self.next_index
+        stops = []
+        if head < len(self.stops):
+            head_km = self.cumulative_km[head]
+            head_service = self.cumulative_service[head]
+            for i in range(head, len(self.stops)):
+                distance = self.distance_to_next_km + self.cumulative_km[i] - head_km
+                seconds = distance / km_per_second + self.cumulative_service[i] - head_service
+                stops.append({
+                    "delivery_id": self.stops[i].delivery_id,
+                    "eta": datetime.utcfromtimestamp(base + seconds),
+                    "distance_km": round(distance, 3),
+                })
+
+        self._cached = {
+            "driver_id": self.driver_id,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "speed_kmh": round(self.speed_kmh, 1),
+            "updated_at": datetime.utcfromtimestamp(base),
+            "stops": stops,
+        }
+        self._cached_version = self.version
+        return self._cached
+
+class ETAService:
+    """In-process registry of driver routes and ETA subscribers.
+
+    All mutations happen on the event loop thread, so no locking is needed.
+    Subscribers receive the latest snapshot only; a slow consumer never
+    builds up a backlog of outdated ETAs.
+    """
+
+    def __init__(self):
+        self.routes: Dict[int, DriverRoute] = {}
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    def _route(self, driver_id: int) -> DriverRoute:
+        route = self.routes.get(driver_id)
+        if route is None:
+            route = self.routes[driver_id] = DriverRoute(driver_id)
+        return route
+
+    def plan_route(self, driver_id: int, stops: List[RouteStop]) -> dict:
+        route = self._route(driver_id)
+        route.plan(stops)
+        return self._publish(route)
+
+    def record_ping(self, driver_id: int, latitude: float, longitude: float,
+                    recorded_at: Optional[float] = None) -> Optional[dict]:
+        """Apply a ping; ``recorded_at`` after now (a fast device clock) is taken as now.
+
+        Otherwise one future timestamp would make every later real ping look
+        out of order.
+        """
+        route = self._route(driver_id)
+        now = time.time()
+        recorded_at = now if recorded_at is None else min(recorded_at, now)
+        if not route.update_position(latitude, longitude, recorded_at):
+            return None
+        return self._publish(route)
+
+    def complete_stop(self, driver_id: int, delivery_id: int) -> Optional[dict]:
+        route = self.routes.get(driver_id)
+        if route is None or not route.complete_stop(delivery_id):
+            return None
+        return self._publish(route)
+
+    def get_etas(self, driver_id: int) -> Optional[dict]:
+        route = self.routes.get(driver_id)
+        return route.snapshot() if route else None
+
+    def clear(self, driver_id: int):
+        self.routes.pop(driver_id, None)
+
+    def evict_idle(self, max_idle: timedelta) -> int:
+        """Drop routes without subscribers that have not changed within ``max_idle``."""
+        cutoff = time.time() - max_idle.total_seconds()
+        idle = [
+            driver_id for driver_id, route in self.routes.items()
+            if route.touched_at < cutoff and not self.subscribers.get(driver_id)
+        ]
+        for driver_id in idle:
+            del self.routes[driver_id]
+        return len(idle)
+
+    def subscribe(self, driver_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.subscribers.setdefault(driver_id, set()).add(queue)
+        route = self.routes.get(driver_id)
+        if route is not None:
+            queue.put_nowait(route.snapshot())
+        return queue
+
+    def unsubscribe(self, driver_id: int, queue: asyncio.Queue):
+        queues = self.subscribers.get(driver_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[driver_id]
+
+    def _publish(self, route: DriverRoute) -> dict:
+        route.touched_at = time.time()
+        snapshot = route.snapshot()
+        for queue in self.subscribers.get(route.driver_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+        return snapshot
+
+eta_service = ETAService()
+
+async def evict_idle_routes(service: ETAService, interval_seconds: float, max_idle: timedelta):
+    """Drop idle routes every ``interval_seconds``; run as a task on the app's event loop."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        service.evict_idle(max_idle)
@@ -0,0 +1,60 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+def collection_etag(query: Query, model, *variant) -> str:
+    """Weak ETag for a collection from a cheap version marker.
+
+    Aggregates count, max id and max created/updated timestamps over the
+    (already filtered) query instead of loading rows, so an unchanged list
+    can be answered with 304 after a single index-friendly query. Models
+    with a change sequence (deliveries) use its max instead of timestamps:
+    an update committed after a newer one can leave max(updated_at)
+    unchanged (transaction start time on Postgres, whole seconds on SQLite),
+    while every change takes a new, higher sequence number. ``variant``
+    folds in anything else that shapes the response (paging, caller,
+    values joined from other tables).
+    """
+    markers = [func.count(model.id), func.max(model.id)]
+    if hasattr(model, "change_seq"):
+        markers.append(func.max(model.change_seq))
+    else:
+        markers.append(func.max(model.created_at))
+        if hasattr(model, "updated_at"):
+            markers.append(func.max(model.updated_at))
+    version = query.order_by(None).with_entities(*markers).one()
+    raw = "|".join(str(part) for part in (model.__tablename__, *version, *variant))
+    return 'W/"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+def page_marker(page: Query, *columns) -> str:
+    """Digest of ``columns`` over the rows of ``page``.
+
+    For values a response joins in from other tables (store and driver
+    names), which the collection's own version marker does not see change.
+    """
+    rows = page.with_entities(*columns).all()
+    return hashlib.blake2b(repr(rows).encode("utf-8"), digest_size=12).hexdigest()
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
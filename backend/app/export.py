@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Iterable, Iterator, Optional
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+from app.database import SessionLocal
+from app.dataloader import NameLoader
+from app.models import Delivery
+
+EXPORT_COLUMNS = (
+    Delivery.id,
+    Delivery.store_id,
+    Delivery.driver_id,
+    Delivery.customer_name,
+    Delivery.customer_phone,
+    Delivery.customer_address,
+    Delivery.customer_location,
+    Delivery.items,
+    Delivery.special_instructions,
+    Delivery.status,
+    Delivery.total_amount,
+    Delivery.delivery_date,
+    Delivery.created_at,
+    Delivery.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+# Resolved from the ids by NameLoader, see with_names()
+NAME_FIELDS = ["store_name", "driver_name"]
+OUTPUT_FIELDS = EXPORT_FIELDS + NAME_FIELDS
+
+# Rows fetched per server-side cursor round-trip
+EXPORT_BATCH_SIZE = 1000
+# Approximate bytes buffered before a chunk is handed to the response
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+def iter_delivery_rows(build_query: Callable[[Session], Query], bind: Optional[Engine] = None) -> Iterator[dict]:
+    """Stream deliveries as plain dicts through a server-side cursor.
+
+    ``build_query`` receives a fresh session and returns the filtered
+    delivery query; the session is opened here because the response body is
+    produced after the request-scoped session has been released. ``bind``
+    selects the engine, e.g. a read replica.
+    """
+    db = SessionLocal(bind=bind) if bind is not None else SessionLocal()
+    try:
+        query = build_query(db).order_by(Delivery.created_at, Delivery.id).with_entities(*EXPORT_COLUMNS)
+        for row in query.yield_per(EXPORT_BATCH_SIZE):
+            yield {field: _plain(value) for field, value in zip(EXPORT_FIELDS, row)}
+    finally:
+        db.close()
+
+def with_names(rows: Iterable[dict], bind: Optional[Engine] = None) -> Iterator[dict]:
+    """Add store and driver names to exported rows, one lookup per batch of new ids."""
+    db = SessionLocal(bind=bind) if bind is not None else SessionLocal()
+    try:
+        yield from NameLoader(db).attach(rows, EXPORT_BATCH_SIZE)
+    finally:
+        db.close()
+
+def encode_rows(rows: Iterable[dict], fmt: str) -> Iterator[bytes]:
+    """Encode rows as CSV or NDJSON, yielding ~EXPORT_CHUNK_BYTES chunks."""
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(row, separators=(",", ":")))
+            buffer.write("\n")
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a chunk stream incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,117 @@
+import os
+import struct
+import tempfile
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Optional dependency: metadata is stripped without re-encoding and no thumbnails are made
+    Image = None
+    ImageOps = None
+
+# Pure file-to-file transforms. app.proofs runs them in a process pool from
+# the proofs.process job, so this module imports nothing from the app and
+# stays cheap to load in a freshly spawned interpreter.
+
+JPEG = "image/jpeg"
+PNG = "image/png"
+WEBP = "image/webp"
+
+EXTENSIONS = {JPEG: "jpg", PNG: "png", WEBP: "webp"}
+
+# JPEG APPn segments kept when stripping: JFIF (APP0) and Adobe (APP14, colour transform)
+_KEPT_APP_MARKERS = {0xE0, 0xEE}
+# PNG ancillary chunks that carry metadata
+_PNG_METADATA_CHUNKS = {b"eXIf", b"tEXt", b"zTXt", b"iTXt", b"tIME"}
+
+def sniff(header: bytes) -> Optional[str]:
+    """Media type from the first bytes of a file, or None if unsupported."""
+    if header.startswith(b"\xff\xd8\xff"):
+        return JPEG
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return PNG
+    if Image is not None and header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return WEBP
+    return None
+
+def strip_jpeg(data: bytes) -> bytes:
+    """Drop EXIF, XMP, IPTC and comment segments from a JPEG without re-encoding."""
+    out = bytearray(data[:2])
+    i = 2
+    while i < len(data) - 1:
+        if data[i] != 0xFF:
+            raise ValueError("Corrupt JPEG segment")
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker == 0xD9:  # End of image
+            out += data[i:i + 2]
+            break
+        if marker == 0xDA:  # Start of scan: the rest is entropy-coded data
+            out += data[i:]
+            break
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            out += data[i:i + 2]
+            i += 2
+            continue
+        (length,) = struct.unpack(">H", data[i + 2:i + 4])
+        end = i + 2 + length
+        if not ((0xE1 <= marker <= 0xEF and marker not in _KEPT_APP_MARKERS) or marker == 0xFE):
+            out += data[i:end]
+        i = end
+    return bytes(out)
+
+def strip_png(data: bytes) -> bytes:
+    """Drop text, EXIF and timestamp chunks from a PNG without re-encoding."""
+    out = bytearray(data[:8])
+    i = 8
+    while i + 8 <= len(data):
+        (length,) = struct.unpack(">I", data[i:i + 4])
+        chunk_type = data[i + 4:i + 8]
+        end = i + 12 + length
+        if chunk_type not in _PNG_METADATA_CHUNKS:
+            out += data[i:end]
+        i = end
+        if chunk_type == b"IEND":
+            break
+    return bytes(out)
+
+def _write_atomic(path: str, write):
+    """Write through a uniquely named temp file, so concurrent writers of the same path never share one."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, partial = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".partial")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(partial, path)
+    except BaseException:
+        os.remove(partial)
+        raise
+
+def process_image(source: str, image_path: str, thumb_path: str, thumb_size: int,
+                  quality: int = 85) -> Tuple[str, bool]:
+    """Write a metadata-free copy of ``source`` and, with Pillow, a thumbnail.
+
+    With Pillow the image is re-encoded as JPEG after applying its EXIF
+    orientation, which drops every metadata block. Without it, metadata
+    segments are cut out of JPEG and PNG files byte-for-byte. Returns the
+    stored image's media type and whether a thumbnail was written.
+    """
+    if Image is None:
+        with open(source, "rb") as f:
+            data = f.read()
+        media_type = sniff(data[:16])
+        stripped = strip_jpeg(data) if media_type == JPEG else strip_png(data)
+        _write_atomic(image_path, lambda f: f.write(stripped))
+        return media_type, False
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        _write_atomic(image_path, lambda f: image.save(f, "JPEG", quality=quality, optimize=True))
+        image.thumbnail((thumb_size, thumb_size))
+        _write_atomic(thumb_path, lambda f: image.save(f, "JPEG", quality=75, optimize=True))
+    return JPEG, True
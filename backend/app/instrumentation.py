@@ -0,0 +1,128 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+import structlog
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import settings
+from app.metrics import metrics
+
+logger = structlog.get_logger()
+
+db_queries_total = metrics.counter("db_queries_total", "SQL statements executed")
+db_query_seconds_total = metrics.counter("db_query_seconds_total", "Time spent executing SQL statements")
+db_slow_queries_total = metrics.counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS")
+db_n_plus_one_total = metrics.counter("db_n_plus_one_total", "Requests repeating an identical statement")
+
+class QueryStats:
+    """SQL statements issued while serving one request."""
+
+    __slots__ = ("count", "seconds", "statements", "flagged")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self.flagged = set()
+
+    def record(self, statement: str, elapsed: float) -> int:
+        self.count += 1
+        self.seconds += elapsed
+        self.statements[statement] += 1
+        return self.statements[statement]
+
+# The stats object is shared with threadpool workers, which run with a
+# copy of the request's context
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def redact_parameters(parameters):
+    """Replace bound values with their type names so logs never hold user data."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} parameter sets>"
+        return [type(value).__name__ for value in parameters]
+    return None
+
+# The start time lives on the statement's execution context, which is
+# discarded with the statement, so a failed statement leaves nothing behind
+# on the pooled connection
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_start", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_queries_total.inc()
+    db_query_seconds_total.inc(elapsed)
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        db_slow_queries_total.inc()
+        logger.warning(
+            "Slow query",
+            statement=statement,
+            parameters=redact_parameters(parameters),
+            duration_ms=round(elapsed * 1000, 2),
+        )
+
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    repeats = stats.record(statement, elapsed)
+    if repeats >= settings.N_PLUS_ONE_THRESHOLD and statement not in stats.flagged:
+        stats.flagged.add(statement)
+        logger.warning("Possible N+1 query", statement=statement, repeats=repeats)
+
+def instrument_engine(engine):
+    """Time every statement executed through ``engine``."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryStatsMiddleware:
+    """Collects per-request SQL statistics.
+
+    In debug mode the totals are returned as ``X-DB-Query-Count`` and
+    ``X-DB-Time-Ms`` headers. Statements issued while a streaming body is
+    being sent are counted in the metrics but not in the headers.
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode("latin-1")))
+                headers.append((b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            if stats.flagged:
+                route = scope.get("route")
+                db_n_plus_one_total.inc(route=getattr(route, "path", "unmatched"))
+                logger.warning(
+                    "Request repeated identical statements",
+                    method=scope["method"],
+                    path=scope["path"],
+                    statements=len(stats.flagged),
+                    queries=stats.count,
+                )
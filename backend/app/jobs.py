@@ -0,0 +1,390 @@
+import json
+import os
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+import structlog
+from sqlalchemy import case, extract, func, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import metrics
+from app.models import Job
+
+logger = structlog.get_logger()
+
+# Durable background jobs in the jobs table.
+# enqueue() adds a row in the caller's transaction, so a job exists exactly
+# when the change that needs it commits. Workers claim the highest-priority
+# runnable job: on Postgres with FOR UPDATE SKIP LOCKED, so concurrent workers
+# never wait on or double-claim a row; on SQLite, where writers are serialized
+# anyway, a conditional UPDATE on status does the same. A job type's
+# concurrency limit is enforced by that same UPDATE counting the type's
+# running rows, under a per-type advisory lock on Postgres so two workers
+# cannot both take the last slot.
+# While a job runs, its worker refreshes the row's heartbeat_at every
+# JOB_HEARTBEAT_SECONDS. Handlers must be idempotent: a running job whose
+# heartbeat is older than JOB_HEARTBEAT_TIMEOUT_SECONDS is taken to have lost
+# its worker and is run again, however long it legitimately takes.
+# Job types registered with ``every_seconds`` are recurring: worker
+# maintenance queues the next run that long after the last one finished,
+# whenever none is queued or running.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+queued_gauge = metrics.gauge("jobs_queued", "Jobs waiting to run")
+running_gauge = metrics.gauge("jobs_running", "Jobs claimed by a worker")
+oldest_gauge = metrics.gauge("jobs_oldest_runnable_seconds", "How long the oldest runnable job has waited")
+finished_gauge = metrics.gauge("jobs_finished_recent", "Jobs done or failed within JOB_STATS_WINDOW_MINUTES")
+wait_gauge = metrics.gauge("job_wait_seconds_avg", "Average wait for a worker of recently finished jobs")
+run_gauge = metrics.gauge("job_run_seconds_avg", "Average run time of recently finished jobs")
+
+@dataclass
+class JobType:
+    name: str
+    func: Callable[[dict], object]
+    # Most jobs of this type running at once across all workers (None: no limit)
+    concurrency: Optional[int]
+    max_attempts: int
+    # Queued again this long after the last run finished (None: only when enqueued)
+    every_seconds: Optional[float] = None
+
+registry: Dict[str, JobType] = {}
+
+def handler(name: str, concurrency: Optional[int] = None, max_attempts: Optional[int] = None,
+            every_seconds: Optional[float] = None):
+    """Register ``func(payload)`` as the handler of ``name`` jobs, run every ``every_seconds`` if given."""
+    def register(func):
+        registry[name] = JobType(name, func, concurrency, max_attempts or settings.JOB_MAX_ATTEMPTS, every_seconds)
+        return func
+    return register
+
+def enqueue(db: Session, job_type: str, payload: Optional[dict] = None, priority: int = 0,
+            delay_seconds: float = 0, max_attempts: Optional[int] = None) -> Job:
+    """Add a job in the caller's transaction; workers see it once that commits.
+
+    Higher ``priority`` runs first.
+    """
+    spec = registry.get(job_type)
+    now = datetime.utcnow()
+    job = Job(
+        job_type=job_type,
+        payload=json.dumps(payload or {}),
+        priority=priority,
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or (spec.max_attempts if spec else settings.JOB_MAX_ATTEMPTS),
+        run_at=now + timedelta(seconds=delay_seconds),
+        enqueued_at=now
+    )
+    db.add(job)
+    return job
+
+def _running_counts(db: Session) -> Dict[str, int]:
+    return dict(db.query(Job.job_type, func.count(Job.id)).filter(Job.status == RUNNING).group_by(Job.job_type).all())
+
+def _advisory_key(job_type: str) -> int:
+    return zlib.crc32(f"jobs:{job_type}".encode())
+
+def claim(db: Session, worker_id: str, job_types: List[str]) -> Optional[Job]:
+    """Mark the next runnable job of ``job_types`` as running by ``worker_id`` and return it."""
+    postgres = db.get_bind().dialect.name == "postgresql"
+    for _ in range(5):
+        running = _running_counts(db)
+        available = [
+            name for name in job_types
+            if name in registry and (registry[name].concurrency is None or running.get(name, 0) < registry[name].concurrency)
+        ]
+        if not available:
+            db.rollback()
+            return None
+
+        now = datetime.utcnow()
+        query = db.query(Job.id, Job.job_type).filter(
+            Job.status == QUEUED, Job.run_at <= now, Job.job_type.in_(available)
+        ).order_by(Job.priority.desc(), Job.run_at, Job.id).limit(1)
+        if postgres:
+            query = query.with_for_update(skip_locked=True)
+        row = query.first()
+        if row is None:
+            db.rollback()
+            return None
+
+        conditions = [Job.id == row.id, Job.status == QUEUED]
+        limit = registry[row.job_type].concurrency
+        if limit is not None:
+            if postgres:
+                db.execute(select(func.pg_advisory_xact_lock(_advisory_key(row.job_type))))
+            running_now = select(func.count(Job.id)).where(
+                Job.job_type == row.job_type, Job.status == RUNNING
+            ).scalar_subquery()
+            conditions.append(running_now < limit)
+        claimed = db.execute(
+            update(Job).where(*conditions).values(
+                status=RUNNING, locked_by=worker_id, started_at=now, heartbeat_at=now, attempts=Job.attempts + 1
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, row.id)
+        # Another worker took it (SQLite) or the type just filled up; look again
+    return None
+
+def _finish(job_id: int, worker_id: str, error: Optional[str]):
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id, Job.status == RUNNING, Job.locked_by == worker_id).first()
+        if job is None:
+            # Presumed lost and requeued while it ran
+            return
+        now = datetime.utcnow()
+        job.locked_by = None
+        job.last_error = error
+        if error is None:
+            job.status = DONE
+            job.finished_at = now
+        elif job.attempts < job.max_attempts:
+            job.status = QUEUED
+            job.run_at = now + timedelta(seconds=settings.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        else:
+            job.status = FAILED
+            job.finished_at = now
+        db.commit()
+    finally:
+        db.close()
+
+def run_one(worker_id: str, job_types: Optional[List[str]] = None) -> bool:
+    """Claim and run one job; False when nothing was runnable."""
+    db = SessionLocal()
+    try:
+        job = claim(db, worker_id, job_types or list(registry))
+        if job is None:
+            return False
+        job_id, job_type, payload = job.id, job.job_type, json.loads(job.payload)
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    error = None
+    try:
+        registry[job_type].func(payload)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        logger.warning("Job failed", job_id=job_id, job_type=job_type, error=error)
+    seconds = time.perf_counter() - started
+    _finish(job_id, worker_id, error)
+    logger.info("Job ran", job_id=job_id, job_type=job_type, seconds=round(seconds, 3), ok=error is None)
+    return True
+
+def heartbeat(db: Session, worker_ids: List[str]) -> int:
+    """Mark the jobs running under ``worker_ids`` as still alive; returns how many."""
+    beating = db.query(Job).filter(Job.status == RUNNING, Job.locked_by.in_(worker_ids)).update(
+        {Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+    )
+    db.commit()
+    return beating
+
+def requeue_stale(db: Session) -> int:
+    """Return jobs of workers that died mid-run to the queue (or fail them when out of attempts).
+
+    A job is stale when its heartbeat (or, for rows from before heartbeats,
+    its start) is older than JOB_HEARTBEAT_TIMEOUT_SECONDS.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_HEARTBEAT_TIMEOUT_SECONDS)
+    stale = (Job.status == RUNNING, func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff)
+    requeued = db.query(Job).filter(*stale, Job.attempts < Job.max_attempts).update({
+        Job.status: QUEUED, Job.locked_by: None, Job.last_error: "Worker lost", Job.run_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    failed = db.query(Job).filter(*stale).update({
+        Job.status: FAILED, Job.locked_by: None, Job.last_error: "Worker lost", Job.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return requeued + failed
+
+def schedule_recurring(db: Session) -> int:
+    """Queue the next run of each recurring job type that has none queued or running.
+
+    Returns the number of jobs queued. Two workers doing this at once can
+    queue a run twice; recurring handlers are idempotent like all others.
+    """
+    queued = 0
+    now = datetime.utcnow()
+    for spec in registry.values():
+        if spec.every_seconds is None:
+            continue
+        pending = db.query(Job.id).filter(Job.job_type == spec.name, Job.status.in_((QUEUED, RUNNING))).first()
+        if pending is not None:
+            continue
+        last = db.query(func.max(Job.finished_at)).filter(Job.job_type == spec.name, Job.status == DONE).scalar()
+        due = last + timedelta(seconds=spec.every_seconds) if last is not None else now
+        enqueue(db, spec.name, delay_seconds=max((due - now).total_seconds(), 0))
+        queued += 1
+    db.commit()
+    return queued
+
+def prune_jobs(db: Session, retention_days: Optional[int] = None) -> int:
+    """Delete finished jobs older than JOB_RETENTION_DAYS."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days or settings.JOB_RETENTION_DAYS)
+    deleted = db.query(Job).filter(
+        Job.status.in_((DONE, FAILED)), Job.finished_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def _seconds_between(db: Session, start, end):
+    if db.get_bind().dialect.name == "postgresql":
+        return extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+def queue_stats(db: Session) -> dict:
+    """Jobs per type and status, how long the oldest runnable job has waited,
+    and average latencies of jobs finished in the last JOB_STATS_WINDOW_MINUTES.
+
+    Read from the table, so it covers every worker process, including
+    run_jobs.py which serves no /metrics; also refreshes this process's
+    queue gauges. Wait is ``started_at - run_at`` and run time
+    ``finished_at - started_at``, both of a job's last attempt.
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+    for job_type, status, count in db.query(Job.job_type, Job.status, func.count(Job.id)).group_by(Job.job_type, Job.status):
+        counts.setdefault(job_type, {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0})[status] = count
+    now = datetime.utcnow()
+    oldest = db.query(func.min(Job.run_at)).filter(Job.status == QUEUED, Job.run_at <= now).scalar()
+    oldest_seconds = (now - oldest).total_seconds() if oldest is not None else 0.0
+
+    recent: Dict[str, dict] = {}
+    window_start = now - timedelta(minutes=settings.JOB_STATS_WINDOW_MINUTES)
+    rows = db.query(
+        Job.job_type,
+        func.count(Job.id),
+        func.sum(case((Job.status == FAILED, 1), else_=0)),
+        func.avg(_seconds_between(db, Job.run_at, Job.started_at)),
+        func.avg(_seconds_between(db, Job.started_at, Job.finished_at))
+    ).filter(
+        Job.status.in_((DONE, FAILED)), Job.finished_at >= window_start, Job.started_at.isnot(None)
+    ).group_by(Job.job_type)
+    for job_type, finished, failed, wait, run in rows:
+        recent[job_type] = {
+            "finished_recent": finished,
+            "failed_recent": int(failed or 0),
+            "wait_seconds_avg": round(max(float(wait or 0), 0.0), 3),
+            "run_seconds_avg": round(max(float(run or 0), 0.0), 3),
+        }
+
+    for job_type in set(counts) | set(registry):
+        by_status = counts.get(job_type, {})
+        queued_gauge.set(by_status.get(QUEUED, 0), job_type=job_type)
+        running_gauge.set(by_status.get(RUNNING, 0), job_type=job_type)
+        latency = recent.get(job_type, {})
+        finished = latency.get("finished_recent", 0)
+        failed = latency.get("failed_recent", 0)
+        finished_gauge.set(finished - failed, job_type=job_type, status=DONE)
+        finished_gauge.set(failed, job_type=job_type, status=FAILED)
+        wait_gauge.set(latency.get("wait_seconds_avg", 0.0), job_type=job_type)
+        run_gauge.set(latency.get("run_seconds_avg", 0.0), job_type=job_type)
+    oldest_gauge.set(round(oldest_seconds, 3))
+    return {
+        "types": [
+            {"job_type": job_type, **by_status, **recent.get(job_type, {})}
+            for job_type, by_status in sorted(counts.items())
+        ],
+        "oldest_runnable_seconds": round(oldest_seconds, 3),
+        "window_minutes": settings.JOB_STATS_WINDOW_MINUTES,
+    }
+
+class JobWorker:
+    """Threads that claim and run jobs until stopped.
+
+    Thread 0 also requeues jobs of dead workers, prunes old ones and queues
+    recurring jobs about once a minute. A separate thread keeps the heartbeat of the running
+    jobs fresh until the job threads have exited.
+    """
+
+    MAINTENANCE_SECONDS = 60
+
+    def __init__(self, threads: int, job_types: Optional[List[str]] = None, name: Optional[str] = None):
+        self.threads = threads
+        self.job_types = job_types
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._heartbeat_stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._run, args=(index,), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._heartbeat_thread = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        logger.info("Job worker started", worker=self.name, threads=self.threads)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop claiming jobs and wait up to ``timeout`` for running ones to finish."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        self._threads = []
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+    def _maintain(self):
+        db = SessionLocal()
+        try:
+            requeued = requeue_stale(db)
+            pruned = prune_jobs(db)
+            scheduled = schedule_recurring(db)
+        finally:
+            db.close()
+        if requeued or pruned or scheduled:
+            logger.info("Job queue maintenance", requeued=requeued, pruned=pruned, scheduled=scheduled)
+
+    def _beat(self):
+        worker_ids = [f"{self.name}:{index}" for index in range(self.threads)]
+        while not self._heartbeat_stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                heartbeat(db, worker_ids)
+            except Exception as exc:
+                logger.error("Job heartbeat failed", worker=self.name, error=str(exc))
+            finally:
+                db.close()
+
+    def _run(self, index: int):
+        worker_id = f"{self.name}:{index}"
+        next_maintenance = 0.0
+        while not self._stop.is_set():
+            try:
+                if index == 0 and time.monotonic() >= next_maintenance:
+                    self._maintain()
+                    next_maintenance = time.monotonic() + self.MAINTENANCE_SECONDS
+                if not run_one(worker_id, self.job_types):
+                    self._stop.wait(settings.JOB_POLL_SECONDS)
+            except Exception as exc:
+                logger.error("Job worker error", worker=worker_id, error=str(exc))
+                self._stop.wait(settings.JOB_POLL_SECONDS)
+
+job_worker: Optional[JobWorker] = None
+
+def start_job_worker(threads: int):
+    global job_worker
+    if job_worker is None and threads > 0:
+        job_worker = JobWorker(threads)
+        job_worker.start()
+
+def shutdown_job_worker(timeout: Optional[float] = None):
+    global job_worker
+    if job_worker is not None:
+        job_worker.stop(timeout)
+        job_worker = None
@@ -0,0 +1,78 @@
+import zlib
+from typing import List
+import structlog
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+from app.config import settings
+from app.customers import backfill_customers
+from app.models import Base
+from app.partitioning import ensure_partitions
+from app.search import backfill_phone_digits, ensure_search_indexes
+from app.sync import ensure_change_sequence
+
+logger = structlog.get_logger()
+
+# create_all only creates missing tables, so columns and indexes added to a
+# model later never reach databases created from an older version.
+# add_missing_columns adds them with ALTER TABLE / CREATE INDEX so an
+# upgraded deployment keeps working without a migration tool. New columns
+# must be nullable or have a server_default, since existing rows get no
+# value otherwise.
+#
+# prepare_database runs all schema setup in one transaction under a lock
+# (an advisory lock on Postgres, BEGIN IMMEDIATE on SQLite), so processes
+# starting at the same time wait for each other instead of racing to
+# create the same tables. serve.py runs it once before starting workers.
+
+SCHEMA_LOCK_KEY = zlib.crc32(b"schema")
+
+def add_missing_columns(conn: Connection) -> List[str]:
+    """Add model columns and indexes missing from existing tables.
+
+    Returns the ``table.column`` names added.
+    """
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in present]
+        for column in missing:
+            spec = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}"))
+            added.append(f"{table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    if added:
+        logger.info("Columns added", columns=added)
+    return added
+
+def _lock_schema(conn: Connection):
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_xact_lock(SCHEMA_LOCK_KEY)))
+    elif conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def prepare_database(engine: Engine):
+    """Create and upgrade tables, partitions, search indexes and the change counter.
+
+    Also fills values that older versions did not store (phone search
+    digits, the customer address book, change sequence numbers).
+    """
+    with engine.begin() as conn:
+        _lock_schema(conn)
+        Base.metadata.create_all(bind=conn)
+        add_missing_columns(conn)
+        ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD)
+        backfilled = backfill_phone_digits(conn)
+        if backfilled:
+            logger.info("Phone search digits backfilled", deliveries=backfilled)
+        customers = backfill_customers(conn)
+        if customers:
+            logger.info("Customers backfilled from deliveries", customers=customers)
+        ensure_search_indexes(conn)
+        ensure_change_sequence(conn)
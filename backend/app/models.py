@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Date, DateTime, Enum, ForeignKey, Numeric, Text, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -8,6 +9,16 @@ class UserRole(str, enum.Enum):
     STORE_OWNER = "store_owner"
     DRIVER = "driver"
 
+class DeliveryStatus(str, enum.Enum):
+    PENDING = "pending"
+    PICKED_UP = "picked_up"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+
+class InvoiceStatus(str, enum.Enum):
+    PENDING = "pending"
+    PAID = "paid"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -17,9 +28,299 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False)
     is_active = Column(Boolean, default=True)
+    # Bumped to invalidate every refresh token issued to the user
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     def __repr__(self):
         return f"<User(username='{self.username}', role='{self.role}')>"
 
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(64), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Store(Base):
+    __tablename__ = "stores"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    address = Column(String, nullable=False)
+    phone = Column(String, nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Store(name='{self.name}', owner_id={self.owner_id})>"
+
+class StockItem(Base):
+    """Quantity on hand of one product at a store."""
+    __tablename__ = "stock_items"
+    __table_args__ = (
+        UniqueConstraint("store_id", "name", name="uq_stock_items_store_name"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    name = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<StockItem(store_id={self.store_id}, name='{self.name}', quantity={self.quantity})>"
+
+class Customer(Base):
+    """A store's address book entry, one per normalized phone number."""
+    __tablename__ = "customers"
+    __table_args__ = (
+        UniqueConstraint("store_id", "phone_digits", name="uq_customers_store_phone"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    phone_digits = Column(String(15), nullable=False)
+    phone = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    address = Column(String, nullable=False)
+    location = Column(String, nullable=True)
+    order_count = Column(Integer, default=0, nullable=False)
+    last_order_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<Customer(store_id={self.store_id}, phone_digits='{self.phone_digits}')>"
+
+class Delivery(Base):
+    __tablename__ = "deliveries"
+    __table_args__ = (
+        Index("ix_deliveries_store_created_at", "store_id", "created_at"),
+        Index("ix_deliveries_owner_created_at", "store_owner_id", "created_at"),
+        Index("ix_deliveries_driver_change_seq", "driver_id", "change_seq"),
+        Index("ix_deliveries_owner_change_seq", "store_owner_id", "change_seq"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), index=True, nullable=False)
+    store_owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    driver_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=True)
+    customer_name = Column(String, nullable=False)
+    customer_phone = Column(String, nullable=False)
+    # National number digits for phone prefix search
+    customer_phone_digits = Column(String(15), index=True, nullable=True)
+    customer_address = Column(String, nullable=False)
+    customer_location = Column(String, nullable=True)
+    items = Column(Text, nullable=False)
+    special_instructions = Column(Text, nullable=True)
+    status = Column(Enum(DeliveryStatus), default=DeliveryStatus.PENDING, index=True, nullable=False)
+    total_amount = Column(Numeric(10, 2), default=0, nullable=False)
+    delivery_date = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Position in the global change order, for delta sync (set by app.sync)
+    change_seq = Column(BigInteger, index=True, nullable=True)
+    
+    # Loaded with one IN query per relationship for all deliveries a query
+    # returns, so listings cost the same number of queries at any page size
+    store = relationship("Store", lazy="selectin")
+    store_owner = relationship("User", foreign_keys=[store_owner_id], lazy="selectin")
+    driver = relationship("User", foreign_keys=[driver_id], lazy="selectin")
+    
+    @property
+    def store_name(self):
+        return self.store.name if self.store is not None else None
+    
+    @property
+    def store_owner_name(self):
+        return self.store_owner.username if self.store_owner is not None else None
+    
+    @property
+    def driver_name(self):
+        return self.driver.username if self.driver is not None else None
+    
+    def __repr__(self):
+        return f"<Delivery(id={self.id}, status='{self.status}')>"
+
+class DeliveryProof(Base):
+    """A proof-of-delivery photo; the file is shared by every upload with the same content."""
+    __tablename__ = "delivery_proofs"
+    __table_args__ = (
+        UniqueConstraint("delivery_id", "content_hash", name="uq_delivery_proofs_delivery_hash"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    # No foreign key: deliveries may be a partitioned table
+    delivery_id = Column(Integer, index=True, nullable=False)
+    content_hash = Column(String(64), index=True, nullable=False)
+    uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False, default="processing")
+    media_type = Column(String(32), nullable=True)
+    has_thumbnail = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SlotUsage(Base):
+    """Booked and allowed deliveries in one fixed-length time bucket of a store or driver."""
+    __tablename__ = "slot_usage"
+    __table_args__ = (
+        # Also serves day-range availability scans
+        UniqueConstraint("scope", "scope_id", "slot_start", name="uq_slot_usage_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(10), nullable=False)
+    scope_id = Column(Integer, nullable=False)
+    # Naive UTC, aligned to SLOT_MINUTES
+    slot_start = Column(DateTime, nullable=False)
+    capacity = Column(Integer, nullable=False)
+    booked = Column(Integer, nullable=False, default=0)
+
+class SlotBooking(Base):
+    """The delivery window a delivery holds capacity for."""
+    __tablename__ = "slot_bookings"
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: deliveries may be a partitioned table
+    delivery_id = Column(Integer, unique=True, nullable=False)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    driver_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    slot_start = Column(DateTime, nullable=False)
+    slot_end = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Job(Base):
+    """Deferred work picked up by the job workers (see app.jobs)."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order: runnable jobs, highest priority first, then oldest
+        Index("ix_jobs_claim", "status", "priority", "run_at"),
+        Index("ix_jobs_type_status", "job_type", "status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_type = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")
+    priority = Column(Integer, nullable=False, default=0)
+    status = Column(String(16), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # Naive UTC; not claimed before this (retry backoff, scheduled runs)
+    run_at = Column(DateTime, nullable=False)
+    enqueued_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    # Refreshed by the worker while the job runs; requeued when it goes stale
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    locked_by = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+class Notification(Base):
+    """A customer message about a delivery, sent in batches by the notifications.flush job."""
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # One message per delivery, event and channel however often the status flips
+        UniqueConstraint("delivery_id", "event", "channel", name="uq_notifications_delivery_event_channel"),
+        Index("ix_notifications_due", "status", "provider", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: deliveries may be a partitioned table
+    delivery_id = Column(Integer, index=True, nullable=False)
+    event = Column(String(32), nullable=False)
+    channel = Column(String(16), nullable=False)
+    provider = Column(String(32), nullable=False)
+    recipient = Column(String(20), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Naive UTC
+    next_attempt_at = Column(DateTime, nullable=False)
+    provider_message_id = Column(String(128), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+
+class SyncCounter(Base):
+    """Named monotonic counters; ``deliveries`` hands out Delivery.change_seq."""
+    __tablename__ = "sync_counters"
+    
+    name = Column(String(32), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+class SyncMutation(Base):
+    """An offline change already processed, so client retries are answered, not re-applied."""
+    __tablename__ = "sync_mutations"
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_id", name="uq_sync_mutations_user_client"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    client_id = Column(String(64), nullable=False)
+    # No foreign key: deliveries may be a partitioned table
+    delivery_id = Column(Integer, index=True, nullable=False)
+    result = Column(String(16), nullable=False)
+    change_seq = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class DeliveryRollup(Base):
+    """Pre-aggregated delivery counts and revenue.
+    
+    One row per (period, scope, scope_id, status) where period is an ISO day
+    or "all", and scope is "store", "driver" or "all" (scope_id 0).
+    """
+    __tablename__ = "delivery_rollups"
+    __table_args__ = (
+        UniqueConstraint("period", "scope", "scope_id", "status", name="uq_delivery_rollups_key"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    period = Column(String(10), nullable=False)
+    scope = Column(String(10), nullable=False)
+    scope_id = Column(Integer, nullable=False, default=0)
+    status = Column(Enum(DeliveryStatus), nullable=False)
+    delivery_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+class Invoice(Base):
+    """A store's bill for delivered orders created in [period_start, period_end)."""
+    __tablename__ = "invoices"
+    __table_args__ = (
+        UniqueConstraint("store_id", "period_start", "period_end", name="uq_invoices_store_period"),
+        Index("ix_invoices_owner_period", "store_owner_id", "period_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    store_owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)
+    # Sum of the delivered orders' totals, for reference on the bill
+    order_revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    rate_per_order = Column(Numeric(10, 2), nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    status = Column(Enum(InvoiceStatus), default=InvoiceStatus.PENDING, index=True, nullable=False)
+    payer_upi_id = Column(String, nullable=True)
+    paid_at = Column(DateTime(timezone=True), nullable=True)
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Invoice(store_id={self.store_id}, period_start={self.period_start}, amount={self.amount})>"
@@ -0,0 +1,303 @@
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional
+import httpx
+import structlog
+from sqlalchemy.orm import Session
+from app import jobs
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Delivery, DeliveryStatus, Job, Notification
+
+logger = structlog.get_logger()
+
+# Customer notifications on delivery status changes.
+# A status change inserts a notifications row in the same transaction (at
+# most one per delivery, event and channel, so flapping statuses do not spam
+# customers) and makes sure a notifications.flush job is queued for the
+# provider, delayed by NOTIFY_BATCH_DELAY_SECONDS so a store dispatching
+# dozens of orders produces one batch. The request never waits on the
+# gateway. The flush job runs one at a time, sends due messages in batches
+# paced to NOTIFY_RATE_PER_SECOND and retries failures with backoff.
+# Notifications are off unless NOTIFY_ENABLED is set, and the fake provider,
+# which delivers nothing, is refused outside DEBUG (check_settings) so a
+# production deployment cannot mark messages sent that never left.
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+FLUSH_JOB = "notifications.flush"
+
+# status -> (event, message template)
+EVENTS = {
+    DeliveryStatus.PICKED_UP: ("out_for_delivery", "Order #{id} from {store} is out for delivery."),
+    DeliveryStatus.DELIVERED: ("delivered", "Order #{id} from {store} has been delivered. Thank you!"),
+    DeliveryStatus.CANCELLED: ("cancelled", "Order #{id} from {store} has been cancelled."),
+}
+
+@dataclass
+class OutgoingMessage:
+    reference: int
+    to: str
+    body: str
+    channel: str
+
+@dataclass
+class SendResult:
+    reference: int
+    ok: bool
+    provider_message_id: Optional[str] = None
+    error: Optional[str] = None
+
+class Gateway:
+    """A message provider. ``send_batch`` returns one result per message or raises for the whole batch."""
+
+    name = ""
+    max_batch = 100
+
+    def send_batch(self, messages: List[OutgoingMessage]) -> List[SendResult]:
+        raise NotImplementedError
+
+class FakeGateway(Gateway):
+    """Keeps the last ``keep`` sent messages in memory; set ``fail_next`` to make the next sends fail."""
+
+    name = "fake"
+
+    def __init__(self, keep: int = 1000):
+        self.sent: Deque[OutgoingMessage] = deque(maxlen=keep)
+        self.sent_count = 0
+        self.batches = 0
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: List[OutgoingMessage]) -> List[SendResult]:
+        results = []
+        with self._lock:
+            self.batches += 1
+            for message in messages:
+                if self.fail_next > 0:
+                    self.fail_next -= 1
+                    results.append(SendResult(message.reference, False, error="Simulated failure"))
+                    continue
+                self.sent.append(message)
+                self.sent_count += 1
+                results.append(SendResult(message.reference, True, f"fake-{self.sent_count}"))
+        logger.info("Fake gateway batch", messages=len(messages))
+        return results
+
+class WebhookGateway(Gateway):
+    """POSTs ``{"messages": [{reference, to, body, channel}]}`` to an SMS/WhatsApp relay.
+
+    Any 2xx response accepts the whole batch; an optional ``ids`` list in the
+    JSON response gives the provider's message ids in order.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url: str, token: str = "", timeout: float = 10.0):
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.timeout = timeout
+
+    def send_batch(self, messages: List[OutgoingMessage]) -> List[SendResult]:
+        response = httpx.post(
+            self.url,
+            json={"messages": [message.__dict__ for message in messages]},
+            headers=self.headers,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        ids = []
+        if response.content:
+            ids = response.json().get("ids") or []
+        return [
+            SendResult(message.reference, True, str(ids[i]) if i < len(ids) else None)
+            for i, message in enumerate(messages)
+        ]
+
+gateways: Dict[str, Gateway] = {}
+
+def register_gateway(gateway: Gateway):
+    gateways[gateway.name] = gateway
+
+register_gateway(FakeGateway())
+if settings.NOTIFY_GATEWAY_URL:
+    register_gateway(WebhookGateway(settings.NOTIFY_GATEWAY_URL, settings.NOTIFY_GATEWAY_TOKEN,
+                                    settings.NOTIFY_GATEWAY_TIMEOUT_SECONDS))
+
+def check_settings():
+    """Refuse to start with notifications on and no way to deliver them."""
+    if not settings.NOTIFY_ENABLED:
+        return
+    if settings.NOTIFY_PROVIDER not in gateways:
+        raise RuntimeError(f"Unknown notification provider {settings.NOTIFY_PROVIDER} (is NOTIFY_GATEWAY_URL set?)")
+    if settings.NOTIFY_PROVIDER == FakeGateway.name and not settings.DEBUG:
+        raise RuntimeError("NOTIFY_PROVIDER=fake delivers nothing; set a real provider or NOTIFY_ENABLED=false")
+
+class RateLimiter:
+    """Token bucket pacing sends to ``rate`` messages per second, with bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= count
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+_limiters: Dict[str, RateLimiter] = {}
+
+def _limiter(provider: str) -> RateLimiter:
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        limiter = _limiters[provider] = RateLimiter(settings.NOTIFY_RATE_PER_SECOND, settings.NOTIFY_BATCH_SIZE)
+    return limiter
+
+def _insert_ignore(db: Session, row: dict) -> bool:
+    """Insert unless the (delivery, event, channel) message already exists; True if inserted."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(Notification).values(row).on_conflict_do_nothing(
+            index_elements=["delivery_id", "event", "channel"]
+        )
+        return db.execute(stmt).rowcount == 1
+
+    exists = db.query(Notification.id).filter(
+        Notification.delivery_id == row["delivery_id"],
+        Notification.event == row["event"],
+        Notification.channel == row["channel"]
+    ).first()
+    if exists is None:
+        db.add(Notification(**row))
+        db.flush()
+    return exists is None
+
+def _flush_payload(provider: str) -> str:
+    return json.dumps({"provider": provider})
+
+def ensure_flush(db: Session, provider: str, delay_seconds: float):
+    """Queue a flush of ``provider`` unless one is already waiting."""
+    waiting = db.query(Job.id).filter(
+        Job.job_type == FLUSH_JOB, Job.status == jobs.QUEUED, Job.payload == _flush_payload(provider)
+    ).first()
+    if waiting is None:
+        jobs.enqueue(db, FLUSH_JOB, {"provider": provider}, delay_seconds=delay_seconds)
+        # Sessions do not autoflush; later calls in this transaction must see the job
+        db.flush()
+
+def recipient(delivery: Delivery) -> Optional[str]:
+    if not delivery.customer_phone_digits:
+        return None
+    return f"+{settings.PHONE_COUNTRY_CODE}{delivery.customer_phone_digits}"
+
+def notify_status_change(db: Session, delivery: Delivery) -> bool:
+    """Queue the customer message for a delivery's new status in the caller's transaction.
+
+    Returns False when the status has no message, the customer has no
+    usable phone number, or the message was already queued.
+    """
+    if not settings.NOTIFY_ENABLED or delivery.status not in EVENTS:
+        return False
+    to = recipient(delivery)
+    if to is None:
+        return False
+    event, template = EVENTS[delivery.status]
+    provider = settings.NOTIFY_PROVIDER
+    inserted = _insert_ignore(db, {
+        "delivery_id": delivery.id,
+        "event": event,
+        "channel": settings.NOTIFY_CHANNEL,
+        "provider": provider,
+        "recipient": to,
+        "body": template.format(id=delivery.id, store=delivery.store_name or "the store"),
+        "status": PENDING,
+        "attempts": 0,
+        "next_attempt_at": datetime.utcnow(),
+    })
+    if inserted:
+        ensure_flush(db, provider, settings.NOTIFY_BATCH_DELAY_SECONDS)
+    return inserted
+
+def _record(notification: Notification, result: SendResult, now: datetime):
+    notification.attempts += 1
+    if result.ok:
+        notification.status = SENT
+        notification.sent_at = now
+        notification.provider_message_id = result.provider_message_id
+        notification.last_error = None
+        return
+    notification.last_error = result.error
+    if notification.attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+        notification.status = FAILED
+    else:
+        notification.next_attempt_at = now + timedelta(
+            seconds=settings.NOTIFY_RETRY_BASE_SECONDS * 2 ** (notification.attempts - 1)
+        )
+
+def flush(provider: str) -> int:
+    """Send every due message of ``provider`` in batches (the notifications.flush job).
+
+    Failed messages are retried later by a delayed flush. Returns the number
+    of messages sent.
+    """
+    gateway = gateways.get(provider)
+    if gateway is None:
+        raise ValueError(f"Unknown notification provider {provider}")
+    batch_size = min(settings.NOTIFY_BATCH_SIZE, gateway.max_batch)
+    sent = 0
+    while True:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            batch = db.query(Notification).filter(
+                Notification.status == PENDING,
+                Notification.provider == provider,
+                Notification.next_attempt_at <= now
+            ).order_by(Notification.id).limit(batch_size).all()
+            if not batch:
+                retry_at = db.query(Notification.next_attempt_at).filter(
+                    Notification.status == PENDING, Notification.provider == provider
+                ).order_by(Notification.next_attempt_at).limit(1).scalar()
+                if retry_at is not None:
+                    ensure_flush(db, provider, max((retry_at - now).total_seconds(), 0))
+                    db.commit()
+                return sent
+
+            _limiter(provider).acquire(len(batch))
+            messages = [OutgoingMessage(n.id, n.recipient, n.body, n.channel) for n in batch]
+            try:
+                results = {result.reference: result for result in gateway.send_batch(messages)}
+            except Exception as exc:
+                logger.warning("Notification batch failed", provider=provider, messages=len(batch), error=str(exc))
+                results = {}
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                error = "No result from provider"
+
+            now = datetime.utcnow()
+            for notification in batch:
+                _record(notification, results.get(notification.id) or SendResult(notification.id, False, error=error), now)
+            batch_sent = sum(1 for notification in batch if notification.status == SENT)
+            db.commit()
+            sent += batch_sent
+            logger.info("Notifications sent", provider=provider, sent=batch_sent, batch=len(batch))
+        finally:
+            db.close()
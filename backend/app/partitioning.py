@@ -0,0 +1,148 @@
+from datetime import date, datetime
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import AddConstraint
+from app.models import Delivery
+
+# Monthly range partitions of ``deliveries`` on created_at (Postgres only).
+# SQLite has no partitioning; there the archival job in app/archive.py is
+# what keeps the live table small, and its per-month archive files take the
+# place of old partitions.
+#
+# Upcoming months' partitions are created at startup and by the recurring
+# partitions.ensure job. Rows inserted while a month had no partition land in
+# the default partition; Postgres refuses to create a partition whose range
+# the default partition holds rows for, so ensure_partitions moves those rows
+# out first and back in once the partition exists.
+
+PARENT = "deliveries"
+DEFAULT_PARTITION = "deliveries_default"
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def months_between(first: date, last: date) -> List[date]:
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"
+    ), {"name": PARENT}).first() is not None
+
+def _exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+def create_partition(conn: Connection, month: date):
+    start, end = month, add_months(month, 1)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    ))
+
+def create_partition_from_default(conn: Connection, month: date) -> int:
+    """Create the partition of ``month``, moving its rows out of the default partition.
+
+    Returns the number of rows moved. Runs in the caller's transaction, so
+    the rows are never missing to other transactions.
+    """
+    start, end = month, add_months(month, 1)
+    moved = 0
+    if _exists(conn, DEFAULT_PARTITION):
+        # Block writers (parent first, as inserts lock it) so no row lands in
+        # the default partition between the move and the partition's creation
+        conn.execute(text(f"LOCK TABLE {PARENT} IN SHARE ROW EXCLUSIVE MODE"))
+        bounds = {"start": f"{start.isoformat()} 00:00:00+00", "end": f"{end.isoformat()} 00:00:00+00"}
+        in_range = "created_at >= CAST(:start AS timestamptz) AND created_at < CAST(:end AS timestamptz)"
+        conn.execute(text(
+            f"CREATE TEMPORARY TABLE deliveries_moving ON COMMIT DROP AS "
+            f"SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"
+        ), bounds)
+        moved = conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds).rowcount
+    create_partition(conn, month)
+    if _exists(conn, DEFAULT_PARTITION):
+        conn.execute(text(f"INSERT INTO {PARENT} SELECT * FROM deliveries_moving"))
+        conn.execute(text("DROP TABLE deliveries_moving"))
+    return moved
+
+def ensure_partitions(conn: Connection, months_ahead: int = 2) -> int:
+    """Create missing partitions for the current month and ``months_ahead`` after it.
+
+    Returns the number of partitions created.
+    """
+    if not is_partitioned(conn):
+        return 0
+    current = month_start(datetime.utcnow())
+    created = 0
+    for month in months_between(current, add_months(current, months_ahead)):
+        if _exists(conn, partition_name(month)):
+            continue
+        create_partition_from_default(conn, month)
+        created += 1
+    return created
+
+def partition_deliveries(engine: Engine, months_ahead: int = 2) -> bool:
+    """Convert ``deliveries`` into a monthly range-partitioned table in place.
+
+    Runs in one transaction: the existing table is renamed, a partitioned
+    copy with primary key (id, created_at) is created with one partition
+    per month of existing data plus a default partition, rows are copied
+    over and the model's indexes and foreign keys are recreated on the
+    parent. Returns False when there is nothing to do.
+    """
+    with engine.begin() as conn:
+        if conn.dialect.name != "postgresql" or is_partitioned(conn):
+            return False
+        referencing = conn.execute(text(
+            "SELECT conname FROM pg_constraint WHERE confrelid = to_regclass(:name)"
+        ), {"name": PARENT}).scalars().all()
+        if referencing:
+            raise RuntimeError(
+                f"Foreign keys reference {PARENT} ({', '.join(referencing)}); "
+                "Postgres cannot keep them on a partitioned table"
+            )
+
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence(:name, 'id')"), {"name": PARENT}).scalar()
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+        conn.execute(text(f"UPDATE {PARENT} SET created_at = now() WHERE created_at IS NULL"))
+        conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {PARENT}_unpartitioned"))
+        conn.execute(text(
+            f"CREATE TABLE {PARENT} (LIKE {PARENT}_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (created_at)"
+        ))
+        conn.execute(text(f"ALTER TABLE {PARENT} ADD PRIMARY KEY (id, created_at)"))
+
+        oldest = conn.execute(text(f"SELECT min(created_at) FROM {PARENT}_unpartitioned")).scalar()
+        current = month_start(datetime.utcnow())
+        first = month_start(oldest) if oldest is not None else current
+        for month in months_between(first, add_months(current, months_ahead)):
+            create_partition(conn, month)
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+        conn.execute(text(f"INSERT INTO {PARENT} SELECT * FROM {PARENT}_unpartitioned"))
+        conn.execute(text(f"DROP TABLE {PARENT}_unpartitioned"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT}.id"))
+
+        # Indexes on the parent cascade to every partition, current and future
+        for index in Delivery.__table__.indexes:
+            index.create(conn)
+        for constraint in Delivery.__table__.foreign_key_constraints:
+            conn.execute(AddConstraint(constraint))
+        conn.execute(text(f"ANALYZE {PARENT}"))
+    return True
@@ -0,0 +1,192 @@
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.auth import verify_token
+from app.config import settings
+from app.models import UserRole
+
+PROFILE_HEADER = b"x-profile"
+# Long-lived server-sent event streams would be sampled until the client leaves
+UNPROFILED_SUFFIXES = ("/stream",)
+# Stacks whose innermost frame is in these modules are idle threads
+# (event loop waiting in select, threadpool workers waiting for work)
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+class Profile:
+    """Collapsed-stack samples for one profiled request.
+
+    ``collapsed()`` returns the "frame;frame;frame count" format read by
+    flamegraph.pl, speedscope and most flamegraph viewers.
+    """
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._started = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 2)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+        }
+
+class Sampler:
+    """One sampling thread shared by every profile in progress.
+
+    Each tick walks the worker's thread stacks once and adds them to all
+    attached profiles, so the cost does not grow with the number of
+    concurrently profiled requests. The thread sleeps while nothing is
+    attached.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: List[Profile] = []
+        self._wake = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, profile: Profile):
+        with self._wake:
+            profile.start()
+            self._profiles.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def detach(self, profile: Profile):
+        with self._wake:
+            self._profiles.remove(profile)
+            profile.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._wake:
+                while not self._profiles:
+                    self._wake.wait()
+            time.sleep(self.interval)
+            stacks = [
+                _collapse(frame) for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id and not frame.f_code.co_filename.endswith(IDLE_MODULES)
+            ]
+            with self._wake:
+                for profile in self._profiles:
+                    profile.stacks.update(stacks)
+                    profile.samples += 1
+
+def _collapse(frame) -> str:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+class ProfileStore:
+    """The most recent profiles taken by this worker."""
+
+    def __init__(self, max_profiles: int):
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+profile_store = ProfileStore(settings.PROFILE_MAX_STORED)
+
+def _requested_by_developer(headers: Dict[bytes, bytes]) -> bool:
+    if headers.get(PROFILE_HEADER) not in (b"1", b"true"):
+        return False
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    # Token claims only: this runs on the event loop for every request
+    try:
+        claims = verify_token(token, HTTPException(status_code=401))
+    except HTTPException:
+        return False
+    return claims.role == UserRole.DEVELOPER
+
+class ProfilingMiddleware:
+    """Statistical profiling of selected requests.
+
+    A request is profiled when a developer sends ``X-Profile: 1`` or when it
+    is picked by ``sample_rate``. Samples cover every busy thread in the
+    worker, so concurrent requests show up in the profile too. The profile
+    id is returned in the ``X-Profile-Id`` header. SSE streams are never
+    profiled.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.0, interval: float = 0.005):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.sampler = Sampler(interval)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or scope["path"].startswith("/debug/")
+                or scope["path"].endswith(UNPROFILED_SUFFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and not _requested_by_developer(headers):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], self.interval)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (b"x-profile-id", profile.id.encode("latin-1"))]}
+            await send(message)
+
+        self.sampler.attach(profile)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.sampler.detach(profile)
+            profile_store.add(profile)
@@ -0,0 +1,274 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Optional
+import structlog
+from sqlalchemy.orm import Session
+from app import imaging, jobs
+from app.config import settings
+from app.database import SessionLocal
+from app.models import DeliveryProof
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = structlog.get_logger()
+
+# Proof-of-delivery photos under PROOF_DIR, addressed by the SHA-256 of the
+# uploaded bytes so the same photo is stored and processed once:
+#   incoming/<uuid>.part     upload being received
+#   originals/<hash>         received, waiting for a worker (never served)
+#   images/<h[:2]>/<hash>    metadata-stripped image
+#   thumbs/<h[:2]>/<hash>    JPEG thumbnail (needs Pillow)
+# Stripping and thumbnailing run as proofs.process jobs, off the request
+# path. The job hands the decoding to a pool of PROOF_WORKERS processes, so
+# large photos never hold the GIL of the process running the job (an API
+# worker when jobs run in-process).
+
+PROCESSING = "processing"
+READY = "ready"
+FAILED = "failed"
+
+PROCESS_JOB = "proofs.process"
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _proof_executor() -> ProcessPoolExecutor:
+    """The image process pool, started on first use so processes that never run the job do not spawn it."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that already runs threads can deadlock the child
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PROOF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+def shutdown_proof_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def _path(kind: str, content_hash: str) -> str:
+    if kind in ("images", "thumbs"):
+        return os.path.join(settings.PROOF_DIR, kind, content_hash[:2], content_hash)
+    return os.path.join(settings.PROOF_DIR, kind, content_hash)
+
+def image_path(content_hash: str) -> str:
+    return _path("images", content_hash)
+
+def thumbnail_path(content_hash: str) -> str:
+    return _path("thumbs", content_hash)
+
+# Enough leading bytes for every signature imaging.sniff checks
+SNIFF_BYTES = 16
+
+class _Receiver:
+    """multipart callbacks that hash and write the ``file`` part to disk as it arrives."""
+
+    def __init__(self, field_name: str, max_bytes: int):
+        self.field_name = field_name
+        self.max_bytes = max_bytes
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.media_type: Optional[str] = None
+        # First bytes of the file, kept until there are enough to sniff the type
+        self._head = b""
+        self.path: Optional[str] = None
+        self.file = None
+        self.done = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_file_part = False
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._in_file_part = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if options.get(b"name") == self.field_name.encode() and b"filename" in options:
+            if self.file is not None:
+                raise UploadError(400, "Only one file per upload")
+            incoming = os.path.join(settings.PROOF_DIR, "incoming")
+            os.makedirs(incoming, exist_ok=True)
+            self.path = os.path.join(incoming, f"{uuid.uuid4().hex}.part")
+            self.file = open(self.path, "wb")
+            self._in_file_part = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_file_part:
+            return
+        chunk = data[start:end]
+        if self.media_type is None:
+            # The parser may hand over the first bytes in pieces smaller than the signature
+            self._head += chunk[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadError(413, "Photo too large")
+        self.hasher.update(chunk)
+        # Small sequential writes land in the page cache; not worth a thread hop per chunk
+        self.file.write(chunk)
+
+    def _sniff(self):
+        self.media_type = imaging.sniff(self._head)
+        if self.media_type is None:
+            raise UploadError(415, "Unsupported image type")
+
+    def on_part_end(self):
+        if self._in_file_part:
+            if self.media_type is None and self.size > 0:
+                self._sniff()
+            self.file.close()
+            self._in_file_part = False
+            self.done = True
+
+    def discard(self):
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+async def receive_upload(content_type: str, stream: AsyncIterator[bytes], field_name: str = "file",
+                         max_bytes: Optional[int] = None):
+    """Stream a multipart body's file part to disk while hashing it.
+
+    Memory use is bounded by the chunk size whatever the photo size.
+    Returns ``(content_hash, size, media_type)`` with the file moved to
+    originals/ (or dropped when the processed image already exists).
+    """
+    kind, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if kind != b"multipart/form-data" or not boundary:
+        raise UploadError(400, "Expected multipart/form-data")
+
+    receiver = _Receiver(field_name, max_bytes or settings.PROOF_MAX_BYTES)
+    callbacks = {name: getattr(receiver, name) for name in (
+        "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+        "on_headers_finished", "on_part_data", "on_part_end",
+    )}
+    parser = MultipartParser(boundary, callbacks)
+    try:
+        async for chunk in stream:
+            parser.write(chunk)
+        parser.finalize()
+        if not receiver.done or receiver.size == 0:
+            raise UploadError(400, f"Missing {field_name} part")
+    except BaseException:
+        receiver.discard()
+        raise
+
+    content_hash = receiver.hasher.hexdigest()
+    if os.path.exists(image_path(content_hash)):
+        os.remove(receiver.path)
+    else:
+        original = _path("originals", content_hash)
+        os.makedirs(os.path.dirname(original), exist_ok=True)
+        os.replace(receiver.path, original)
+    return content_hash, receiver.size, receiver.media_type
+
+def _record_result(db: Session, content_hash: str, status: str, media_type: Optional[str] = None,
+                   has_thumbnail: bool = False):
+    db.query(DeliveryProof).filter(
+        DeliveryProof.content_hash == content_hash, DeliveryProof.status == PROCESSING
+    ).update({
+        DeliveryProof.status: status,
+        DeliveryProof.media_type: media_type,
+        DeliveryProof.has_thumbnail: has_thumbnail,
+    }, synchronize_session=False)
+
+def _existing_result(db: Session, content_hash: str):
+    """Media type and thumbnail flag of an image processed for an earlier upload."""
+    row = db.query(DeliveryProof.media_type, DeliveryProof.has_thumbnail).filter(
+        DeliveryProof.content_hash == content_hash, DeliveryProof.status == READY
+    ).first()
+    if row is not None:
+        return row.media_type, row.has_thumbnail
+    with open(image_path(content_hash), "rb") as f:
+        media_type = imaging.sniff(f.read(16))
+    return media_type, os.path.exists(thumbnail_path(content_hash))
+
+def _remove_original(content_hash: str):
+    # The original still carries EXIF (often the customer's GPS position)
+    original = _path("originals", content_hash)
+    if os.path.exists(original):
+        os.remove(original)
+
+def schedule_processing(db: Session, content_hash: str) -> bool:
+    """Queue stripping and thumbnailing of a received photo in the caller's transaction.
+
+    A photo processed for an earlier upload is marked ready straight away;
+    returns whether a job was queued.
+    """
+    if os.path.exists(image_path(content_hash)):
+        _record_result(db, content_hash, READY, *_existing_result(db, content_hash))
+        _remove_original(content_hash)
+        return False
+    jobs.enqueue(db, PROCESS_JOB, {"content_hash": content_hash})
+    return True
+
+def process(content_hash: str):
+    """Write the stripped image and thumbnail of an original and mark its proofs (the proofs.process job)."""
+    original = _path("originals", content_hash)
+    db = SessionLocal()
+    try:
+        if os.path.exists(image_path(content_hash)):
+            # Another job for the same photo got there first
+            _record_result(db, content_hash, READY, *_existing_result(db, content_hash))
+        elif not os.path.exists(original):
+            _record_result(db, content_hash, FAILED)
+            logger.warning("Proof original missing", content_hash=content_hash)
+        else:
+            try:
+                media_type, has_thumbnail = _proof_executor().submit(
+                    imaging.process_image,
+                    original,
+                    image_path(content_hash),
+                    thumbnail_path(content_hash),
+                    settings.PROOF_THUMBNAIL_SIZE,
+                ).result()
+            except BrokenProcessPool:
+                # A pool process died (e.g. out of memory); start a new pool and let the job retry
+                shutdown_proof_executor()
+                raise
+            except Exception as exc:
+                # Undecodable upload: retrying will not help
+                _record_result(db, content_hash, FAILED)
+                logger.warning("Proof processing failed", content_hash=content_hash, error=str(exc))
+            else:
+                _record_result(db, content_hash, READY, media_type, has_thumbnail)
+                logger.info("Proof processed", content_hash=content_hash)
+        db.commit()
+    finally:
+        db.close()
+    _remove_original(content_hash)
@@ -0,0 +1,124 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import structlog
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import RevokedToken
+
+logger = structlog.get_logger()
+
+# Ids re-read below the high-water mark on each sync, so rows whose
+# transactions commit out of id order on Postgres are not missed
+SYNC_ID_OVERLAP = 64
+
+class RevocationStore:
+    """Revoked-but-unexpired access token ids, checked in O(1) per request.
+
+    Each worker keeps the ids in a dict (jti -> exp) with a min-heap on
+    expiry, so entries disappear exactly when the token would have expired
+    anyway and the set only ever holds at most ACCESS_TOKEN_EXPIRE_MINUTES
+    worth of logouts. Revocations are written to ``revoked_tokens``; other
+    workers pick them up by polling rows with an id above the last one seen,
+    at most once every REVOCATION_SYNC_SECONDS. That poll is the only
+    database access on the request path and is shared by all requests in
+    the interval.
+    """
+
+    def __init__(self, sync_interval: float = None):
+        self.sync_interval = settings.REVOCATION_SYNC_SECONDS if sync_interval is None else sync_interval
+        self._revoked: Dict[str, float] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._last_id = 0
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def _add(self, jti: str, exp: float):
+        if jti not in self._revoked:
+            self._revoked[jti] = exp
+            heapq.heappush(self._expiry, (exp, jti))
+
+    def _expire(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry)
+            self._revoked.pop(jti, None)
+
+    def revoke(self, jti: str, expires_at: datetime, db: Optional[Session] = None):
+        """Revoke a token id until ``expires_at`` (naive UTC).
+
+        With ``db`` the row is added to the caller's transaction, which the
+        caller commits; otherwise it is committed here.
+        """
+        exp = _epoch(expires_at)
+        if exp <= time.time():
+            return
+        with self._lock:
+            self._add(jti, exp)
+        if db is not None:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            return
+        db = SessionLocal()
+        try:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+
+    def is_revoked(self, jti: str) -> bool:
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        exp = self._revoked.get(jti)
+        return exp is not None and exp > time.time()
+
+    def sync(self):
+        """Pull revocations recorded by other workers and drop expired ones.
+
+        If the database is unavailable the current set keeps being served
+        and the next attempt waits for the sync interval, so requests do
+        not each retry the query.
+        """
+        if not self._lock.acquire(blocking=False):
+            # Another thread is already syncing; answer from the current set
+            return
+        try:
+            now = time.time()
+            db = SessionLocal()
+            try:
+                query = db.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at).filter(
+                    RevokedToken.id > self._last_id - SYNC_ID_OVERLAP
+                )
+                if self._last_id == 0:
+                    query = query.filter(RevokedToken.expires_at > datetime.utcnow())
+                for row_id, jti, expires_at in query.order_by(RevokedToken.id):
+                    self._add(jti, _epoch(expires_at))
+                    self._last_id = max(self._last_id, row_id)
+            except SQLAlchemyError as exc:
+                logger.warning("Revocation sync failed", error=str(exc))
+            finally:
+                db.close()
+            self._expire(now)
+        finally:
+            self._next_sync = time.monotonic() + self.sync_interval
+            self._lock.release()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        return (value - datetime(1970, 1, 1)).total_seconds()
+    return value.timestamp()
+
+def purge_expired_revocations(db) -> int:
+    """Delete revocation rows whose tokens have expired. Caller commits."""
+    return db.query(RevokedToken).filter(
+        RevokedToken.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+
+revocation_store = RevocationStore()
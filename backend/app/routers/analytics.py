@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.models import Store
+from app.schemas import AnalyticsSummary
+from app import analytics
+
+router = APIRouter()
+
+@router.get("/summary", response_model=AnalyticsSummary)
+def read_summary(db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Dashboard aggregate cards, served from the rollup tables."""
+    cache_key = (current_user.role.value, current_user.id)
+    cached = analytics.summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if current_user.role.value == "developer":
+        summary = analytics.build_summary(db, "all")
+    elif current_user.role.value == "store_owner":
+        store_ids = [store_id for (store_id,) in db.query(Store.id).filter(Store.owner_id == current_user.id)]
+        summary = analytics.build_summary(db, "store", store_ids)
+    else:
+        summary = analytics.build_summary(db, "driver", [current_user.id])
+
+    analytics.summary_cache.set(cache_key, summary)
+    return summary
@@ -1,11 +1,21 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import User, UserRole
-from app.schemas import UserCreate, User as UserSchema, Token
-from app.auth import verify_password, get_password_hash, create_access_token, get_current_active_user
+from app.models import User, UserRole, RefreshToken
+from app.schemas import UserCreate, User as UserSchema, Token, TokenRefresh, PasswordChanged
+from app.auth import (
+    verify_password,
+    get_password_hash,
+    create_access_token,
+    get_current_active_user,
+    CurrentUser,
+    issue_token_pair,
+    rotate_refresh_token,
+    revoke_user_tokens
+)
 from app.config import settings
 from app.security import (
     SecurityUtils, 
@@ -14,6 +24,8 @@ from app.security import (
     is_account_locked,
     RateLimitMiddleware
 )
+from app.revocation import revocation_store, purge_expired_revocations
+from app.bootstrap import bootstrap_cache
 import structlog
 
 logger = structlog.get_logger()
@@ -59,7 +71,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
             )
         
         # Create new user with secure password hashing
-        hashed_password = SecurityUtils.hash_password(user.password)
+        hashed_password = await SecurityUtils.hash_password_async(user.password)
         db_user = User(
             username=username,
             email=email,
@@ -69,6 +81,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        bootstrap_cache.invalidate()
         
         logger.info(
             "User registered successfully",
@@ -126,7 +139,7 @@ async def login(
             )
         
         # Verify password
-        if not SecurityUtils.verify_password(form_data.password, user.hashed_password):
+        if not await SecurityUtils.verify_password_async(form_data.password, user.hashed_password):
             track_login_attempt(username, False)
             logger.warning(
                 "Failed login attempt",
@@ -155,12 +168,9 @@ async def login(
         # Successful login
         track_login_attempt(username, True)
         
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = SecurityUtils.create_access_token(
-            data={"sub": user.username}, 
-            expires_delta=access_token_expires
-        )
+        # Create access and refresh tokens
+        tokens = issue_token_pair(db, user)
+        db.commit()
         
         logger.info(
             "Successful login",
@@ -168,11 +178,7 @@ async def login(
             client_ip=request.client.host if request else "unknown"
         )
         
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": user
-        }
+        return tokens
         
     except HTTPException:
         raise
@@ -183,31 +189,78 @@ async def login(
             detail="Login failed"
         )
 
+@router.post("/refresh", response_model=Token)
+async def refresh(body: TokenRefresh, db: Session = Depends(get_db), request: Request = None):
+    """Exchange a refresh token for a new access/refresh token pair (rotation)."""
+    tokens, reason = rotate_refresh_token(db, body.refresh_token)
+    if tokens is None:
+        log = logger.warning if reason == "reused" else logger.info
+        log(
+            "Refresh token rejected",
+            reason=reason,
+            client_ip=request.client.host if request else "unknown"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return tokens
+
 @router.post("/logout")
-async def logout(request: Request = None):
-    """Logout user (client-side token invalidation)."""
+async def logout(
+    body: Optional[TokenRefresh] = None,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    """Logout user by revoking the current access token and, if given, its refresh token."""
+    revocation_store.revoke(current_user.token_id, current_user.token_expires_at)
+    
+    if body is not None:
+        payload = SecurityUtils.verify_token(body.refresh_token)
+        if payload and payload.get("type") == "refresh" and payload.get("uid") == current_user.id:
+            db.query(RefreshToken).filter(
+                RefreshToken.jti == payload.get("jti"),
+                RefreshToken.revoked_at.is_(None)
+            ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    purge_expired_revocations(db)
+    db.commit()
+    
     logger.info(
         "User logout",
+        username=current_user.username,
         client_ip=request.client.host if request else "unknown"
     )
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserSchema)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: CurrentUser = Depends(get_current_active_user), db: Session = Depends(get_db)):
     """Get current user information."""
-    return current_user
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return user
 
-@router.post("/change-password")
+@router.post("/change-password", response_model=PasswordChanged)
 async def change_password(
     current_password: str,
     new_password: str,
-    current_user: User = Depends(get_current_active_user),
+    current_user: CurrentUser = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Change user password with security validation."""
+    """Change user password with security validation.
+
+    Signs out every session, including the caller's, and returns a new
+    token pair for the caller to continue with.
+    """
     try:
+        user = db.query(User).filter(User.id == current_user.id).first()
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        
         # Verify current password
-        if not SecurityUtils.verify_password(current_password, current_user.hashed_password):
+        if not await SecurityUtils.verify_password_async(current_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
@@ -222,15 +275,17 @@ async def change_password(
             )
         
         # Hash new password
-        new_hashed_password = SecurityUtils.hash_password(new_password)
+        new_hashed_password = await SecurityUtils.hash_password_async(new_password)
         
-        # Update password
-        current_user.hashed_password = new_hashed_password
+        # Update password, sign out every session and start a new one for the caller
+        user.hashed_password = new_hashed_password
+        revoke_user_tokens(db, user)
+        tokens = issue_token_pair(db, user)
         db.commit()
         
         logger.info("Password changed successfully", username=current_user.username)
         
-        return {"message": "Password changed successfully"}
+        return {"message": "Password changed successfully", **tokens}
         
     except HTTPException:
         raise
@@ -242,7 +297,7 @@ async def change_password(
         )
 
 @router.get("/security-status")
-async def get_security_status(current_user: User = Depends(get_current_active_user)):
+async def get_security_status(current_user: CurrentUser = Depends(get_current_active_user)):
     """Get security status for current user."""
     return {
         "username": current_user.username,
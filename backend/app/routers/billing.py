@@ -0,0 +1,117 @@
+import time
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db, get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.config import settings
+from app.models import Invoice, InvoiceStatus
+from app.schemas import (
+    BillingAccount, BillingRun, BillingRunResult, InvoicePayment, Invoice as InvoiceSchema
+)
+from app.security import InputValidation
+from app.serialization import serialize_list
+from app import billing
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+def scoped_invoices(db: Session, current_user: CurrentUser):
+    """Invoices visible to the current user: all for developers, their own for store owners."""
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    query = db.query(Invoice)
+    if current_user.role.value == "store_owner":
+        query = query.filter(Invoice.store_owner_id == current_user.id)
+    return query
+
+@router.get("/account", response_model=BillingAccount)
+def read_account(current_user: CurrentUser = Depends(get_current_active_user)):
+    """Where store owners pay their bills, and the current rate per delivered order."""
+    return {
+        "upi_id": settings.BILLING_RECEIVING_UPI_ID,
+        "mobile": settings.BILLING_RECEIVING_MOBILE,
+        "rate_per_order": settings.BILLING_RATE_PER_ORDER,
+    }
+
+@router.post("/invoices/generate", response_model=BillingRunResult)
+def generate_invoices(run: BillingRun, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """(Re)compute every store's invoice for [start, end) from delivered orders."""
+    if current_user.role.value != "developer":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if run.start >= run.end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if run.end - run.start > timedelta(days=settings.BILLING_MAX_PERIOD_DAYS):
+        raise HTTPException(status_code=400, detail="Billing period too long")
+    if run.end > datetime.utcnow().date() + timedelta(days=1):
+        raise HTTPException(status_code=400, detail="Billing period must not end in the future")
+
+    started = time.perf_counter()
+    try:
+        count = billing.generate_invoices(db, run.start, run.end, run.rate_per_order, run.store_ids)
+    except billing.OverlappingPeriod as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    seconds = round(time.perf_counter() - started, 3)
+    logger.info("Invoices generated", start=run.start.isoformat(), end=run.end.isoformat(), invoices=count, seconds=seconds)
+    return {"start": run.start, "end": run.end, "invoices": count, "seconds": seconds}
+
+@router.get("/invoices", response_model=List[InvoiceSchema])
+def read_invoices(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    store_id: Optional[int] = None,
+    status: Optional[InvoiceStatus] = None,
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Invoices whose period starts in [start, end), newest first."""
+    query = scoped_invoices(db, current_user)
+    if start is not None:
+        query = query.filter(Invoice.period_start >= start)
+    if end is not None:
+        query = query.filter(Invoice.period_start < end)
+    if store_id is not None:
+        query = query.filter(Invoice.store_id == store_id)
+    if status is not None:
+        query = query.filter(Invoice.status == status)
+    invoices = query.order_by(Invoice.period_start.desc(), Invoice.store_id).offset(skip).limit(limit).all()
+    return serialize_list(InvoiceSchema, invoices)
+
+@router.get("/invoices/{invoice_id}", response_model=InvoiceSchema)
+def read_invoice(invoice_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    invoice = scoped_invoices(db, current_user).filter(Invoice.id == invoice_id).first()
+    if invoice is None:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return invoice
+
+@router.post("/invoices/{invoice_id}/pay", response_model=InvoiceSchema)
+def mark_invoice_paid(
+    invoice_id: int,
+    payment: InvoicePayment,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Record that an invoice was paid; paid invoices are not recomputed."""
+    if current_user.role.value != "developer":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).with_for_update().first()
+    if invoice is None:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    if invoice.status == InvoiceStatus.PAID:
+        raise HTTPException(status_code=409, detail="Invoice already paid")
+    if payment.payer_upi_id and not InputValidation.validate_upi_id(payment.payer_upi_id):
+        raise HTTPException(status_code=400, detail="Invalid UPI ID")
+    if not InputValidation.validate_amount(float(invoice.amount)):
+        raise HTTPException(status_code=400, detail="Invalid amount")
+
+    invoice.status = InvoiceStatus.PAID
+    invoice.payer_upi_id = payment.payer_upi_id
+    invoice.paid_at = datetime.utcnow()
+    db.commit()
+    db.refresh(invoice)
+    logger.info("Invoice paid", invoice_id=invoice.id, store_id=invoice.store_id)
+    return invoice
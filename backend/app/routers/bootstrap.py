@@ -0,0 +1,31 @@
+from typing import List, Tuple
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from app.database import replica_router, last_write
+from app.auth import get_current_active_user, CurrentUser
+from app.config import settings
+from app.models import Delivery
+from app.routers.deliveries import scoped_deliveries
+from app.schemas import Bootstrap, Delivery as DeliverySchema
+from app.bootstrap import gather_parts, load_stock
+from app import sync
+
+router = APIRouter()
+
+def load_orders(db: Session, user: CurrentUser) -> Tuple[int, List[DeliverySchema]]:
+    """Most recent deliveries visible to the caller and the sync cursor they are current to."""
+    # Read the cursor first: a change committed in between is then sent
+    # again by the next delta sync instead of being skipped
+    cursor = sync.current_cursor(db)
+    deliveries = scoped_deliveries(db, user).order_by(Delivery.id.desc()).limit(settings.BOOTSTRAP_ORDER_LIMIT)
+    return cursor, [DeliverySchema.model_validate(delivery) for delivery in deliveries]
+
+@router.get("/", response_model=Bootstrap)
+async def read_bootstrap(request: Request, current_user: CurrentUser = Depends(get_current_active_user)):
+    """User, stores, drivers, stock and recent orders for the caller's dashboard in one response."""
+    engine = replica_router.engine_for_read(last_write(request))
+    parts = await gather_parts(engine, current_user, {"stock": load_stock, "orders": load_orders})
+    cursor, orders = parts.pop("orders")
+    payload = Bootstrap(orders=orders, cursor=cursor, **parts)
+    return Response(content=payload.model_dump_json(), media_type="application/json")
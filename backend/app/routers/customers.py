@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.models import Store, Customer
+from app.schemas import Customer as CustomerSchema, CustomerSuggestion
+from app.customers import typeahead_index
+from app.serialization import serialize_list
+
+router = APIRouter()
+
+def check_store_access(db: Session, store_id: int, current_user: CurrentUser):
+    """Only the store's owner and developers can read its address book."""
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    owner_id = db.query(Store.owner_id).filter(Store.id == store_id).scalar()
+    if owner_id is None or (current_user.role.value == "store_owner" and owner_id != current_user.id):
+        raise HTTPException(status_code=404, detail="Store not found")
+
+@router.get("/", response_model=List[CustomerSchema])
+def read_customers(
+    store_id: int,
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """A store's customers, most frequent first."""
+    check_store_access(db, store_id, current_user)
+    customers = db.query(Customer).filter(Customer.store_id == store_id).order_by(
+        Customer.order_count.desc(), Customer.id
+    ).offset(skip).limit(limit).all()
+    return serialize_list(CustomerSchema, customers)
+
+@router.get("/typeahead", response_model=List[CustomerSuggestion])
+def typeahead(
+    store_id: int,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Autocomplete customers by name, address word or phone digits prefix."""
+    check_store_access(db, store_id, current_user)
+
+    def load():
+        return db.query(Customer).filter(Customer.store_id == store_id).order_by(
+            Customer.order_count.desc(), Customer.id
+        ).yield_per(1000)
+
+    return serialize_list(CustomerSuggestion, typeahead_index.search(store_id, q, limit, load))
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.auth import get_current_active_user, CurrentUser
+from app.profiling import profile_store
+
+router = APIRouter()
+
+@router.get("/profiles")
+def list_profiles(current_user: CurrentUser = Depends(get_current_active_user)):
+    """Profiles recorded by this worker, newest first."""
+    if current_user.role.value != "developer":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return [profile.summary() for profile in profile_store.list()]
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def read_profile(profile_id: str, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Collapsed stacks, one ``frame;frame;frame count`` line per stack."""
+    if current_user.role.value != "developer":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'}
+    )
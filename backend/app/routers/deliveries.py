@@ -1,11 +1,215 @@
-from fastapi import APIRouter, Depends
-from app.auth import get_current_active_user
-from app.models import User
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, aliased
+from typing import List, Optional
+from app.database import get_db, get_read_db, replica_router, last_write
+from app.auth import get_current_active_user, CurrentUser
+from app.models import User, UserRole, Store, Delivery, DeliveryStatus
+from app.schemas import DeliveryCreate, DeliveryStatusUpdate, Delivery as DeliverySchema
+from app.security import SecurityUtils, InputValidation
+from app import analytics, archive, export, notifications, scheduling, search
+from app.customers import upsert_customer, typeahead_index
+from app.etag import collection_etag, is_not_modified, not_modified_response, page_marker, set_etag
+from app.serialization import serialize_list
+import structlog
 
+logger = structlog.get_logger()
 router = APIRouter()
 
-@router.get("/")
-def read_deliveries(current_user: User = Depends(get_current_active_user)):
+def scoped_deliveries(db: Session, current_user: CurrentUser):
+    """Deliveries visible to the current user based on role."""
+    query = db.query(Delivery)
+    if current_user.role.value == "store_owner":
+        query = query.filter(Delivery.store_owner_id == current_user.id)
+    elif current_user.role.value == "driver":
+        query = query.filter(Delivery.driver_id == current_user.id)
+    return query
+
+def get_delivery_for_user(db: Session, delivery_id: int, current_user: CurrentUser) -> Delivery:
+    """Load a delivery the current user is allowed to see, or raise 404."""
+    delivery = scoped_deliveries(db, current_user).filter(Delivery.id == delivery_id).first()
+    if delivery is None:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return delivery
+
+def book_slot(db: Session, delivery_id: int, store_id: int, driver_id: Optional[int], start: datetime, end: datetime):
+    """Validate and reserve a delivery window in the caller's transaction (400/409 on failure)."""
+    try:
+        start, end = scheduling.check_booking_window(start, end)
+        return scheduling.reserve(db, delivery_id, store_id, driver_id, start, end)
+    except scheduling.SlotError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except scheduling.SlotUnavailable as exc:
+        db.rollback()
+        detail = "Driver is fully booked in this slot" if exc.scope == scheduling.DRIVER else "Delivery slot is full"
+        raise HTTPException(status_code=409, detail=detail)
+
+@router.get("/", response_model=List[DeliverySchema])
+def read_deliveries(
+    request: Request,
+    status: Optional[DeliveryStatus] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
     """Get deliveries based on user role."""
-    return {"message": f"Deliveries for {current_user.role.value}", "user": current_user.username}
+    query = scoped_deliveries(db, current_user)
+    if status is not None:
+        query = query.filter(Delivery.status == status)
+    # Store and user names are joined into each delivery; renaming one does not touch the delivery row
+    owner, driver = aliased(User), aliased(User)
+    names = page_marker(
+        query.outerjoin(Store, Store.id == Delivery.store_id)
+        .outerjoin(owner, owner.id == Delivery.store_owner_id)
+        .outerjoin(driver, driver.id == Delivery.driver_id)
+        .order_by(Delivery.id.desc()).offset(skip).limit(limit),
+        Delivery.id, Store.name, owner.username, driver.username
+    )
+    etag = collection_etag(query, Delivery, current_user.id, status, skip, limit, names)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    deliveries = query.order_by(Delivery.id.desc()).offset(skip).limit(limit).all()
+    response = serialize_list(DeliverySchema, deliveries)
+    set_etag(response, etag)
+    return response
+
+@router.get("/search", response_model=List[DeliverySchema])
+def search_deliveries(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Find deliveries by customer name, address or phone fragment, best matches first."""
+    deliveries = search.search_deliveries(scoped_deliveries(db, current_user), q, limit)
+    return serialize_list(DeliverySchema, deliveries)
+
+@router.get("/export")
+def export_deliveries(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    store_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    compress: bool = False,
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Stream delivery history as CSV or NDJSON with constant memory."""
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    def build_query(db: Session):
+        query = scoped_deliveries(db, current_user)
+        if store_id is not None:
+            query = query.filter(Delivery.store_id == store_id)
+        if start is not None:
+            query = query.filter(Delivery.created_at >= start)
+        if end is not None:
+            query = query.filter(Delivery.created_at < end)
+        return query
+
+    engine = replica_router.engine_for_read(last_write(request))
+    rows = export.iter_delivery_rows(build_query, engine)
+    # Settled orders older than ARCHIVE_AFTER_DAYS live in the archive files
+    archived = archive.iter_archived_rows(
+        start,
+        end,
+        store_owner_id=current_user.id if current_user.role.value == "store_owner" else None,
+        driver_id=current_user.id if current_user.role.value == "driver" else None,
+        store_id=store_id
+    )
+    rows = export.with_names(archive.merge_with_archive(rows, archived), engine)
+    body = export.encode_rows(rows, format)
+    filename = f"deliveries.{format}"
+    media_type = export.MEDIA_TYPES[format]
+    if compress:
+        body = export.gzip_chunks(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/", response_model=DeliverySchema)
+def create_delivery(delivery: DeliveryCreate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Create a delivery for one of the current store owner's stores."""
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not InputValidation.validate_phone_number(delivery.customer_phone):
+        raise HTTPException(status_code=400, detail="Invalid phone number")
+    if delivery.total_amount and not InputValidation.validate_amount(delivery.total_amount):
+        raise HTTPException(status_code=400, detail="Invalid amount")
+
+    store = db.query(Store).filter(Store.id == delivery.store_id).first()
+    if store is None or (current_user.role.value == "store_owner" and store.owner_id != current_user.id):
+        raise HTTPException(status_code=404, detail="Store not found")
+    if delivery.driver_id is not None:
+        driver = db.query(User).filter(User.id == delivery.driver_id, User.role == UserRole.DRIVER).first()
+        if driver is None:
+            raise HTTPException(status_code=400, detail="Driver not found")
+    if (delivery.slot_start is None) != (delivery.slot_end is None):
+        raise HTTPException(status_code=400, detail="slot_start and slot_end go together")
+
+    db_delivery = Delivery(
+        store_id=store.id,
+        store_owner_id=store.owner_id,
+        driver_id=delivery.driver_id,
+        customer_name=SecurityUtils.sanitize_input(delivery.customer_name),
+        customer_phone=delivery.customer_phone,
+        customer_phone_digits=InputValidation.normalize_phone_number(delivery.customer_phone),
+        customer_address=SecurityUtils.sanitize_input(delivery.customer_address),
+        customer_location=SecurityUtils.sanitize_input(delivery.customer_location or ""),
+        items=SecurityUtils.sanitize_input(delivery.items),
+        special_instructions=SecurityUtils.sanitize_input(delivery.special_instructions or ""),
+        total_amount=delivery.total_amount,
+        delivery_date=delivery.delivery_date or delivery.slot_start
+    )
+    db.add(db_delivery)
+    customer = upsert_customer(
+        db,
+        store.id,
+        db_delivery.customer_name,
+        db_delivery.customer_phone,
+        db_delivery.customer_address,
+        db_delivery.customer_location
+    )
+    db.flush()
+    db.refresh(db_delivery)
+    analytics.apply_delivery_change(db, None, db_delivery)
+    if delivery.slot_start is not None:
+        book_slot(db, db_delivery.id, store.id, delivery.driver_id, delivery.slot_start, delivery.slot_end)
+    db.commit()
+    typeahead_index.update(customer)
+
+    logger.info("Delivery created", delivery_id=db_delivery.id, store_id=store.id)
+    return db_delivery
+
+@router.put("/{delivery_id}/status", response_model=DeliverySchema)
+def update_delivery_status(
+    delivery_id: int,
+    update: DeliveryStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Update the status of a delivery visible to the current user."""
+    delivery = get_delivery_for_user(db, delivery_id, current_user)
+    if delivery.status == update.status:
+        return delivery
+
+    before = analytics.capture(delivery)
+    delivery.status = update.status
+    db.flush()
+    analytics.apply_delivery_change(db, before, delivery)
+    if delivery.status == DeliveryStatus.CANCELLED:
+        scheduling.release(db, delivery.id)
+    notifications.notify_status_change(db, delivery)
+    db.commit()
+    db.refresh(delivery)
 
+    logger.info("Delivery status updated", delivery_id=delivery.id, status=update.status.value)
+    return delivery
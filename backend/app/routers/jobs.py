@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db, get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.models import Job
+from app.schemas import Job as JobSchema, JobCreate, QueueStats
+from app.serialization import serialize_list
+from app import jobs
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+def require_developer(current_user: CurrentUser):
+    if current_user.role.value != "developer":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+@router.post("/", response_model=JobSchema, status_code=202)
+def create_job(request: JobCreate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Queue a registered job (rollups.rebuild, archive.run, billing.generate, ...)."""
+    require_developer(current_user)
+    if request.job_type not in jobs.registry:
+        raise HTTPException(status_code=400, detail="Unknown job type")
+    job = jobs.enqueue(db, request.job_type, request.payload, request.priority, request.delay_seconds)
+    db.commit()
+    db.refresh(job)
+    logger.info("Job queued", job_id=job.id, job_type=job.job_type, user_id=current_user.id)
+    return Response(content=JobSchema.model_validate(job).model_dump_json(), status_code=202, media_type="application/json")
+
+@router.get("/", response_model=List[JobSchema])
+def read_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|done|failed)$"),
+    job_type: Optional[str] = None,
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Most recently queued jobs first."""
+    require_developer(current_user)
+    query = db.query(Job)
+    if status is not None:
+        query = query.filter(Job.status == status)
+    if job_type is not None:
+        query = query.filter(Job.job_type == job_type)
+    return serialize_list(JobSchema, query.order_by(Job.id.desc()).limit(limit).all())
+
+@router.get("/stats", response_model=QueueStats)
+def read_queue_stats(db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Queue depth per job type and how long the oldest runnable job has waited."""
+    require_developer(current_user)
+    return jobs.queue_stats(db)
+
+@router.get("/{job_id}", response_model=JobSchema)
+def read_job(job_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    require_developer(current_user)
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
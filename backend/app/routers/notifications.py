@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.models import Notification
+from app.routers.deliveries import get_delivery_for_user
+from app.schemas import Notification as NotificationSchema
+from app.serialization import serialize_list
+
+router = APIRouter()
+
+@router.get("/{delivery_id}/notifications", response_model=List[NotificationSchema])
+def read_notifications(delivery_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Customer messages queued or sent for a delivery, oldest first."""
+    get_delivery_for_user(db, delivery_id, current_user)
+    rows = db.query(Notification).filter(Notification.delivery_id == delivery_id).order_by(Notification.id).all()
+    return serialize_list(NotificationSchema, rows)
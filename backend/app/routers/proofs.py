@@ -0,0 +1,128 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import List
+from app.database import SessionLocal, get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.config import settings
+from app.models import DeliveryProof
+from app.routers.deliveries import get_delivery_for_user
+from app.schemas import DeliveryProof as DeliveryProofSchema
+from app.serialization import serialize_list
+from app import proofs
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+# Content-addressed URLs never change meaning, so clients may keep them forever
+IMMUTABLE_CACHE = "private, max-age=31536000, immutable"
+CONTENT_HASH = Path(..., pattern="^[0-9a-f]{64}$")
+
+def _check_delivery(delivery_id: int, current_user: CurrentUser):
+    with SessionLocal() as db:
+        get_delivery_for_user(db, delivery_id, current_user)
+
+def _save_proof(delivery_id: int, content_hash: str, size: int, user_id: int) -> DeliveryProofSchema:
+    with SessionLocal() as db:
+        proof = db.query(DeliveryProof).filter(
+            DeliveryProof.delivery_id == delivery_id, DeliveryProof.content_hash == content_hash
+        ).first()
+        if proof is None:
+            proof = DeliveryProof(
+                delivery_id=delivery_id,
+                content_hash=content_hash,
+                uploaded_by=user_id,
+                size_bytes=size,
+                status=proofs.PROCESSING
+            )
+            db.add(proof)
+            try:
+                db.flush()
+                # Queued in the same transaction, so every committed proof gets processed
+                proofs.schedule_processing(db, content_hash)
+                db.commit()
+            except IntegrityError:
+                # The same photo was uploaded twice at once
+                db.rollback()
+                proof = db.query(DeliveryProof).filter(
+                    DeliveryProof.delivery_id == delivery_id, DeliveryProof.content_hash == content_hash
+                ).one()
+            db.refresh(proof)
+        return DeliveryProofSchema.model_validate(proof)
+
+@router.post("/{delivery_id}/proof", response_model=DeliveryProofSchema, status_code=202)
+async def upload_proof(delivery_id: int, request: Request, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Upload a proof-of-delivery photo as the ``file`` part of a multipart form.
+
+    The body is streamed to disk; EXIF stripping and thumbnailing finish in
+    the background, so the returned proof starts in ``processing``.
+    """
+    if current_user.role.value not in ("driver", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > settings.PROOF_MAX_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail="Photo too large")
+    await run_in_threadpool(_check_delivery, delivery_id, current_user)
+
+    try:
+        content_hash, size, media_type = await proofs.receive_upload(
+            request.headers.get("content-type", ""), request.stream()
+        )
+    except proofs.UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+    proof = await run_in_threadpool(_save_proof, delivery_id, content_hash, size, current_user.id)
+    logger.info("Proof uploaded", delivery_id=delivery_id, content_hash=content_hash, size=size, media_type=media_type)
+    return Response(content=proof.model_dump_json(), status_code=202, media_type="application/json")
+
+@router.get("/{delivery_id}/proof", response_model=List[DeliveryProofSchema])
+def read_proofs(delivery_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    get_delivery_for_user(db, delivery_id, current_user)
+    rows = db.query(DeliveryProof).filter(DeliveryProof.delivery_id == delivery_id).order_by(DeliveryProof.id).all()
+    return serialize_list(DeliveryProofSchema, rows)
+
+def _ready_proof(db: Session, delivery_id: int, content_hash: str, current_user: CurrentUser) -> DeliveryProof:
+    get_delivery_for_user(db, delivery_id, current_user)
+    proof = db.query(DeliveryProof).filter(
+        DeliveryProof.delivery_id == delivery_id,
+        DeliveryProof.content_hash == content_hash,
+        DeliveryProof.status == proofs.READY
+    ).first()
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Proof not found")
+    return proof
+
+def _file_response(path: str, media_type: str, content_hash: str) -> FileResponse:
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Proof not found")
+    return FileResponse(path, media_type=media_type, headers={
+        "Cache-Control": IMMUTABLE_CACHE,
+        "ETag": f'"{content_hash}"',
+    })
+
+@router.get("/{delivery_id}/proof/{content_hash}/image")
+def read_proof_image(
+    delivery_id: int,
+    content_hash: str = CONTENT_HASH,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    proof = _ready_proof(db, delivery_id, content_hash, current_user)
+    return _file_response(proofs.image_path(content_hash), proof.media_type, content_hash)
+
+@router.get("/{delivery_id}/proof/{content_hash}/thumbnail")
+def read_proof_thumbnail(
+    delivery_id: int,
+    content_hash: str = CONTENT_HASH,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Thumbnail, or the stripped image itself when thumbnails are unavailable (no Pillow)."""
+    proof = _ready_proof(db, delivery_id, content_hash, current_user)
+    if not proof.has_thumbnail:
+        return _file_response(proofs.image_path(content_hash), proof.media_type, content_hash)
+    return _file_response(proofs.thumbnail_path(content_hash), "image/jpeg", f"{content_hash}-thumb")
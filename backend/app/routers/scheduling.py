@@ -0,0 +1,119 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db, get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.config import settings
+from app.models import DeliveryStatus, SlotBooking, User, UserRole
+from app.routers.deliveries import book_slot, get_delivery_for_user
+from app.routers.stores import get_store_for_user
+from app.schemas import (
+    SlotBooking as SlotBookingSchema, SlotBookingRequest, SlotCapacityResult, SlotCapacityUpdate, SlotWindow
+)
+from app import scheduling
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+@router.get("/availability", response_model=List[SlotWindow])
+def read_availability(
+    store_id: int,
+    day: date,
+    driver_id: Optional[int] = None,
+    window_minutes: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Bookable windows on a day with how many more orders each can take."""
+    get_store_for_user(db, store_id, current_user)
+    window_minutes = window_minutes or settings.SLOT_MINUTES
+    if window_minutes % settings.SLOT_MINUTES or window_minutes > settings.SLOT_MAX_WINDOW_MINUTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"window_minutes must be a multiple of {settings.SLOT_MINUTES} up to {settings.SLOT_MAX_WINDOW_MINUTES}"
+        )
+    return scheduling.availability(db, store_id, day, driver_id, window_minutes)
+
+def _capacity_window(update: SlotCapacityUpdate):
+    opens, closes = scheduling.day_bounds(update.day)
+    start = update.start or opens
+    end = update.end or closes
+    try:
+        start, end = scheduling.check_window(start, end)
+    except scheduling.SlotError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if scheduling.local_day(start) != update.day:
+        raise HTTPException(status_code=400, detail="start and end must fall on day")
+    return start, end
+
+@router.put("/stores/{store_id}/capacity", response_model=SlotCapacityResult)
+def update_store_capacity(
+    store_id: int,
+    update: SlotCapacityUpdate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Set how many orders a store takes per slot for (part of) a day."""
+    get_store_for_user(db, store_id, current_user)
+    start, end = _capacity_window(update)
+    slots = scheduling.set_capacity(db, scheduling.STORE, store_id, start, end, update.capacity)
+    logger.info("Store slot capacity updated", store_id=store_id, day=update.day.isoformat(), capacity=update.capacity)
+    return {"day": update.day, "capacity": update.capacity, "slots": slots}
+
+@router.put("/drivers/{driver_id}/capacity", response_model=SlotCapacityResult)
+def update_driver_capacity(
+    driver_id: int,
+    update: SlotCapacityUpdate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Set how many orders a driver takes per slot for (part of) a day (the driver or developers)."""
+    if current_user.role.value != "developer" and current_user.id != driver_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if db.query(User.id).filter(User.id == driver_id, User.role == UserRole.DRIVER).first() is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    start, end = _capacity_window(update)
+    slots = scheduling.set_capacity(db, scheduling.DRIVER, driver_id, start, end, update.capacity)
+    logger.info("Driver slot capacity updated", driver_id=driver_id, day=update.day.isoformat(), capacity=update.capacity)
+    return {"day": update.day, "capacity": update.capacity, "slots": slots}
+
+@router.get("/deliveries/{delivery_id}/slot", response_model=SlotBookingSchema)
+def read_delivery_slot(delivery_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    get_delivery_for_user(db, delivery_id, current_user)
+    booking = db.query(SlotBooking).filter(SlotBooking.delivery_id == delivery_id).first()
+    if booking is None:
+        raise HTTPException(status_code=404, detail="No slot booked")
+    return booking
+
+@router.put("/deliveries/{delivery_id}/slot", response_model=SlotBookingSchema)
+def update_delivery_slot(
+    delivery_id: int,
+    request: SlotBookingRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Book or move a delivery's window; the old window is released atomically."""
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    delivery = get_delivery_for_user(db, delivery_id, current_user)
+    if delivery.status != DeliveryStatus.PENDING:
+        raise HTTPException(status_code=400, detail="Delivery can no longer be scheduled")
+
+    booking = book_slot(db, delivery.id, delivery.store_id, delivery.driver_id, request.start, request.end)
+    delivery.delivery_date = booking.slot_start
+    db.commit()
+    db.refresh(booking)
+    logger.info("Delivery slot booked", delivery_id=delivery.id, slot_start=booking.slot_start.isoformat())
+    return booking
+
+@router.delete("/deliveries/{delivery_id}/slot", status_code=204)
+def delete_delivery_slot(delivery_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    get_delivery_for_user(db, delivery_id, current_user)
+    if not scheduling.release(db, delivery_id):
+        raise HTTPException(status_code=404, detail="No slot booked")
+    db.commit()
+    logger.info("Delivery slot released", delivery_id=delivery_id)
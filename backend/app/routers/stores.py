@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db, get_read_db
+from app.models import Store, StockItem
+from app.schemas import StoreCreate, Store as StoreSchema, StockItem as StockItemSchema, StockItemUpdate
+from app.bootstrap import bootstrap_cache
+from app.auth import get_current_active_user, CurrentUser
+from app.etag import collection_etag, is_not_modified, not_modified_response, set_etag
+from app.serialization import serialize_list
+from app.security import SecurityUtils, InputValidation
+
+router = APIRouter()
+
+@router.get("/", response_model=List[StoreSchema])
+def read_stores(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Get stores (store owners only see their own)."""
+    query = db.query(Store)
+    if current_user.role.value == "store_owner":
+        query = query.filter(Store.owner_id == current_user.id)
+    etag = collection_etag(query, Store, current_user.id, skip, limit)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    stores = query.order_by(Store.id).offset(skip).limit(limit).all()
+    response = serialize_list(StoreSchema, stores)
+    set_etag(response, etag)
+    return response
+
+@router.post("/", response_model=StoreSchema)
+def create_store(store: StoreCreate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Create a store owned by the current store owner."""
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if store.phone and not InputValidation.validate_phone_number(store.phone):
+        raise HTTPException(status_code=400, detail="Invalid phone number")
+    db_store = Store(
+        name=SecurityUtils.sanitize_input(store.name),
+        address=SecurityUtils.sanitize_input(store.address),
+        phone=store.phone,
+        owner_id=current_user.id
+    )
+    db.add(db_store)
+    db.commit()
+    db.refresh(db_store)
+    bootstrap_cache.invalidate()
+    return db_store
+
+def get_store_for_user(db: Session, store_id: int, current_user: CurrentUser) -> Store:
+    """Load a store the current user owns (developers: any store), or raise 404."""
+    if current_user.role.value not in ("store_owner", "developer"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    store = db.query(Store).filter(Store.id == store_id).first()
+    if store is None or (current_user.role.value == "store_owner" and store.owner_id != current_user.id):
+        raise HTTPException(status_code=404, detail="Store not found")
+    return store
+
+@router.get("/{store_id}/stock", response_model=List[StockItemSchema])
+def read_stock(store_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Stock levels of one of the current user's stores."""
+    get_store_for_user(db, store_id, current_user)
+    items = db.query(StockItem).filter(StockItem.store_id == store_id).order_by(StockItem.name).all()
+    return serialize_list(StockItemSchema, items)
+
+@router.put("/{store_id}/stock", response_model=StockItemSchema)
+def set_stock(store_id: int, item: StockItemUpdate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Set the quantity on hand of a product, adding it to the store if new."""
+    get_store_for_user(db, store_id, current_user)
+    name = SecurityUtils.sanitize_input(item.name)
+    db_item = db.query(StockItem).filter(StockItem.store_id == store_id, StockItem.name == name).first()
+    if db_item is None:
+        db_item = StockItem(store_id=store_id, name=name)
+        db.add(db_item)
+    db_item.quantity = item.quantity
+    db.commit()
+    db.refresh(db_item)
+    return db_item
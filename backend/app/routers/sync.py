@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import get_db, get_read_db
+from app.auth import get_current_active_user, CurrentUser
+from app.config import settings
+from app.routers.deliveries import scoped_deliveries
+from app.schemas import SyncChanges, SyncPush, SyncPushResult
+from app import sync
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+def _json(model) -> Response:
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+@router.get("/", response_model=SyncChanges)
+def pull_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Deliveries visible to the user that changed after cursor ``since``.
+
+    Start with ``since=0`` and pass back the returned cursor; repeat while
+    ``has_more`` is true.
+    """
+    latest = sync.current_cursor(db)
+    if since > latest:
+        return _json(SyncChanges(deliveries=[], cursor=0, has_more=False, reset=True))
+    deliveries = sync.changes_since(scoped_deliveries(db, current_user), since, limit)
+    has_more = len(deliveries) > limit
+    deliveries = deliveries[:limit]
+    cursor = deliveries[-1].change_seq if has_more else max(latest, since)
+    return _json(SyncChanges.model_validate(
+        {"deliveries": deliveries, "cursor": cursor, "has_more": has_more},
+        from_attributes=True
+    ))
+
+@router.post("/", response_model=SyncPushResult)
+def push_changes(
+    push: SyncPush,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Apply status changes queued while offline, in order, each at most once."""
+    if len(push.changes) > settings.SYNC_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {settings.SYNC_MAX_BATCH} changes per batch")
+
+    for attempt in range(2):
+        try:
+            results = sync.apply_status_changes(db, scoped_deliveries(db, current_user), current_user.id, push.changes)
+            response = SyncPushResult.model_validate(
+                {"results": results, "cursor": sync.current_cursor(db)}, from_attributes=True
+            )
+            db.commit()
+            break
+        except IntegrityError:
+            # The same batch is being applied by a concurrent retry; the second pass replays its outcomes
+            db.rollback()
+            if attempt:
+                raise
+
+    conflicts = sum(1 for result in response.results if result.result == sync.CONFLICT)
+    logger.info("Sync batch applied", user_id=current_user.id, changes=len(push.changes), conflicts=conflicts)
+    return _json(response)
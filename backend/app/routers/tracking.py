@@ -0,0 +1,122 @@
+import asyncio
+import json
+from datetime import timezone
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.auth import get_current_active_user, CurrentUser
+from app.config import settings
+from app.database import SessionLocal
+from app.eta import RouteStop, eta_service
+from app.models import Delivery, User, UserRole
+from app.routers.deliveries import scoped_deliveries
+from app.schemas import RoutePlan, DriverPing, DriverEta
+
+router = APIRouter()
+
+# Seconds between SSE keep-alive comments when no ETA update arrives
+STREAM_KEEPALIVE_SECONDS = 15
+
+def _check_driver_access(current_user: CurrentUser, driver_id: int):
+    """Drivers may only see their own route; other roles may see any."""
+    if current_user.role.value == "driver" and current_user.id != driver_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+def _check_route_plan(current_user: CurrentUser, driver_id: int, delivery_ids: List[int]):
+    """404 unless ``driver_id`` is an active driver and the caller can see every stop's delivery."""
+    with SessionLocal() as db:
+        driver = db.query(User.id).filter(
+            User.id == driver_id, User.role == UserRole.DRIVER, User.is_active.is_(True)
+        ).first()
+        if driver is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Driver not found")
+        wanted = set(delivery_ids)
+        visible = {
+            delivery_id for (delivery_id,) in
+            scoped_deliveries(db, current_user).filter(Delivery.id.in_(wanted)).with_entities(Delivery.id)
+        }
+        if visible != wanted:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Delivery not found")
+
+@router.put("/drivers/{driver_id}/route", response_model=DriverEta)
+async def plan_route(driver_id: int, plan: RoutePlan, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Set the remaining stop order for a driver.
+
+    The driver must be active and every stop a delivery the caller can see
+    (store owners: their stores' deliveries; drivers: their own).
+    """
+    _check_driver_access(current_user, driver_id)
+    # Database lookups off the event loop; the route itself is only touched on it
+    await run_in_threadpool(_check_route_plan, current_user, driver_id, [stop.delivery_id for stop in plan.stops])
+    default_service = settings.ETA_STOP_SERVICE_MINUTES
+    stops = [
+        RouteStop(
+            delivery_id=stop.delivery_id,
+            latitude=stop.latitude,
+            longitude=stop.longitude,
+            service_seconds=(stop.service_minutes if stop.service_minutes is not None else default_service) * 60,
+        )
+        for stop in plan.stops
+    ]
+    return eta_service.plan_route(driver_id, stops)
+
+@router.post("/ping", response_model=DriverEta)
+async def record_ping(ping: DriverPing, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Record the calling driver's position and return refreshed ETAs."""
+    if current_user.role.value != "driver":
+        raise HTTPException(status_code=403, detail="Only drivers can report positions")
+    recorded_at = None
+    if ping.recorded_at is not None:
+        moment = ping.recorded_at
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        recorded_at = moment.timestamp()
+    snapshot = eta_service.record_ping(current_user.id, ping.latitude, ping.longitude, recorded_at)
+    if snapshot is None:
+        # Out-of-order ping: keep the newer position and report current ETAs
+        snapshot = eta_service.get_etas(current_user.id)
+    return snapshot
+
+@router.post("/drivers/{driver_id}/stops/{delivery_id}/complete", response_model=DriverEta)
+async def complete_stop(driver_id: int, delivery_id: int, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Mark a stop as completed and advance the route."""
+    _check_driver_access(current_user, driver_id)
+    snapshot = eta_service.complete_stop(driver_id, delivery_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stop not found on active route")
+    return snapshot
+
+@router.get("/drivers/{driver_id}/eta", response_model=DriverEta)
+async def read_etas(driver_id: int, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Get the cached ETAs for a driver's remaining stops."""
+    _check_driver_access(current_user, driver_id)
+    snapshot = eta_service.get_etas(driver_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No active route for driver")
+    return snapshot
+
+@router.get("/drivers/{driver_id}/stream")
+async def stream_etas(driver_id: int, request: Request, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Push ETA updates for a driver as server-sent events."""
+    _check_driver_access(current_user, driver_id)
+    queue = eta_service.subscribe(driver_id)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: eta\ndata: {json.dumps(jsonable_encoder(snapshot))}\n\n"
+        finally:
+            eta_service.unsubscribe(driver_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,23 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import User
 from app.schemas import User as UserSchema
-from app.auth import get_current_active_user
+from app.auth import get_current_active_user, CurrentUser, deactivate_user
+from app.etag import collection_etag, is_not_modified, not_modified_response, set_etag
+from app.serialization import serialize_list
+import structlog
 
+logger = structlog.get_logger()
 router = APIRouter()
 
 @router.get("/", response_model=List[UserSchema])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def read_users(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
     """Get all users (only for developers)."""
     if current_user.role.value != "developer":
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    query = db.query(User)
+    etag = collection_etag(query, User, skip, limit)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    users = query.offset(skip).limit(limit).all()
+    response = serialize_list(UserSchema, users)
+    set_etag(response, etag)
+    return response
 
 @router.get("/{user_id}", response_model=UserSchema)
-def read_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def read_user(user_id: int, db: Session = Depends(get_read_db), current_user: CurrentUser = Depends(get_current_active_user)):
     """Get a specific user by ID."""
     if current_user.role.value != "developer" and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -26,3 +36,20 @@ def read_user(user_id: int, db: Session = Depends(get_db), current_user: User =
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+
+@router.post("/{user_id}/deactivate", response_model=UserSchema)
+def deactivate(user_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_active_user)):
+    """Deactivate a user and sign them out everywhere (only for developers)."""
+    if current_user.role.value != "developer":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if current_user.id == user_id:
+        raise HTTPException(status_code=400, detail="Cannot deactivate yourself")
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user.is_active:
+        deactivate_user(db, user)
+        db.commit()
+        db.refresh(user)
+        logger.info("User deactivated", user_id=user_id, by=current_user.username)
+    return user
@@ -0,0 +1,265 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import SlotBooking, SlotUsage
+
+# Delivery time slots.
+# Each day is cut into SLOT_MINUTES buckets. slot_usage keeps one row per
+# (store or driver, bucket) with its capacity and booked count; a missing row
+# means nothing booked at the default capacity. Booking counts are kept per
+# bucket rather than per delivery, so a day's availability is one range scan
+# of the (scope, scope_id, slot_start) index over at most a day's buckets,
+# however many deliveries are booked, and a window touches only its buckets.
+#
+# Reserving increments each bucket with ``booked = booked + 1 WHERE booked <
+# capacity``. The row lock makes a concurrent booking of the same bucket
+# re-check the condition against the committed count, so capacity cannot be
+# oversold. A booking change touches the buckets it gives back as well as
+# the ones it takes; all of them are locked up front in one global order
+# (scope, scope_id, slot_start) before any count changes, so two
+# transactions never hold bucket locks in opposite orders. Missing rows are
+# created by that same locking statement, so a new bucket is never locked
+# ahead of an existing one that sorts before it. Setting capacity locks its
+# buckets the same way.
+
+STORE = "store"
+DRIVER = "driver"
+
+_EPOCH = datetime(1970, 1, 1)
+
+class SlotError(ValueError):
+    """A window that cannot be booked (misaligned, outside hours, too long...)."""
+
+class SlotUnavailable(Exception):
+    def __init__(self, scope: str, slot_start: datetime):
+        super().__init__(f"{scope} slot at {slot_start.isoformat()} is fully booked")
+        self.scope = scope
+        self.slot_start = slot_start
+
+def to_utc(value: datetime) -> datetime:
+    """Naive UTC; naive inputs are taken to be UTC already."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _step() -> timedelta:
+    return timedelta(minutes=settings.SLOT_MINUTES)
+
+def _offset() -> timedelta:
+    return timedelta(minutes=settings.SLOT_UTC_OFFSET_MINUTES)
+
+def local_day(value: datetime) -> date:
+    return (value + _offset()).date()
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Bookable hours of a local day as naive UTC."""
+    midnight = datetime.combine(day, time()) - _offset()
+    return midnight + timedelta(hours=settings.SLOT_OPEN_HOUR), midnight + timedelta(hours=settings.SLOT_CLOSE_HOUR)
+
+def buckets(start: datetime, end: datetime) -> List[datetime]:
+    step = _step()
+    slots = []
+    current = start
+    while current < end:
+        slots.append(current)
+        current += step
+    return slots
+
+def check_window(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """Normalize [start, end) and check it is bucket-aligned within one day's hours."""
+    start, end = to_utc(start), to_utc(end)
+    if start >= end:
+        raise SlotError("Slot start must be before end")
+    step = _step()
+    for value in (start, end):
+        if (value + _offset() - _EPOCH) % step:
+            raise SlotError(f"Slot times must be on {settings.SLOT_MINUTES}-minute boundaries")
+    opens, closes = day_bounds(local_day(start))
+    if start < opens or end > closes:
+        raise SlotError("Slot is outside delivery hours")
+    return start, end
+
+def check_booking_window(start: datetime, end: datetime, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    start, end = check_window(start, end)
+    if end - start > timedelta(minutes=settings.SLOT_MAX_WINDOW_MINUTES):
+        raise SlotError("Slot window too long")
+    now = now or datetime.utcnow()
+    if start < now:
+        raise SlotError("Slot has already started")
+    if start > now + timedelta(days=settings.SLOT_BOOKING_DAYS_AHEAD):
+        raise SlotError("Slot is too far ahead")
+    return start, end
+
+def default_capacity(scope: str) -> int:
+    return settings.SLOT_STORE_CAPACITY if scope == STORE else settings.SLOT_DRIVER_CAPACITY
+
+def _scopes(store_id: int, driver_id: Optional[int]) -> List[Tuple[str, int]]:
+    scopes = [(STORE, store_id)]
+    if driver_id is not None:
+        scopes.append((DRIVER, driver_id))
+    return scopes
+
+def _change_booked(db: Session, scope: str, scope_id: int, slot: datetime, delta: int) -> bool:
+    stmt = update(SlotUsage).where(
+        SlotUsage.scope == scope,
+        SlotUsage.scope_id == scope_id,
+        SlotUsage.slot_start == slot,
+        SlotUsage.booked < SlotUsage.capacity if delta > 0 else SlotUsage.booked > 0
+    ).values(booked=SlotUsage.booked + delta).execution_options(synchronize_session=False)
+    return db.execute(stmt).rowcount == 1
+
+BucketKey = Tuple[str, int, datetime]
+
+def _booking_buckets(scope_ids: List[Tuple[str, int]], start: datetime, end: datetime) -> List[BucketKey]:
+    return [(scope, scope_id, slot) for scope, scope_id in scope_ids for slot in buckets(start, end)]
+
+def _lock_buckets(db: Session, keys: List[BucketKey]):
+    """Create missing usage rows of ``keys`` and lock all of them, in (scope, scope_id, slot_start) order.
+
+    Missing rows get the default capacity. On Postgres and SQLite this is a
+    single upsert whose conflict branch is a no-op update: Postgres inserts
+    or row-locks each bucket as it reaches it in VALUES order, so new and
+    existing buckets are locked in the one global order.
+    """
+    keys = sorted(keys)
+    rows = [
+        {"scope": scope, "scope_id": scope_id, "slot_start": slot, "capacity": default_capacity(scope), "booked": 0}
+        for scope, scope_id, slot in keys
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.execute(insert(SlotUsage).values(rows).on_conflict_do_update(
+            index_elements=["scope", "scope_id", "slot_start"],
+            set_={"booked": SlotUsage.__table__.c.booked}
+        ))
+        return
+
+    groups: Dict[Tuple[str, int], List[datetime]] = {}
+    for scope, scope_id, slot in keys:
+        groups.setdefault((scope, scope_id), []).append(slot)
+    existing = set(db.query(SlotUsage.scope, SlotUsage.scope_id, SlotUsage.slot_start).filter(or_(*(
+        and_(SlotUsage.scope == scope, SlotUsage.scope_id == scope_id, SlotUsage.slot_start.in_(slots))
+        for (scope, scope_id), slots in groups.items()
+    ))).order_by(SlotUsage.scope, SlotUsage.scope_id, SlotUsage.slot_start).with_for_update().all())
+    db.add_all(SlotUsage(**row) for key, row in zip(keys, rows) if key not in existing)
+    db.flush()
+
+def _apply_changes(db: Session, changes: Dict[BucketKey, int]):
+    """Lock every bucket in ``changes``, then add each delta in the same order.
+
+    Raises :class:`SlotUnavailable` when a bucket to increment is full.
+    """
+    keys = sorted(changes)
+    if not keys:
+        return
+    _lock_buckets(db, keys)
+    for scope, scope_id, slot in keys:
+        delta = changes[(scope, scope_id, slot)]
+        if delta == 0:
+            continue
+        if not _change_booked(db, scope, scope_id, slot, delta) and delta > 0:
+            raise SlotUnavailable(scope, slot)
+
+def reserve(db: Session, delivery_id: int, store_id: int, driver_id: Optional[int],
+            start: datetime, end: datetime) -> SlotBooking:
+    """Hold store (and driver) capacity in [start, end) for a delivery.
+
+    Runs in the caller's transaction and replaces any earlier booking of the
+    delivery; buckets shared by the old and new window keep their count.
+    Raises :class:`SlotUnavailable` when a bucket is full; the caller must
+    then roll back, which also undoes buckets already changed.
+    """
+    previous = db.query(SlotBooking).filter(SlotBooking.delivery_id == delivery_id).with_for_update().first()
+    changes: Dict[BucketKey, int] = {}
+    if previous is not None:
+        for key in _booking_buckets(_scopes(previous.store_id, previous.driver_id),
+                                    previous.slot_start, previous.slot_end):
+            changes[key] = -1
+    for key in _booking_buckets(_scopes(store_id, driver_id), start, end):
+        changes[key] = changes.get(key, 0) + 1
+
+    _apply_changes(db, changes)
+
+    if previous is not None:
+        db.delete(previous)
+        db.flush()
+    booking = SlotBooking(delivery_id=delivery_id, store_id=store_id, driver_id=driver_id,
+                          slot_start=start, slot_end=end)
+    db.add(booking)
+    db.flush()
+    return booking
+
+def release(db: Session, delivery_id: int) -> bool:
+    """Give back the capacity held by a delivery's booking, if any."""
+    booking = db.query(SlotBooking).filter(SlotBooking.delivery_id == delivery_id).with_for_update().first()
+    if booking is None:
+        return False
+    _apply_changes(db, {
+        key: -1 for key in _booking_buckets(_scopes(booking.store_id, booking.driver_id),
+                                            booking.slot_start, booking.slot_end)
+    })
+    db.delete(booking)
+    db.flush()
+    return True
+
+def set_capacity(db: Session, scope: str, scope_id: int, start: datetime, end: datetime, capacity: int) -> int:
+    """Set the capacity of every bucket in [start, end); returns the number of buckets.
+
+    Lowering capacity below what is booked keeps existing bookings; the
+    buckets just stop taking new ones.
+    """
+    slots = buckets(start, end)
+    _lock_buckets(db, [(scope, scope_id, slot) for slot in slots])
+    db.query(SlotUsage).filter(
+        SlotUsage.scope == scope, SlotUsage.scope_id == scope_id, SlotUsage.slot_start.in_(slots)
+    ).update({SlotUsage.capacity: capacity}, synchronize_session=False)
+    db.commit()
+    return len(slots)
+
+def _remaining(db: Session, scope: str, scope_id: int, slots: List[datetime]) -> Dict[datetime, int]:
+    remaining = {slot: default_capacity(scope) for slot in slots}
+    rows = db.query(SlotUsage.slot_start, SlotUsage.capacity, SlotUsage.booked).filter(
+        SlotUsage.scope == scope,
+        SlotUsage.scope_id == scope_id,
+        SlotUsage.slot_start >= slots[0],
+        SlotUsage.slot_start <= slots[-1]
+    )
+    for slot_start, capacity, booked in rows:
+        remaining[slot_start] = max(capacity - booked, 0)
+    return remaining
+
+def availability(db: Session, store_id: int, day: date, driver_id: Optional[int] = None,
+                 window_minutes: Optional[int] = None, now: Optional[datetime] = None) -> List[dict]:
+    """Bookable windows of ``window_minutes`` on a local day and how many more orders each takes.
+
+    A window's remaining capacity is the smallest across its buckets and,
+    with ``driver_id``, across the driver's buckets too.
+    """
+    slots = buckets(*day_bounds(day))
+    width = (window_minutes or settings.SLOT_MINUTES) // settings.SLOT_MINUTES
+    if not slots or width < 1 or width > len(slots):
+        return []
+
+    free = _remaining(db, STORE, store_id, slots)
+    if driver_id is not None:
+        driver_free = _remaining(db, DRIVER, driver_id, slots)
+        free = {slot: min(left, driver_free[slot]) for slot, left in free.items()}
+
+    now = now or datetime.utcnow()
+    step = _step()
+    windows = []
+    for i in range(len(slots) - width + 1):
+        if slots[i] < now:
+            continue
+        windows.append({
+            "start": slots[i],
+            "end": slots[i] + width * step,
+            "remaining": min(free[slot] for slot in slots[i:i + width]),
+        })
+    return windows
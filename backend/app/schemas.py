@@ -1,7 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
-from datetime import datetime
-from app.models import UserRole
+from pydantic import BaseModel, EmailStr, Field, Json
+from typing import Any, Optional, List, Dict
+from datetime import date, datetime
+from app.models import UserRole, DeliveryStatus, InvoiceStatus
 
 # User schemas
 class UserBase(BaseModel):
@@ -17,6 +17,9 @@ class UserLogin(BaseModel):
     password: str
 
 class User(UserBase):
+    # Emails are validated on the way in; re-running EmailStr on every
+    # serialized row dominates list response time
+    email: str
     id: int
     is_active: bool
     created_at: datetime
@@ -28,8 +31,344 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
     user: User
 
+class PasswordChanged(Token):
+    message: str
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    token_version: int = 0
+    jti: Optional[str] = None
+    expires_at: Optional[datetime] = None
+
+
+# Store schemas
+class StoreBase(BaseModel):
+    name: str
+    address: str
+    phone: Optional[str] = None
+
+class StoreCreate(StoreBase):
+    pass
+
+class Store(StoreBase):
+    id: int
+    owner_id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+# Stock schemas
+class StockItemUpdate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    quantity: int = Field(..., ge=0)
+
+class StockItem(StockItemUpdate):
+    id: int
+    store_id: int
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Customer schemas
+class Customer(BaseModel):
+    id: int
+    store_id: int
+    name: str
+    phone: str
+    address: str
+    location: Optional[str] = None
+    order_count: int
+    last_order_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class CustomerSuggestion(BaseModel):
+    id: int
+    name: str
+    phone: str
+    address: str
+    location: Optional[str] = None
+
+# Delivery schemas
+class DeliveryBase(BaseModel):
+    store_id: int
+    customer_name: str
+    customer_phone: str
+    customer_address: str
+    customer_location: Optional[str] = None
+    items: str
+    special_instructions: Optional[str] = None
+    total_amount: float = Field(0, ge=0)
+    driver_id: Optional[int] = None
+    delivery_date: Optional[datetime] = None
+
+class DeliveryCreate(DeliveryBase):
+    # Optional delivery window to book; delivery_date defaults to its start
+    slot_start: Optional[datetime] = None
+    slot_end: Optional[datetime] = None
+
+class DeliveryStatusUpdate(BaseModel):
+    status: DeliveryStatus
+
+class Delivery(DeliveryBase):
+    id: int
+    store_owner_id: int
+    status: DeliveryStatus
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    change_seq: Optional[int] = None
+    store_name: Optional[str] = None
+    store_owner_name: Optional[str] = None
+    driver_name: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+# Delivery slot schemas
+class SlotWindow(BaseModel):
+    start: datetime
+    end: datetime
+    remaining: int
+
+class SlotBookingRequest(BaseModel):
+    start: datetime
+    end: datetime
+
+class SlotBooking(BaseModel):
+    delivery_id: int
+    store_id: int
+    driver_id: Optional[int] = None
+    slot_start: datetime
+    slot_end: datetime
+
+    class Config:
+        from_attributes = True
+
+class SlotCapacityUpdate(BaseModel):
+    day: date
+    capacity: int = Field(..., ge=0, le=10000)
+    # Part of the day to change; the whole of its delivery hours when omitted
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+class SlotCapacityResult(BaseModel):
+    day: date
+    capacity: int
+    slots: int
+
+# Job schemas
+class JobCreate(BaseModel):
+    job_type: str
+    payload: Dict[str, Any] = {}
+    priority: int = 0
+    delay_seconds: float = Field(0, ge=0)
+
+class Job(BaseModel):
+    id: int
+    job_type: str
+    payload: Json[Any]
+    priority: int
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    enqueued_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class JobTypeStats(BaseModel):
+    job_type: str
+    queued: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
+    # Jobs finished within the stats window, and their average latencies
+    finished_recent: int = 0
+    failed_recent: int = 0
+    wait_seconds_avg: float = 0.0
+    run_seconds_avg: float = 0.0
+
+class QueueStats(BaseModel):
+    types: List[JobTypeStats]
+    oldest_runnable_seconds: float
+    window_minutes: int
+
+# Notification schemas
+class Notification(BaseModel):
+    id: int
+    delivery_id: int
+    event: str
+    channel: str
+    provider: str
+    recipient: str
+    body: str
+    status: str
+    attempts: int
+    provider_message_id: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Proof-of-delivery schemas
+class DeliveryProof(BaseModel):
+    id: int
+    delivery_id: int
+    content_hash: str
+    size_bytes: int
+    status: str
+    media_type: Optional[str] = None
+    has_thumbnail: bool
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Sync schemas
+class SyncChanges(BaseModel):
+    deliveries: List[Delivery]
+    cursor: int
+    has_more: bool
+    # The client's cursor is ahead of the server (e.g. restored database): drop local state and sync from 0
+    reset: bool = False
+
+class SyncStatusChange(BaseModel):
+    client_id: str = Field(..., min_length=1, max_length=64)
+    delivery_id: int
+    status: DeliveryStatus
+    # change_seq of the client's copy when the change was made offline
+    base_seq: Optional[int] = None
+
+class SyncPush(BaseModel):
+    changes: List[SyncStatusChange] = Field(..., min_length=1)
+
+class SyncChangeResult(BaseModel):
+    client_id: str
+    delivery_id: int
+    result: str
+    replayed: bool
+    delivery: Optional[Delivery] = None
+
+class SyncPushResult(BaseModel):
+    results: List[SyncChangeResult]
+    cursor: int
+
+# Bootstrap schemas
+class DriverSummary(BaseModel):
+    id: int
+    username: str
+    
+    class Config:
+        from_attributes = True
+
+class Bootstrap(BaseModel):
+    user: User
+    stores: List[Store]
+    drivers: List[DriverSummary]
+    stock: List[StockItem]
+    orders: List[Delivery]
+    # Delta sync cursor matching ``orders``; pass to /api/sync
+    cursor: int
+
+# Billing schemas
+class BillingAccount(BaseModel):
+    upi_id: str
+    mobile: str
+    rate_per_order: float
+
+class BillingRun(BaseModel):
+    start: date
+    # Exclusive
+    end: date
+    rate_per_order: Optional[float] = Field(None, gt=0)
+    store_ids: Optional[List[int]] = None
+
+class BillingRunResult(BaseModel):
+    start: date
+    end: date
+    invoices: int
+    seconds: float
+
+class InvoicePayment(BaseModel):
+    payer_upi_id: Optional[str] = None
+
+class Invoice(BaseModel):
+    id: int
+    store_id: int
+    store_owner_id: int
+    period_start: date
+    period_end: date
+    order_count: int
+    order_revenue: float
+    rate_per_order: float
+    amount: float
+    status: InvoiceStatus
+    payer_upi_id: Optional[str] = None
+    paid_at: Optional[datetime] = None
+    generated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Analytics schemas
+class RollupBreakdown(BaseModel):
+    scope_id: int
+    total: int
+    revenue: float
+    by_status: Dict[str, int]
+
+class AnalyticsSummary(BaseModel):
+    generated_at: datetime
+    overall: RollupBreakdown
+    today: RollupBreakdown
+    active_stores: int
+    active_drivers: int
+    stores: List[RollupBreakdown]
+    drivers: List[RollupBreakdown]
+
+# Live tracking schemas
+class RouteStopIn(BaseModel):
+    delivery_id: int
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    service_minutes: Optional[float] = Field(None, ge=0)
+
+class RoutePlan(BaseModel):
+    stops: List[RouteStopIn]
+
+class DriverPing(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    recorded_at: Optional[datetime] = None
+
+class StopEta(BaseModel):
+    delivery_id: int
+    eta: datetime
+    distance_km: float
 
+class DriverEta(BaseModel):
+    driver_id: int
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    speed_kmh: float
+    updated_at: datetime
+    stops: List[StopEta]
@@ -0,0 +1,157 @@
+import re
+from typing import List, Optional
+from sqlalchemy import Float, Integer, bindparam, column, func, literal_column, or_, select, table, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query
+from app.models import Delivery
+from app.security import InputValidation
+
+# Delivery search over customer name, address and phone.
+#   Postgres: pg_trgm GIN indexes for fuzzy/partial name and address matches
+#             plus a GIN tsvector index for word-prefix matches.
+#   SQLite:   an external-content FTS5 table kept in sync by triggers.
+# Phone fragments are normalized to national-number digits and matched as a
+# prefix of deliveries.customer_phone_digits through its B-tree index.
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+PHONE_QUERY = re.compile(r"^[\d\s+()\-]+$")
+MIN_PHONE_DIGITS = 3
+BACKFILL_BATCH_SIZE = 1000
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_deliveries_customer_name_trgm ON deliveries USING gin (customer_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_deliveries_customer_address_trgm ON deliveries USING gin (customer_address gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_deliveries_customer_tsv ON deliveries "
+    "USING gin (to_tsvector('simple', customer_name || ' ' || customer_address))",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS deliveries_fts USING fts5("
+    "customer_name, customer_address, customer_phone_digits, "
+    "content='deliveries', content_rowid='id', prefix='2 3 4')",
+    "CREATE TRIGGER IF NOT EXISTS deliveries_fts_insert AFTER INSERT ON deliveries BEGIN "
+    "INSERT INTO deliveries_fts(rowid, customer_name, customer_address, customer_phone_digits) "
+    "VALUES (new.id, new.customer_name, new.customer_address, new.customer_phone_digits); END",
+    "CREATE TRIGGER IF NOT EXISTS deliveries_fts_delete AFTER DELETE ON deliveries BEGIN "
+    "INSERT INTO deliveries_fts(deliveries_fts, rowid, customer_name, customer_address, customer_phone_digits) "
+    "VALUES ('delete', old.id, old.customer_name, old.customer_address, old.customer_phone_digits); END",
+    "CREATE TRIGGER IF NOT EXISTS deliveries_fts_update AFTER UPDATE OF "
+    "customer_name, customer_address, customer_phone_digits ON deliveries BEGIN "
+    "INSERT INTO deliveries_fts(deliveries_fts, rowid, customer_name, customer_address, customer_phone_digits) "
+    "VALUES ('delete', old.id, old.customer_name, old.customer_address, old.customer_phone_digits); "
+    "INSERT INTO deliveries_fts(rowid, customer_name, customer_address, customer_phone_digits) "
+    "VALUES (new.id, new.customer_name, new.customer_address, new.customer_phone_digits); END",
+]
+
+def ensure_search_indexes(conn: Connection):
+    """Create the dialect's search indexes; fills the SQLite index on first run."""
+    if conn.dialect.name == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.execute(text(statement))
+    elif conn.dialect.name == "sqlite":
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'deliveries_fts'"
+        )).first()
+        for statement in SQLITE_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO deliveries_fts(deliveries_fts) VALUES ('rebuild')"))
+
+def backfill_phone_digits(conn: Connection) -> int:
+    """Set customer_phone_digits on deliveries created before the column existed.
+
+    Returns the number of rows updated; every row gets a value, so later
+    runs find nothing to do.
+    """
+    table = Delivery.__table__
+    statement = update(table).where(table.c.id == bindparam("row_id")).values(
+        customer_phone_digits=bindparam("digits")
+    )
+    updated = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.customer_phone)
+            .where(table.c.customer_phone_digits.is_(None))
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return updated
+        conn.execute(statement, [
+            {"row_id": row_id, "digits": InputValidation.normalize_phone_number(phone)} for row_id, phone in rows
+        ])
+        updated += len(rows)
+
+def _next_prefix(digits: str) -> Optional[str]:
+    """Smallest digit string greater than every string starting with ``digits``."""
+    stripped = digits.rstrip("9")
+    if not stripped:
+        return None
+    return stripped[:-1] + str(int(stripped[-1]) + 1)
+
+def phone_prefix_filter(digits: str):
+    condition = Delivery.customer_phone_digits >= digits
+    upper = _next_prefix(digits)
+    if upper is not None:
+        condition = condition & (Delivery.customer_phone_digits < upper)
+    return condition
+
+def contains_pattern(term: str) -> str:
+    """LIKE pattern matching ``term`` anywhere, with its wildcards taken literally (escape ``\\``)."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def search_deliveries(query: Query, term: str, limit: int) -> List[Delivery]:
+    """Best matches for ``term`` among the deliveries selected by ``query``."""
+    term = term.strip()
+    if PHONE_QUERY.match(term):
+        digits = InputValidation.normalize_phone_number(term)
+        if len(digits) < MIN_PHONE_DIGITS:
+            return []
+        return query.filter(phone_prefix_filter(digits)).order_by(Delivery.created_at.desc()).limit(limit).all()
+
+    tokens = TOKEN.findall(term.lower())
+    if not tokens:
+        return []
+    dialect = query.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _search_postgres(query, term, tokens, limit)
+    if dialect == "sqlite":
+        return _search_sqlite(query, tokens, limit)
+    pattern = contains_pattern(term)
+    return query.filter(or_(
+        Delivery.customer_name.ilike(pattern, escape="\\"),
+        Delivery.customer_address.ilike(pattern, escape="\\"),
+    )).order_by(Delivery.created_at.desc()).limit(limit).all()
+
+def _search_postgres(query: Query, term: str, tokens: List[str], limit: int) -> List[Delivery]:
+    # Must match the expression of ix_deliveries_customer_tsv exactly
+    document = func.to_tsvector(
+        literal_column("'simple'"),
+        Delivery.customer_name.op("||")(literal_column("' '")).op("||")(Delivery.customer_address)
+    )
+    tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{token}:*" for token in tokens))
+    rank = func.greatest(func.ts_rank(document, tsquery), func.similarity(Delivery.customer_name, term))
+    return query.filter(or_(
+        document.op("@@")(tsquery),
+        Delivery.customer_name.op("%")(term),
+        Delivery.customer_address.ilike(contains_pattern(term), escape="\\"),
+    )).order_by(rank.desc(), Delivery.created_at.desc()).limit(limit).all()
+
+def _search_sqlite(query: Query, tokens: List[str], limit: int) -> List[Delivery]:
+    # Every token as a quoted prefix query; bm25 scores lower for better matches.
+    # Only the caller's deliveries are ranked, and only the best ``limit`` of
+    # them leave the subquery, so other stores' matches are never sorted
+    match = " ".join(f'"{token}"*' for token in tokens)
+    fts = table("deliveries_fts", column("rowid", Integer))
+    rowid = fts.c.rowid
+    score = func.bm25(literal_column(fts.name), type_=Float)
+    ranked = select(rowid.label("id"), score.label("score")).where(
+        literal_column(fts.name).op("MATCH")(bindparam("match", match))
+    )
+    if query.whereclause is not None:
+        ranked = ranked.where(rowid.in_(query.with_entities(Delivery.id).order_by(None).statement))
+    matches = ranked.order_by(score, rowid.desc()).limit(limit).subquery()
+    return query.join(matches, matches.c.id == Delivery.id).order_by(
+        matches.c.score, Delivery.created_at.desc()
+    ).limit(limit).all()
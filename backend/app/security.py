@@ -1,6 +1,8 @@
+import asyncio
 import re
 import hashlib
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status, Request
@@ -16,8 +18,25 @@ from app.config import settings
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so hashing runs on a dedicated pool instead of
+# blocking the event loop or starving the request threadpool
+password_executor: Optional[ThreadPoolExecutor] = None
+
+def start_password_executor(max_workers: int):
+    """Create the hashing pool and load the bcrypt backend ahead of the first login."""
+    global password_executor
+    if password_executor is None:
+        password_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        password_executor.submit(pwd_context.hash, secrets.token_urlsafe(16)).result()
+
+def shutdown_password_executor():
+    global password_executor
+    if password_executor is not None:
+        password_executor.shutdown(wait=True)
+        password_executor = None
+
 # Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.RATE_LIMIT_ENABLED)
 
 # Security headers
 SECURITY_HEADERS = {
@@ -41,6 +60,18 @@ class SecurityUtils:
         """Verify a password against its hash."""
         return pwd_context.verify(plain_password, hashed_password)
     
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """Hash a password on the hashing pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+    
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the hashing pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, pwd_context.verify, plain_password, hashed_password)
+    
     @staticmethod
     def validate_password_strength(password: str) -> Dict[str, Any]:
         """Validate password strength according to security requirements."""
@@ -104,9 +135,28 @@ class SecurityUtils:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         
         to_encode.update({"exp": expire})
+        to_encode.setdefault("type", "access")
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
     
+    @staticmethod
+    def create_user_access_token(user) -> str:
+        """Create a self-contained access token carrying the claims needed to authorize requests."""
+        return SecurityUtils.create_access_token(data={
+            "sub": user.username,
+            "uid": user.id,
+            "role": user.role.value,
+            "ver": user.token_version or 0,
+            "jti": secrets.token_urlsafe(16)
+        })
+    
+    @staticmethod
+    def create_refresh_token(data: dict, jti: str, expires_at: datetime) -> str:
+        """Create a JWT refresh token identified by ``jti``."""
+        to_encode = data.copy()
+        to_encode.update({"exp": expires_at, "jti": jti, "type": "refresh"})
+        return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    
     @staticmethod
     def verify_token(token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode a JWT token."""
@@ -155,6 +205,15 @@ class InputValidation:
         # Check if it's a valid length (7-15 digits)
         return 7 <= len(digits_only) <= 15
     
+    @staticmethod
+    def normalize_phone_number(phone: str) -> str:
+        """Digits of the national number: drops formatting, a trunk 0 and the country code."""
+        digits_only = re.sub(r'\D', '', phone)
+        if phone.strip().startswith('+') and digits_only.startswith(settings.PHONE_COUNTRY_CODE):
+            digits_only = digits_only[len(settings.PHONE_COUNTRY_CODE):]
+        digits_only = digits_only.lstrip('0')
+        return digits_only[-10:] if len(digits_only) > 10 else digits_only
+    
     @staticmethod
     def validate_upi_id(upi_id: str) -> bool:
         """Validate UPI ID format."""
@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: stdlib encoder is used instead
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def default_response_class() -> Type[JSONResponse]:
+    """Response class for the app, honouring the FAST_JSON_RESPONSES setting."""
+    if settings.FAST_JSON_RESPONSES and orjson is not None:
+        return FastJSONResponse
+    return JSONResponse
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+def serialize_list(schema: Type[BaseModel], rows: Iterable[Any], headers: Optional[dict] = None) -> Response:
+    """Validate ORM rows against ``schema`` in one pass and encode to JSON bytes.
+
+    Uses a cached list TypeAdapter so ``from_attributes`` conversion and JSON
+    encoding both run inside pydantic-core, skipping FastAPI's per-item
+    response_model validation and the ``jsonable_encoder`` round-trip.
+    """
+    adapter = _list_adapter(schema)
+    items = adapter.validate_python(list(rows), from_attributes=True)
+    return Response(content=adapter.dump_json(items), media_type="application/json", headers=headers)
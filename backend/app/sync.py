@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query, Session
+from app import analytics, notifications, scheduling
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Delivery, DeliveryStatus, SyncCounter, SyncMutation
+
+# Delta sync for offline clients.
+# Every flush that inserts or changes deliveries takes the next values of the
+# "deliveries" row in sync_counters and stamps them into change_seq. The
+# counter row stays locked until the writing transaction ends, so change_seq
+# values become visible in increasing order and a client holding cursor N
+# never misses a change by asking for change_seq > N.
+
+DELIVERIES_COUNTER = "deliveries"
+
+APPLIED = "applied"
+CONFLICT = "conflict"
+NOT_FOUND = "not_found"
+
+def next_change_seq(session: Session, count: int = 1) -> int:
+    """Reserve ``count`` sequence values and return the last one."""
+    conn = session.connection()
+    value = conn.execute(
+        update(SyncCounter.__table__)
+        .where(SyncCounter.__table__.c.name == DELIVERIES_COUNTER)
+        .values(value=SyncCounter.__table__.c.value + count)
+        .returning(SyncCounter.__table__.c.value)
+    ).scalar()
+    if value is None:
+        # Counter not created yet (no app startup ran against this database)
+        conn.execute(insert(SyncCounter.__table__).values(name=DELIVERIES_COUNTER, value=count))
+        value = count
+    return value
+
+@event.listens_for(SessionLocal, "before_flush")
+def _stamp_changes(session, flush_context, instances):
+    changed = [obj for obj in session.new if isinstance(obj, Delivery)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, Delivery) and session.is_modified(obj, include_collections=False)
+    ]
+    if not changed:
+        return
+    last = next_change_seq(session, len(changed))
+    for offset, delivery in enumerate(changed, start=last - len(changed) + 1):
+        delivery.change_seq = offset
+
+def current_cursor(db: Session) -> int:
+    return db.query(SyncCounter.value).filter(SyncCounter.name == DELIVERIES_COUNTER).scalar() or 0
+
+def ensure_change_sequence(conn: Connection):
+    """Create the counter and stamp deliveries that have no change_seq yet.
+
+    Rows bulk-loaded outside the ORM (e.g. by generate_dataset.py) get
+    ``reserved base + id``, which is unique and above every value handed
+    out so far.
+    """
+    table = SyncCounter.__table__
+    if conn.execute(select(table.c.value).where(table.c.name == DELIVERIES_COUNTER)).first() is None:
+        highest = conn.execute(select(func.max(Delivery.change_seq))).scalar() or 0
+        conn.execute(insert(table).values(name=DELIVERIES_COUNTER, value=highest))
+    max_id = conn.execute(select(func.max(Delivery.id)).where(Delivery.change_seq.is_(None))).scalar()
+    if max_id is None:
+        return
+    top = conn.execute(
+        update(table).where(table.c.name == DELIVERIES_COUNTER)
+        .values(value=table.c.value + max_id).returning(table.c.value)
+    ).scalar()
+    conn.execute(
+        update(Delivery.__table__).where(Delivery.__table__.c.change_seq.is_(None))
+        .values(change_seq=Delivery.__table__.c.id + (top - max_id))
+    )
+
+def prune_mutations(db: Session, retention_days: Optional[int] = None) -> int:
+    days = settings.SYNC_MUTATION_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = db.query(SyncMutation).filter(SyncMutation.created_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def changes_since(query: Query, since: int, limit: int) -> List[Delivery]:
+    """Up to ``limit + 1`` deliveries from ``query`` changed after ``since``, oldest change first."""
+    return query.filter(Delivery.change_seq > since).order_by(Delivery.change_seq).limit(limit + 1).all()
+
+def _changed_by_user(db: Session, user_id: int, delivery: Delivery) -> bool:
+    """Whether the delivery's latest change was one of the user's own synced changes."""
+    return db.query(SyncMutation.id).filter(
+        SyncMutation.user_id == user_id,
+        SyncMutation.delivery_id == delivery.id,
+        SyncMutation.change_seq == delivery.change_seq
+    ).first() is not None
+
+def apply_status_changes(db: Session, query: Query, user_id: int, changes: list) -> List[dict]:
+    """Apply queued offline status changes in order and report each outcome.
+
+    ``query`` selects the deliveries the user may change. A change whose
+    client id was seen before returns the stored outcome without being
+    applied again. A change based on an older copy (``base_seq``) than the
+    server's is a conflict, unless the delivery already has the requested
+    status or was last changed by this user's own synced changes. The
+    caller commits.
+    """
+    client_ids = [change.client_id for change in changes]
+    seen: Dict[str, SyncMutation] = {
+        mutation.client_id: mutation
+        for mutation in db.query(SyncMutation).filter(
+            SyncMutation.user_id == user_id, SyncMutation.client_id.in_(client_ids)
+        )
+    }
+    delivery_ids = sorted({change.delivery_id for change in changes})
+    # Lock in id order so concurrent batches cannot deadlock (no-op on SQLite)
+    deliveries = {
+        delivery.id: delivery
+        for delivery in query.filter(Delivery.id.in_(delivery_ids)).order_by(Delivery.id).with_for_update()
+    }
+
+    results = []
+    for change in changes:
+        delivery = deliveries.get(change.delivery_id)
+        mutation = seen.get(change.client_id)
+        if mutation is not None:
+            results.append({"client_id": change.client_id, "delivery_id": mutation.delivery_id,
+                            "result": mutation.result, "replayed": True, "delivery": delivery})
+            continue
+
+        if delivery is None:
+            result = NOT_FOUND
+        elif delivery.status == change.status:
+            result = APPLIED
+        elif (change.base_seq is not None and (delivery.change_seq or 0) > change.base_seq
+              and not _changed_by_user(db, user_id, delivery)):
+            result = CONFLICT
+        else:
+            before = analytics.capture(delivery)
+            delivery.status = change.status
+            db.flush()
+            analytics.apply_delivery_change(db, before, delivery)
+            if delivery.status == DeliveryStatus.CANCELLED:
+                scheduling.release(db, delivery.id)
+            notifications.notify_status_change(db, delivery)
+            result = APPLIED
+
+        mutation = SyncMutation(
+            user_id=user_id,
+            client_id=change.client_id,
+            delivery_id=change.delivery_id,
+            result=result,
+            change_seq=delivery.change_seq if result == APPLIED else None
+        )
+        db.add(mutation)
+        db.flush()
+        seen[change.client_id] = mutation
+        results.append({"client_id": change.client_id, "delivery_id": change.delivery_id,
+                        "result": result, "replayed": False, "delivery": delivery})
+    return results
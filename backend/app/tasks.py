@@ -0,0 +1,66 @@
+from datetime import date
+import structlog
+from app import jobs, notifications, proofs
+from app.analytics import rebuild_rollups
+from app.archive import archive_deliveries
+from app.billing import generate_invoices
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.partitioning import ensure_partitions
+
+logger = structlog.get_logger()
+
+# Job handlers. Import this module wherever jobs run (API lifespan,
+# run_jobs.py) so the handlers are registered.
+
+@jobs.handler("rollups.rebuild", concurrency=1)
+def rebuild_rollups_job(payload: dict):
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollups(db)
+    finally:
+        db.close()
+    logger.info("Rollups rebuilt", rows=rows)
+
+@jobs.handler("archive.run", concurrency=1)
+def archive_job(payload: dict):
+    """payload: ``older_than_days`` (default ARCHIVE_AFTER_DAYS)."""
+    db = SessionLocal()
+    try:
+        archived = archive_deliveries(db, payload.get("older_than_days"))
+    finally:
+        db.close()
+    logger.info("Deliveries archived", archived=archived)
+
+@jobs.handler("billing.generate", concurrency=1)
+def billing_job(payload: dict):
+    """payload: ``start`` and ``end`` ISO dates, optional ``rate_per_order`` and ``store_ids``."""
+    db = SessionLocal()
+    try:
+        count = generate_invoices(
+            db,
+            date.fromisoformat(payload["start"]),
+            date.fromisoformat(payload["end"]),
+            payload.get("rate_per_order"),
+            payload.get("store_ids")
+        )
+    finally:
+        db.close()
+    logger.info("Invoices generated", start=payload["start"], end=payload["end"], invoices=count)
+
+@jobs.handler("partitions.ensure", concurrency=1, every_seconds=settings.PARTITION_CHECK_HOURS * 3600)
+def ensure_partitions_job(payload: dict):
+    """Create upcoming monthly partitions while the app runs, not only at startup."""
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD)
+    if created:
+        logger.info("Partitions created", partitions=created)
+
+@jobs.handler(proofs.PROCESS_JOB)
+def process_proof_job(payload: dict):
+    proofs.process(payload["content_hash"])
+
+@jobs.handler(notifications.FLUSH_JOB, concurrency=1)
+def flush_notifications_job(payload: dict):
+    """One flusher at a time keeps each provider's sends within its rate limit."""
+    notifications.flush(payload["provider"])
@@ -0,0 +1,27 @@
+import argparse
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.archive import archive_deliveries
+from app.partitioning import ensure_partitions
+
+def main():
+    """Move settled deliveries older than ARCHIVE_AFTER_DAYS to compressed archive files."""
+    parser = argparse.ArgumentParser(description="Archive old delivered/cancelled orders")
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--directory", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD)
+
+    db = SessionLocal()
+    try:
+        archived = archive_deliveries(db, args.days, args.directory)
+        print(f"Archived {archived} deliveries to {args.directory}.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite over a generated dataset.
+Run generate_dataset.py first against the same DATABASE_URL, then:
+
+    python -m benchmarks.bench_endpoints --repeat 50 --output endpoints.json
+
+Requests go in-process through the ASGI app; tokens are minted directly
+for generated users so bcrypt cost does not skew the numbers.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from main import app
+from app.database import SessionLocal
+from app.models import User, UserRole, Delivery
+from app.security import SecurityUtils, limiter
+
+def token_for(db, role: UserRole, prefix: str, busiest: bool = False) -> dict:
+    query = db.query(User).filter(User.role == role, User.username.like(f"{prefix}%"))
+    if busiest:
+        column = Delivery.store_owner_id if role == UserRole.STORE_OWNER else Delivery.driver_id
+        top = db.query(column).group_by(column).order_by(func.count().desc()).limit(1).scalar()
+        query = query.filter(User.id == top)
+    user = query.first()
+    if user is None:
+        raise SystemExit(f"No generated {role.value} found; run generate_dataset.py first")
+    return {"Authorization": f"Bearer {SecurityUtils.create_user_access_token(user)}"}
+
+def measure(client: TestClient, path: str, headers: dict, repeat: int) -> dict:
+    timings = []
+    status = None
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+        size = len(response.content)
+    timings.sort()
+    return {
+        "status": status,
+        "bytes": size,
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "min_ms": round(timings[0], 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints against a generated dataset")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write timings as JSON to this file")
+    args = parser.parse_args()
+
+    limiter.enabled = False
+    db = SessionLocal()
+    developer = token_for(db, UserRole.DEVELOPER, "bench_dev_")
+    owner = token_for(db, UserRole.STORE_OWNER, "bench_owner_", busiest=True)
+    driver = token_for(db, UserRole.DRIVER, "bench_driver_", busiest=True)
+    deliveries = db.query(func.count(Delivery.id)).scalar()
+    db.close()
+
+    day_ago = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    client = TestClient(app, base_url="http://localhost")
+    etag = client.get("/api/users/", headers=developer).headers.get("etag", "")
+
+    cases = [
+        ("users list (developer)", "/api/users/?limit=100", developer),
+        ("users list 304", "/api/users/?limit=100", {**developer, "If-None-Match": etag}),
+        ("users deep page", "/api/users/?skip=4000&limit=100", developer),
+        ("deliveries list (developer)", "/api/deliveries/?limit=100", developer),
+        ("deliveries list (store owner)", "/api/deliveries/?limit=100", owner),
+        ("deliveries pending (driver)", "/api/deliveries/?status=picked_up&limit=100", driver),
+        ("analytics summary (developer)", "/api/analytics/summary", developer),
+        ("analytics summary (store owner)", "/api/analytics/summary", owner),
+        ("export last day (store owner)", f"/api/deliveries/export?start={day_ago}", owner),
+    ]
+
+    results = {"timestamp": datetime.utcnow().isoformat(), "deliveries": deliveries, "endpoints": {}}
+    print(f"{'endpoint':<34}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>10}")
+    for name, path, headers in cases:
+        result = measure(client, path, headers, args.repeat)
+        results["endpoints"][name] = result
+        print(f"{name:<34}{result['status']:>7}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['bytes']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
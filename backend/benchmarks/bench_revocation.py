@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of the access token revocation check.
+Compares the in-memory RevocationStore lookup with a per-request
+database lookup against revoked_tokens, and with full JWT decoding for
+scale, using an in-memory SQLite database populated with revoked ids.
+
+Run from the backend directory:  python -m benchmarks.bench_revocation
+"""
+
+import os
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///file:bench_revocation?mode=memory&cache=shared&uri=true")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import Base, RevokedToken, User, UserRole
+from app.revocation import RevocationStore
+from app.security import SecurityUtils
+
+REVOKED = 10_000
+CHECKS = 100_000
+
+def per_check_us(fn, ids) -> float:
+    start = time.perf_counter()
+    for jti in ids:
+        fn(jti)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+def main():
+    keeper = engine.connect()  # keep the shared in-memory database alive
+    Base.metadata.create_all(bind=engine)
+    expires = datetime.utcnow() + timedelta(minutes=15)
+    revoked_ids = [secrets.token_urlsafe(16) for _ in range(REVOKED)]
+    db = SessionLocal()
+    db.bulk_insert_mappings(RevokedToken, [{"jti": jti, "expires_at": expires} for jti in revoked_ids])
+    db.commit()
+
+    store = RevocationStore(sync_interval=2.0)
+    store.sync()
+    probes = [secrets.token_urlsafe(16) for _ in range(CHECKS // 2)] + revoked_ids * (CHECKS // 2 // REVOKED)
+
+    memory_us = per_check_us(store.is_revoked, probes)
+    db_us = per_check_us(
+        lambda jti: db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None,
+        probes[:5_000],
+    )
+    user = User(id=1, username="bench", role=UserRole.DRIVER, token_version=0)
+    tokens = [SecurityUtils.create_user_access_token(user) for _ in range(1_000)]
+    decode_us = per_check_us(SecurityUtils.verify_token, tokens)
+
+    print(f"revoked ids held:          {len(store)}")
+    print(f"in-memory check:           {memory_us:8.3f} us/request")
+    print(f"DB lookup per request:     {db_us:8.3f} us/request")
+    print(f"JWT decode (for scale):    {decode_us:8.3f} us/request")
+    db.close()
+    keeper.close()
+
+if __name__ == "__main__":
+    main()
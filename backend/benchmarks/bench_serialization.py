@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for list endpoints.
+Compares FastAPI's default response path (per-item response_model
+validation, jsonable_encoder, stdlib json) with the bulk TypeAdapter path
+used by app.serialization.serialize_list, for 1k and 10k users/deliveries.
+
+Run from the backend directory:  python -m benchmarks.bench_serialization
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from app.models import User, UserRole, Delivery, DeliveryStatus
+from app.schemas import User as UserSchema, Delivery as DeliverySchema
+from app.serialization import serialize_list, FastJSONResponse
+
+SIZES = [1_000, 10_000]
+REPEAT = 5
+
+def make_users(count: int) -> List[User]:
+    now = datetime.utcnow()
+    return [
+        User(
+            id=i,
+            username=f"user{i}",
+            email=f"user{i}@delivery.com",
+            hashed_password="x",
+            role=UserRole.DRIVER,
+            is_active=True,
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+def make_deliveries(count: int) -> List[Delivery]:
+    now = datetime.utcnow()
+    return [
+        Delivery(
+            id=i,
+            store_id=i % 50,
+            store_owner_id=i % 50,
+            driver_id=i % 500,
+            customer_name=f"Customer {i}",
+            customer_phone="+91 98765 43210",
+            customer_address=f"{i} MG Road, Bengaluru",
+            customer_location="12.9716,77.5946",
+            items="2x Airavya coconut oil 1L",
+            special_instructions="Ring the bell",
+            status=DeliveryStatus.PENDING,
+            total_amount=Decimal("349.00"),
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+def default_path(schema, rows) -> bytes:
+    """Roughly what FastAPI does for response_model=List[schema]."""
+    validated = [schema.model_validate(row, from_attributes=True) for row in rows]
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def orjson_response_path(schema, rows) -> bytes:
+    """Default validation, but rendered through FastJSONResponse."""
+    validated = [schema.model_validate(row, from_attributes=True) for row in rows]
+    return FastJSONResponse(jsonable_encoder(validated)).body
+
+def bulk_path(schema, rows) -> bytes:
+    return serialize_list(schema, rows).body
+
+def best_of(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    print(f"{'dataset':<12}{'items':>8}{'default ms':>14}{'orjson ms':>12}{'bulk ms':>10}{'speedup':>10}")
+    results = []
+    for name, factory, schema in [("users", make_users, UserSchema), ("deliveries", make_deliveries, DeliverySchema)]:
+        for size in SIZES:
+            rows = factory(size)
+            assert json.loads(default_path(schema, rows)) == json.loads(bulk_path(schema, rows))
+            default_ms = best_of(default_path, schema, rows)
+            orjson_ms = best_of(orjson_response_path, schema, rows)
+            bulk_ms = best_of(bulk_path, schema, rows)
+            results.append({
+                "dataset": name,
+                "items": size,
+                "default_ms": round(default_ms, 2),
+                "orjson_response_ms": round(orjson_ms, 2),
+                "bulk_ms": round(bulk_ms, 2),
+            })
+            print(f"{name:<12}{size:>8}{default_ms:>14.2f}{orjson_ms:>12.2f}{bulk_ms:>10.2f}{default_ms / bulk_ms:>9.1f}x")
+    return results
+
+if __name__ == "__main__":
+    main()
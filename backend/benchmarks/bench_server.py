@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare requests/sec of the plain uvicorn launcher (as in the Procfile)
+against serve.py. Each launcher is started as a subprocess on a free port
+with rate limiting disabled, warmed up, then driven by concurrent httpx
+clients for a fixed duration over a mix of public and authenticated
+routes. Run the client on a different machine (``--url`` is not used
+here) or pin the server to other cores for the most faithful numbers.
+
+    python -m benchmarks.bench_server --duration 20 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "Bench@2024!Secure"
+
+LAUNCHERS = {
+    "uvicorn (current)": lambda port: [sys.executable, "-m", "uvicorn", "main:app",
+                                       "--host", "127.0.0.1", "--port", str(port)],
+    "serve.py": lambda port: [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port)],
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", headers={"Host": "localhost"}).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+async def authenticate(client: httpx.AsyncClient) -> dict:
+    username = f"bench_srv_{uuid.uuid4().hex[:8]}"
+    await client.post("/api/auth/register", json={
+        "username": username,
+        "email": f"{username}@bench.delivery.com",
+        "password": PASSWORD,
+        "role": "developer",
+    })
+    response = await client.post("/api/auth/login", data={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def drive(url: str, concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0,
+                                 headers={"Host": "localhost"}) as client:
+        auth = await authenticate(client)
+        paths = [("/health", {}), ("/api/stores/", auth), ("/api/deliveries/?limit=50", auth),
+                 ("/api/analytics/summary", auth)]
+        completed = 0
+        errors = 0
+
+        async def worker(offset: int, deadline: float):
+            nonlocal completed, errors
+            i = offset
+            while time.perf_counter() < deadline:
+                path, headers = paths[i % len(paths)]
+                i += 1
+                try:
+                    response = await client.get(path, headers=headers)
+                    completed += 1
+                    errors += response.status_code >= 400
+                except httpx.HTTPError:
+                    errors += 1
+
+        # Warm-up so connection setup and first-request costs are excluded
+        await asyncio.gather(*(worker(i, time.perf_counter() + 2) for i in range(concurrency)))
+        completed = errors = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i, start + duration) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {"requests": completed, "errors": errors, "requests_per_second": round(completed / elapsed, 1)}
+
+def run_launcher(name: str, concurrency: int, duration: float) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "RATE_LIMIT_ENABLED": "false"}
+    server = subprocess.Popen(LAUNCHERS[name](port), cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(url)
+        result = asyncio.run(drive(url, concurrency, duration))
+        stopping = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+        result["shutdown_seconds"] = round(time.perf_counter() - stopping, 2)
+        return result
+    finally:
+        if server.poll() is None:
+            server.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare launcher throughput")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"cpu_count": os.cpu_count(), "launchers": {}}
+    print(f"{'launcher':<20}{'req/s':>10}{'errors':>8}{'shutdown s':>12}")
+    for name in LAUNCHERS:
+        result = run_launcher(name, args.concurrency, args.duration)
+        results["launchers"][name] = result
+        print(f"{name:<20}{result['requests_per_second']:>10}{result['errors']:>8}{result['shutdown_seconds']:>12}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
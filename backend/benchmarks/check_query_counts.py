@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Check that delivery responses issue a constant number of SQL statements
+regardless of page size (no N+1 from store/driver/owner names).
+Run generate_dataset.py first against the same DATABASE_URL, then:
+
+    python -m benchmarks.check_query_counts
+
+Exits non-zero when any endpoint's query count grows with the page size.
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from main import app
+from app.database import SessionLocal, engine
+from app.models import UserRole
+from app.security import limiter
+from benchmarks.bench_endpoints import token_for
+
+PAGE_SIZES = (5, 50, 500)
+SEARCH_PAGE_SIZES = (5, 20, 50)
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+def count_queries(client: TestClient, counter: StatementCounter, path: str, headers: dict) -> int:
+    client.get(path, headers=headers)  # Warm caches so every size is measured the same way
+    counter.count = 0
+    response = client.get(path, headers=headers)
+    if response.status_code != 200:
+        raise SystemExit(f"{path} returned {response.status_code}")
+    return counter.count
+
+def main():
+    limiter.enabled = False
+    db = SessionLocal()
+    developer = token_for(db, UserRole.DEVELOPER, "bench_dev_")
+    owner = token_for(db, UserRole.STORE_OWNER, "bench_owner_", busiest=True)
+    db.close()
+
+    counter = StatementCounter()
+    event.listen(engine, "after_cursor_execute", counter)
+    cases = [
+        ("deliveries list (developer)", "/api/deliveries/?limit={size}", developer, PAGE_SIZES),
+        ("deliveries list (store owner)", "/api/deliveries/?limit={size}", owner, PAGE_SIZES),
+        ("deliveries search (developer)", "/api/deliveries/search?q=ra&limit={size}", developer, SEARCH_PAGE_SIZES),
+        ("sync pull (store owner)", "/api/sync/?since=0&limit={size}", owner, PAGE_SIZES),
+    ]
+
+    failed = False
+    with TestClient(app, base_url="http://localhost") as client:
+        print(f"{'endpoint':<34}{'page sizes':>16}{'queries':>12}")
+        for name, path, headers, sizes in cases:
+            counts = [count_queries(client, counter, path.format(size=size), headers) for size in sizes]
+            constant = len(set(counts)) == 1
+            failed = failed or not constant
+            print(f"{name:<34}{'/'.join(map(str, sizes)):>16}{'/'.join(map(str, counts)):>12}"
+                  + ("" if constant else "  GROWS"))
+
+    event.remove(engine, "after_cursor_execute", counter)
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for at-scale benchmarking.
+Fills the configured database (DATABASE_URL, SQLite or Postgres) with
+store owners, stores, drivers and deliveries whose status and time
+distributions resemble production traffic.
+
+Example:
+    DATABASE_URL=postgresql://... python generate_dataset.py --stores 500 --drivers 5000 --deliveries 2000000
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import insert, text
+from app.database import SessionLocal, engine
+from app.models import Base, User, UserRole, Store, Delivery, DeliveryStatus
+from app.analytics import rebuild_rollups
+from app.security import SecurityUtils, InputValidation
+
+DATASET_PASSWORD = "Bench@2024!Secure"
+
+FIRST_NAMES = ["Aarav", "Ananya", "Arjun", "Diya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Vihaan", "Meera",
+               "Aditya", "Priya", "Karthik", "Lakshmi", "Rahul", "Sneha", "Vikram", "Pooja", "Nikhil", "Divya"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Nair", "Patel", "Rao", "Gupta", "Menon", "Kumar", "Singh"]
+STREETS = ["MG Road", "Brigade Road", "Residency Road", "Church Street", "100 Feet Road", "CMH Road",
+           "Sarjapur Road", "Bannerghatta Road", "Hosur Road", "Old Airport Road", "Outer Ring Road"]
+AREAS = ["Indiranagar", "Koramangala", "Jayanagar", "Whitefield", "HSR Layout", "Malleshwaram",
+         "BTM Layout", "Banashankari", "Hebbal", "Yelahanka", "Marathahalli", "Electronic City"]
+PRODUCTS = ["Airavya coconut oil 1L", "Airavya sesame oil 500ml", "Airavya groundnut oil 1L",
+            "Airavya mustard oil 1L", "Airavya castor oil 250ml"]
+
+# Share of orders created in each hour of the day (lunch and evening peaks)
+HOUR_WEIGHTS = [1, 0, 0, 0, 0, 1, 2, 4, 6, 8, 9, 10, 12, 11, 9, 8, 8, 10, 12, 12, 10, 7, 4, 2]
+
+def random_phone(rng: random.Random) -> str:
+    return f"+91 {rng.choice('6789')}{rng.randint(0, 9999):04d} {rng.randint(0, 99999):05d}"
+
+def random_address(rng: random.Random) -> str:
+    return f"{rng.randint(1, 999)}, {rng.choice(STREETS)}, {rng.choice(AREAS)}, Bengaluru"
+
+def random_status(rng: random.Random, age: timedelta) -> DeliveryStatus:
+    """Old orders are settled; recent ones are still moving through the pipeline."""
+    roll = rng.random()
+    if age > timedelta(days=2):
+        if roll < 0.93:
+            return DeliveryStatus.DELIVERED
+        if roll < 0.98:
+            return DeliveryStatus.CANCELLED
+        return DeliveryStatus.PICKED_UP
+    if age > timedelta(hours=6):
+        if roll < 0.70:
+            return DeliveryStatus.DELIVERED
+        if roll < 0.75:
+            return DeliveryStatus.CANCELLED
+        return DeliveryStatus.PICKED_UP if roll < 0.90 else DeliveryStatus.PENDING
+    if roll < 0.30:
+        return DeliveryStatus.DELIVERED
+    return DeliveryStatus.PICKED_UP if roll < 0.60 else DeliveryStatus.PENDING
+
+def create_users(db, prefix: str, role: UserRole, count: int, hashed_password: str, batch_size: int) -> list:
+    """Bulk insert users sharing one precomputed password hash; returns their ids."""
+    for start in range(0, count, batch_size):
+        db.execute(insert(User), [
+            {
+                "username": f"{prefix}{i}",
+                "email": f"{prefix}{i}@bench.delivery.com",
+                "hashed_password": hashed_password,
+                "role": role,
+                "is_active": True,
+            }
+            for i in range(start, min(start + batch_size, count))
+        ])
+    db.commit()
+    return [user_id for (user_id,) in db.query(User.id).filter(User.username.like(f"{prefix}%")).order_by(User.id)]
+
+def create_stores(db, owner_ids: list, count: int, rng: random.Random) -> list:
+    db.execute(insert(Store), [
+        {
+            "name": f"Bench Store {i}",
+            "address": random_address(rng),
+            "phone": random_phone(rng),
+            "owner_id": owner_ids[i % len(owner_ids)],
+        }
+        for i in range(count)
+    ])
+    db.commit()
+    return [(store_id, owner_id) for store_id, owner_id in
+            db.query(Store.id, Store.owner_id).filter(Store.name.like("Bench Store %")).order_by(Store.id)]
+
+def delivery_rows(count: int, stores: list, driver_ids: list, days: int, rng: random.Random):
+    """Yield delivery dicts with recency-skewed, peak-hour weighted timestamps."""
+    now = datetime.utcnow()
+    hours = list(range(24))
+    hour_weights = list(itertools.accumulate(HOUR_WEIGHTS))
+    # Busy stores get most orders
+    store_weights = list(itertools.accumulate(rng.paretovariate(1.5) for _ in stores))
+    for _ in range(count):
+        day_offset = days * (1 - rng.random() ** 0.7)  # more volume in recent months
+        created_at = (now - timedelta(days=day_offset)).replace(
+            hour=rng.choices(hours, cum_weights=hour_weights)[0], minute=rng.randint(0, 59), second=rng.randint(0, 59)
+        )
+        if created_at > now:
+            created_at -= timedelta(days=1)
+        status = random_status(rng, now - created_at)
+        store_id, owner_id = rng.choices(stores, cum_weights=store_weights)[0]
+        driver_id = None if status == DeliveryStatus.PENDING and rng.random() < 0.6 else rng.choice(driver_ids)
+        updated_at = None
+        if status != DeliveryStatus.PENDING:
+            updated_at = min(created_at + timedelta(minutes=rng.randint(10, 180)), now)
+        phone = random_phone(rng)
+        yield {
+            "store_id": store_id,
+            "store_owner_id": owner_id,
+            "driver_id": driver_id,
+            "customer_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "customer_phone": phone,
+            "customer_phone_digits": InputValidation.normalize_phone_number(phone),
+            "customer_address": random_address(rng),
+            "customer_location": f"{12.85 + rng.random() * 0.3:.5f},{77.45 + rng.random() * 0.3:.5f}",
+            "items": f"{rng.randint(1, 4)}x {rng.choice(PRODUCTS)}",
+            "special_instructions": "",
+            "status": status,
+            "total_amount": Decimal(rng.randint(99, 2499)),
+            "delivery_date": None,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+def copy_deliveries(rows, batch_size: int) -> bool:
+    """Load rows with Postgres COPY via psycopg2. Returns False if unavailable."""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if not hasattr(cursor, "copy_expert"):
+            return False
+        columns = None
+        batch = []
+
+        def flush():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow(["" if value is None else value for value in row])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY deliveries ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            batch.clear()
+
+        for row in rows:
+            if columns is None:
+                columns = list(row)
+            # SQLAlchemy stores Enum members by name
+            batch.append([row[c].name if c == "status" else row[c] for c in columns])
+            if len(batch) >= batch_size:
+                flush()
+                raw.commit()
+        if batch:
+            flush()
+        raw.commit()
+        return True
+    finally:
+        raw.close()
+
+def insert_deliveries(db, rows, batch_size: int, total: int):
+    """Load rows with executemany in batches (SQLite and other dialects)."""
+    batch = []
+    inserted = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(insert(Delivery), batch)
+            db.commit()
+            inserted += len(batch)
+            batch.clear()
+            print(f"  {inserted}/{total} deliveries", end="\r", flush=True)
+    if batch:
+        db.execute(insert(Delivery), batch)
+        db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark dataset")
+    parser.add_argument("--stores", type=int, default=500)
+    parser.add_argument("--stores-per-owner", type=int, default=1)
+    parser.add_argument("--drivers", type=int, default=5000)
+    parser.add_argument("--deliveries", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=180, help="History length in days")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    if db.query(Store.id).filter(Store.name.like("Bench Store %")).first():
+        print("Benchmark dataset already present; use a fresh database.")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    hashed_password = SecurityUtils.hash_password(DATASET_PASSWORD)
+    owners = max(1, args.stores // max(1, args.stores_per_owner))
+    owner_ids = create_users(db, "bench_owner_", UserRole.STORE_OWNER, owners, hashed_password, args.batch_size)
+    driver_ids = create_users(db, "bench_driver_", UserRole.DRIVER, args.drivers, hashed_password, args.batch_size)
+    create_users(db, "bench_dev_", UserRole.DEVELOPER, 1, hashed_password, args.batch_size)
+    stores = create_stores(db, owner_ids, args.stores, rng)
+    print(f"Created {len(owner_ids)} store owners, {len(stores)} stores, {len(driver_ids)} drivers")
+
+    rows = delivery_rows(args.deliveries, stores, driver_ids, args.days, rng)
+    if engine.dialect.name == "postgresql" and copy_deliveries(rows, args.batch_size):
+        method = "COPY"
+    else:
+        insert_deliveries(db, rows, args.batch_size, args.deliveries)
+        method = "executemany"
+    print(f"\nLoaded {args.deliveries} deliveries with {method} in {time.perf_counter() - started:.1f}s")
+
+    rollups = rebuild_rollups(db)
+    print(f"Rebuilt {rollups} rollup rows")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    db.close()
+
+    print(f"\nDone in {time.perf_counter() - started:.1f}s. All generated users share the password {DATASET_PASSWORD}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import time
+from datetime import datetime
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.billing import OverlappingPeriod, generate_invoices, month_bounds
+from app.partitioning import add_months
+
+def main():
+    """Compute (or refresh) every store's invoice for one month."""
+    parser = argparse.ArgumentParser(description="Generate monthly store invoices from delivered orders")
+    parser.add_argument("--month", help="YYYY-MM (default: previous month)")
+    parser.add_argument("--rate", type=float, default=settings.BILLING_RATE_PER_ORDER, help="Rate per delivered order")
+    args = parser.parse_args()
+
+    if args.month:
+        month = datetime.strptime(args.month, "%Y-%m").date()
+    else:
+        month = add_months(datetime.utcnow().date().replace(day=1), -1)
+    start, end = month_bounds(month)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        try:
+            count = generate_invoices(db, start, end, args.rate)
+        except OverlappingPeriod as exc:
+            raise SystemExit(str(exc))
+        print(f"Generated {count} invoices for {start:%Y-%m} in {time.perf_counter() - started:.2f}s.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
-from app.models import Base, User, UserRole
+from app.models import User, UserRole
 from app.auth import get_password_hash
+from app.migrations import prepare_database
 
 def init_db():
     """Initialize database with default users."""
-    Base.metadata.create_all(bind=engine)
+    prepare_database(engine)
     
     db = SessionLocal()
     
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Asynchronous load-test harness for the Delivery Management System API.
+
+Runs a JSON scenario with many concurrent virtual users, either in-process
+against the ASGI app or against a running server, and reports throughput,
+p50/p95/p99 latency and error rates per step as JSON for regression
+comparison.
+
+Examples (from the backend directory):
+    python -m loadtest.runner loadtest/scenarios/driver_polling.json --in-process
+    python -m loadtest.runner loadtest/scenarios/login_storm.json --url http://localhost:8000 \
+        --output login.json --compare baseline/login.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+DEFAULT_PASSWORD = "LoadTest@2024!"
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+def render(value: Any, context: Dict[str, Any]) -> Any:
+    """Substitute ``{name}`` placeholders in strings, dicts and lists.
+
+    A string that is exactly one placeholder keeps the context value's type.
+    """
+    if isinstance(value, str):
+        whole = PLACEHOLDER.fullmatch(value)
+        if whole:
+            return context.get(whole.group(1), value)
+        return PLACEHOLDER.sub(lambda m: str(context.get(m.group(1), m.group(0))), value)
+    if isinstance(value, dict):
+        return {key: render(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render(item, context) for item in value]
+    return value
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class Metrics:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, int] = Counter()
+
+    def record(self, step: str, elapsed_ms: float, status: Optional[int], ok: bool):
+        self.latencies[step].append(elapsed_ms)
+        self.statuses[step][str(status) if status is not None else "exception"] += 1
+        if not ok:
+            self.errors[step] += 1
+
+    @staticmethod
+    def _summary(latencies: List[float], errors: int, duration: float, statuses: Counter) -> dict:
+        ordered = sorted(latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / duration, 2) if duration else 0.0,
+            "latency_ms": {
+                "mean": round(sum(ordered) / count, 2) if count else 0.0,
+                "p50": round(percentile(ordered, 50), 2),
+                "p95": round(percentile(ordered, 95), 2),
+                "p99": round(percentile(ordered, 99), 2),
+                "max": round(ordered[-1], 2) if count else 0.0,
+            },
+            "status_codes": dict(statuses),
+        }
+
+    def report(self, duration: float) -> dict:
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        all_statuses = Counter()
+        for statuses in self.statuses.values():
+            all_statuses.update(statuses)
+        return {
+            "duration_seconds": round(duration, 3),
+            "overall": self._summary(all_latencies, sum(self.errors.values()), duration, all_statuses),
+            "steps": {
+                step: self._summary(latencies, self.errors[step], duration, self.statuses[step])
+                for step, latencies in self.latencies.items()
+            },
+        }
+
+class VirtualUser:
+    """One simulated client: registers, logs in, runs setup then loops the steps."""
+
+    def __init__(self, index: int, run_id: str, scenario: dict, client: httpx.AsyncClient, metrics: Metrics):
+        self.index = index
+        self.scenario = scenario
+        self.client = client
+        self.metrics = metrics
+        self.token: Optional[str] = None
+        role = scenario.get("user", {}).get("role", "driver")
+        self.context: Dict[str, Any] = {
+            "index": index,
+            "role": role,
+            "username": f"lt{run_id}_{role}_{index}",
+            "password": DEFAULT_PASSWORD,
+            **scenario.get("variables", {}),
+        }
+
+    async def request(self, step: dict, measure: bool = True) -> Optional[httpx.Response]:
+        self.context["rand"] = random.randint(0, 10**9)
+        self.context["phone"] = "9" + "".join(random.choice("0123456789") for _ in range(9))
+        name = step.get("name", f"{step['method']} {step['path']}")
+        method = step["method"].upper()
+        path = render(step["path"], self.context)
+        headers = {}
+        if step.get("auth", True) and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        kwargs: Dict[str, Any] = {"headers": headers}
+        if "json" in step:
+            kwargs["json"] = render(step["json"], self.context)
+        if "form" in step:
+            kwargs["data"] = render(step["form"], self.context)
+        if "params" in step:
+            kwargs["params"] = render(step["params"], self.context)
+
+        expected = step.get("expect", [200])
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            ok = response.status_code in expected
+        except httpx.HTTPError:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if measure:
+            self.metrics.record(name, elapsed_ms, response.status_code if response is not None else None, ok)
+        if ok and response is not None and step.get("save"):
+            body = response.json()
+            for var, field in step["save"].items():
+                value = body
+                for part in field.split("."):
+                    value = value[int(part)] if isinstance(value, list) else value.get(part)
+                self.context[var] = value
+        return response if ok else None
+
+    async def login(self, measure: bool) -> bool:
+        step = {
+            "name": "login",
+            "method": "POST",
+            "path": "/api/auth/login",
+            "form": {"username": "{username}", "password": "{password}"},
+            "auth": False,
+        }
+        response = await self.request(step, measure=measure)
+        if response is None:
+            return False
+        body = response.json()
+        self.token = body["access_token"]
+        self.context["user_id"] = body["user"]["id"]
+        return True
+
+    async def prepare(self) -> bool:
+        register = {
+            "name": "register",
+            "method": "POST",
+            "path": "/api/auth/register",
+            "json": {
+                "username": "{username}",
+                "email": "{username}@loadtest.example.com",
+                "password": "{password}",
+                "role": "{role}",
+            },
+            "auth": False,
+        }
+        if await self.request(register, measure=False) is None:
+            return False
+        if not await self.login(measure=False):
+            return False
+        for step in self.scenario.get("setup", []):
+            if await self.request(step, measure=False) is None:
+                return False
+        return True
+
+    async def run(self, deadline: float, iterations: Optional[int]):
+        iteration = 0
+        steps = self.scenario.get("steps", [])
+        think_ms = self.scenario.get("think_time_ms", 0)
+        while time.perf_counter() < deadline and (iterations is None or iteration < iterations):
+            self.context["iteration"] = iteration
+            if self.scenario.get("measure_login", False):
+                await self.login(measure=True)
+            for step in steps:
+                if random.random() > step.get("probability", 1.0):
+                    continue
+                await self.request(step)
+                if think_ms:
+                    await asyncio.sleep(think_ms / 1000.0 * random.uniform(0.5, 1.5))
+            iteration += 1
+
+def load_app():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from main import app
+    return app
+
+@asynccontextmanager
+async def app_lifespan(url: Optional[str]):
+    """Run the app's startup and shutdown around in-process runs.
+
+    ASGITransport does not send lifespan events itself.
+    """
+    if url:
+        yield
+        return
+    app = load_app()
+    async with app.router.lifespan_context(app):
+        yield
+
+def make_client(url: Optional[str], timeout: float) -> httpx.AsyncClient:
+    if url:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        return httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits)
+
+    app = load_app()
+    from app.security import limiter
+    # The per-IP rate limit would otherwise throttle every virtual user
+    limiter.enabled = False
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=timeout)
+
+async def run_scenario(scenario: dict, url: Optional[str] = None, concurrency: Optional[int] = None,
+                       duration: Optional[float] = None, timeout: float = 30.0) -> dict:
+    users = concurrency or scenario.get("concurrency", 10)
+    seconds = duration or scenario.get("duration_seconds", 30)
+    iterations = scenario.get("iterations")
+    run_id = uuid.uuid4().hex[:8]
+    metrics = Metrics()
+
+    async with app_lifespan(url), make_client(url, timeout) as client:
+        virtual_users = [VirtualUser(i, run_id, scenario, client, metrics) for i in range(users)]
+        prepared = await asyncio.gather(*(user.prepare() for user in virtual_users))
+        active = [user for user, ready in zip(virtual_users, prepared) if ready]
+        if not active:
+            raise RuntimeError("No virtual user completed setup; is the API reachable?")
+
+        start = time.perf_counter()
+        deadline = start + seconds
+        await asyncio.gather(*(user.run(deadline, iterations) for user in active))
+        elapsed = time.perf_counter() - start
+
+    report = metrics.report(elapsed)
+    report.update({
+        "scenario": scenario.get("name"),
+        "target": url or "in-process",
+        "virtual_users": len(active),
+        "setup_failures": users - len(active),
+    })
+    return report
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """List regressions of p95 latency, throughput or error rate beyond ``tolerance``."""
+    problems = []
+    for step, current in report["steps"].items():
+        previous = baseline.get("steps", {}).get(step)
+        if not previous:
+            continue
+        old_p95, new_p95 = previous["latency_ms"]["p95"], current["latency_ms"]["p95"]
+        if old_p95 and new_p95 > old_p95 * (1 + tolerance):
+            problems.append(f"{step}: p95 {old_p95}ms -> {new_p95}ms")
+        old_rps, new_rps = previous["throughput_rps"], current["throughput_rps"]
+        if old_rps and new_rps < old_rps * (1 - tolerance):
+            problems.append(f"{step}: throughput {old_rps} -> {new_rps} req/s")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            problems.append(f"{step}: error rate {previous['error_rate']} -> {current['error_rate']}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an API load-test scenario")
+    parser.add_argument("scenario", help="Path to a scenario JSON file")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server")
+    target.add_argument("--in-process", action="store_true", help="Drive the ASGI app directly")
+    parser.add_argument("--concurrency", type=int, help="Override the scenario's virtual user count")
+    parser.add_argument("--duration", type=float, help="Override the scenario's duration in seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+
+    report = asyncio.run(run_scenario(
+        scenario,
+        url=args.url,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        timeout=args.timeout,
+    ))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
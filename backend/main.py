@@ -1,26 +1,46 @@
+import asyncio
 import logging
+import os
+import secrets
 import structlog
 import time
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 
-from app.routers import auth, users, deliveries
-from app.database import engine
-from app.models import Base
+from app.routers import auth, users, deliveries, tracking, stores, analytics, debug, customers, sync, bootstrap, billing, proofs, scheduling, jobs, notifications
+from app.database import engine, SessionLocal, set_last_write
 from app.config import settings
+from app.admission import AdmissionControlMiddleware
+from app.compression import CompressionMiddleware
+from app.instrumentation import QueryStatsMiddleware
+from app.metrics import metrics
+from app.migrations import prepare_database
+from app.sync import prune_mutations
+from app.jobs import start_job_worker, shutdown_job_worker, queue_stats
+import app.tasks  # registers the job handlers
+from app.proofs import shutdown_proof_executor
+from app.eta import eta_service, evict_idle_routes
+from app.notifications import check_settings as check_notification_settings
+from app.profiling import ProfilingMiddleware
+from app.serialization import default_response_class
+from app.revocation import revocation_store
 from app.security import (
     SecurityMiddleware, 
     RateLimitMiddleware, 
     limiter,
-    SECURITY_HEADERS
+    SECURITY_HEADERS,
+    start_password_executor,
+    shutdown_password_executor
 )
 
 # Configure Sentry for error monitoring
@@ -53,13 +73,43 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker startup and shutdown.
+
+    Startup work runs once per worker before it accepts requests, so the
+    first requests do not pay for table checks, pool connections, the
+    revocation snapshot or bcrypt backend loading. Schema setup is skipped
+    when serve.py has already done it (SCHEMA_SETUP_ON_STARTUP).
+    """
+    check_notification_settings()
+    if settings.SCHEMA_SETUP_ON_STARTUP:
+        prepare_database(engine)
+    with SessionLocal() as db:
+        prune_mutations(db)
+    revocation_store.sync()
+    start_password_executor(settings.PASSWORD_HASH_WORKERS)
+    if settings.JOB_IN_PROCESS:
+        start_job_worker(settings.JOB_WORKER_THREADS)
+    route_evictor = asyncio.create_task(evict_idle_routes(
+        eta_service, settings.ETA_EVICT_INTERVAL_SECONDS, timedelta(minutes=settings.ETA_IDLE_MINUTES)
+    ))
+    logger.info("Worker started", pid=os.getpid())
+    yield
+    route_evictor.cancel()
+    # The server has stopped accepting and drained in-flight requests
+    shutdown_password_executor()
+    shutdown_job_worker(settings.GRACEFUL_SHUTDOWN_SECONDS)
+    shutdown_proof_executor()
+    engine.dispose()
+    logger.info("Worker stopped", pid=os.getpid())
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Delivery Management System",
     description="A secure delivery management application with comprehensive security measures",
     version="1.0.0",
+    default_response_class=default_response_class(),
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
     openapi_url="/openapi.json" if settings.DEBUG else None
@@ -108,6 +158,13 @@ async def log_requests(request: Request, call_next):
     
     return response
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Tell clients when they last wrote so their next reads skip lagging replicas."""
+    response = await call_next(request)
+    set_last_write(request, response)
+    return response
+
 # Trusted host middleware (only allow requests from trusted hosts)
 app.add_middleware(
     TrustedHostMiddleware,
@@ -121,10 +178,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"],
+    expose_headers=["X-Total-Count", "ETag", "X-Last-Write", "X-DB-Query-Count", "X-DB-Time-Ms", "X-Profile-Id"],
     max_age=3600,
 )
 
+# Compress responses for mobile clients on cellular data
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
+# Statistical profiling of sampled or developer-requested requests
+app.add_middleware(
+    ProfilingMiddleware,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    interval=settings.PROFILE_INTERVAL_SECONDS
+)
+
+# Per-request SQL statistics (headers only in debug)
+app.add_middleware(QueryStatsMiddleware, debug_headers=settings.DEBUG)
+
+# Shed load before any other work is done for the request
+app.add_middleware(
+    AdmissionControlMiddleware,
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS
+)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -156,6 +240,21 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics_endpoint(request: Request):
+    """Per-worker metrics in the Prometheus text format (requires the API key).
+
+    Job queue gauges are read from the jobs table, so they cover every worker.
+    """
+    if not secrets.compare_digest(request.headers.get(settings.API_KEY_HEADER, ""), settings.API_KEY):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    def refresh_queue_gauges():
+        with SessionLocal() as db:
+            queue_stats(db)
+    await run_in_threadpool(refresh_queue_gauges)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Security endpoint
 @app.get("/security")
 async def security_info():
@@ -197,6 +296,90 @@ app.include_router(
     dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
 )
 
+app.include_router(
+    stores.router, 
+    prefix="/api/stores", 
+    tags=["Stores"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    analytics.router, 
+    prefix="/api/analytics", 
+    tags=["Analytics"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    tracking.router, 
+    prefix="/api/tracking", 
+    tags=["Tracking"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    customers.router, 
+    prefix="/api/customers", 
+    tags=["Customers"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    proofs.router, 
+    prefix="/api/deliveries", 
+    tags=["Proofs"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    notifications.router, 
+    prefix="/api/deliveries", 
+    tags=["Notifications"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    scheduling.router, 
+    prefix="/api/scheduling", 
+    tags=["Scheduling"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    jobs.router, 
+    prefix="/api/jobs", 
+    tags=["Jobs"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    billing.router, 
+    prefix="/api/billing", 
+    tags=["Billing"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    bootstrap.router, 
+    prefix="/api/bootstrap", 
+    tags=["Bootstrap"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    sync.router, 
+    prefix="/api/sync", 
+    tags=["Sync"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
+app.include_router(
+    debug.router, 
+    prefix="/debug", 
+    tags=["Debug"],
+    dependencies=[Depends(RateLimitMiddleware.rate_limit_minute)]
+)
+
 
 @app.get("/")
 async def root():
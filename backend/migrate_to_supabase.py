@@ -10,6 +10,7 @@ from sqlalchemy import create_engine, text
 from app.database import Base, engine
 from app.models import User, UserRole
 from app.config import settings
+from app.migrations import add_missing_columns
 
 def create_tables():
     """Create all tables in Supabase"""
@@ -17,11 +18,28 @@ def create_tables():
         print("Creating tables in Supabase...")
         Base.metadata.create_all(bind=engine)
         print("✅ Tables created successfully!")
+        with engine.begin() as conn:
+            added = add_missing_columns(conn)
+        if added:
+            print(f"✅ Columns added to existing tables: {', '.join(added)}")
         return True
     except Exception as e:
         print(f"❌ Error creating tables: {e}")
         return False
 
+def partition_tables():
+    """Convert deliveries to monthly range partitions"""
+    from app.partitioning import partition_deliveries
+    try:
+        if partition_deliveries(engine, settings.PARTITION_MONTHS_AHEAD):
+            print("✅ Deliveries partitioned by month!")
+        else:
+            print("✅ Deliveries already partitioned (or not on Postgres)")
+        return True
+    except Exception as e:
+        print(f"❌ Error partitioning deliveries: {e}")
+        return False
+
 def create_sample_users():
     """Create sample users for testing"""
     from sqlalchemy.orm import sessionmaker
@@ -116,6 +134,10 @@ def main():
     if not create_tables():
         sys.exit(1)
     
+    # Partition deliveries by month
+    if not partition_tables():
+        sys.exit(1)
+    
     # Create sample users
     if not create_sample_users():
         sys.exit(1)
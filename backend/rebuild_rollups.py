@@ -0,0 +1,17 @@
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.analytics import rebuild_rollups
+
+def main():
+    """Recompute the analytics rollup tables from the deliveries table."""
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollups(db)
+        print(f"Rebuilt {rows} rollup rows.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
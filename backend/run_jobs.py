@@ -0,0 +1,39 @@
+import argparse
+import signal
+import threading
+from typing import List, Optional
+from app.config import settings
+from app.database import engine
+from app.migrations import prepare_database
+from app.jobs import JobWorker
+from app.notifications import check_settings as check_notification_settings
+from app.proofs import shutdown_proof_executor
+import app.tasks  # registers the job handlers
+
+def run(threads: int, job_types: Optional[List[str]] = None):
+    """Run job worker threads until SIGTERM/SIGINT, then let running jobs finish."""
+    check_notification_settings()
+    if settings.SCHEMA_SETUP_ON_STARTUP:
+        prepare_database(engine)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+
+    worker = JobWorker(threads, job_types)
+    worker.start()
+    stop.wait()
+    worker.stop(settings.GRACEFUL_SHUTDOWN_SECONDS)
+    shutdown_proof_executor()
+    engine.dispose()
+
+def main():
+    """Process queued background jobs (rollups, archival, billing, proof photos)."""
+    parser = argparse.ArgumentParser(description="Run a background job worker")
+    parser.add_argument("--threads", type=int, default=settings.JOB_WORKER_THREADS)
+    parser.add_argument("--types", help="Comma-separated job types to run (default: all)")
+    args = parser.parse_args()
+
+    run(args.threads, args.types.split(",") if args.types else None)
+
+if __name__ == "__main__":
+    main()
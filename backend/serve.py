@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Production launcher for the Delivery Management System API.
+
+Runs uvicorn with WEB_CONCURRENCY worker processes (default 1, see the
+setting for why), uvloop and httptools when installed, and graceful shutdown: on SIGTERM
+each worker stops accepting connections, finishes in-flight requests for
+up to GRACEFUL_SHUTDOWN_SECONDS, then runs the app's lifespan shutdown.
+Background jobs run in JOB_WORKER_PROCESSES separate processes started
+alongside (see run_jobs.py) instead of inside the API workers. Schema
+setup runs once in this process before any worker is started.
+
+Example:
+    python serve.py --port $PORT
+"""
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import uvicorn
+from app.config import settings
+from app.database import engine
+from app.migrations import prepare_database
+from app.notifications import check_settings as check_notification_settings
+import run_jobs
+
+def default_workers() -> int:
+    return max(settings.WEB_CONCURRENCY, 1)
+
+def server_options(workers: int) -> dict:
+    """uvicorn options, falling back to the pure-Python loop and parser if needed."""
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+    return {
+        "workers": workers,
+        "loop": "uvloop" if has_uvloop else "asyncio",
+        "http": "httptools" if has_httptools else "h11",
+        "lifespan": "on",
+        "timeout_graceful_shutdown": settings.GRACEFUL_SHUTDOWN_SECONDS,
+        "timeout_keep_alive": 5,
+        # Client addresses (rate limits, logs) come from X-Forwarded-For only
+        # when the peer is a trusted load balancer
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+        "access_log": False,
+        "log_level": settings.LOG_LEVEL.lower(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with production server settings")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--job-workers", type=int, default=settings.JOB_WORKER_PROCESSES,
+                        help="Background job processes (0: run jobs inside the API workers)")
+    args = parser.parse_args()
+
+    # Fail before starting workers rather than in each of them
+    check_notification_settings()
+    # Create and upgrade the schema once, before any worker starts
+    prepare_database(engine)
+    engine.dispose()
+    os.environ["SCHEMA_SETUP_ON_STARTUP"] = "false"
+    settings.SCHEMA_SETUP_ON_STARTUP = False
+
+    job_processes = []
+    if args.job_workers > 0:
+        # Inherited by the spawned API workers
+        os.environ["JOB_IN_PROCESS"] = "false"
+        settings.JOB_IN_PROCESS = False
+        context = multiprocessing.get_context("spawn")
+        for _ in range(args.job_workers):
+            process = context.Process(target=run_jobs.run, args=(settings.JOB_WORKER_THREADS,), name="job-worker")
+            process.start()
+            job_processes.append(process)
+
+    try:
+        uvicorn.run("main:app", host=args.host, port=args.port, **server_options(args.workers))
+    finally:
+        for process in job_processes:
+            process.terminate()
+        for process in job_processes:
+            process.join(settings.GRACEFUL_SHUTDOWN_SECONDS)
+
+if __name__ == "__main__":
+    main()
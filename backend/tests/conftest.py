@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import uuid
+
+# Settings are read at import time, so point the app at a throwaway SQLite
+# database (and turn off rate limits and job threads) before importing it
+_data_dir = tempfile.mkdtemp(prefix="delivery-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_data_dir, 'primary.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["JOB_IN_PROCESS"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+# Postgres-only behaviour (partitioning, row locks) is tested against a
+# scratch database given in TEST_POSTGRES_URL, and skipped without one
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+    with TestClient(main.app, base_url="http://localhost") as test_client:
+        yield test_client
+
+@pytest.fixture
+def make_user(client):
+    """Factory creating a user with the given role; returns ``(user_id, auth headers)``."""
+    from app.database import SessionLocal
+    from app.models import User
+    from app.security import SecurityUtils
+
+    def make(role):
+        name = f"{role.value}_{uuid.uuid4().hex[:8]}"
+        with SessionLocal() as db:
+            user = User(username=name, email=f"{name}@example.com", hashed_password="!", role=role)
+            db.add(user)
+            db.commit()
+            token = SecurityUtils.create_user_access_token(user)
+            return user.id, {"Authorization": f"Bearer {token}"}
+    return make
+
+@pytest.fixture
+def postgres():
+    """An engine on a fresh schema of TEST_POSTGRES_URL with the app's tables."""
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    from app.models import Base
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(POSTGRES_URL, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from app import analytics
+from app.archive import archive_deliveries
+from app.database import SessionLocal
+from app.models import Delivery, DeliveryRollup, DeliveryStatus, Store, UserRole
+
+def make_store(owner_id):
+    with SessionLocal() as db:
+        store = Store(name="Rollups", address="1 Main St", owner_id=owner_id)
+        db.add(store)
+        db.commit()
+        return store.id
+
+def add_delivery(db, store_id, owner_id, status, amount, created_at=None):
+    delivery = Delivery(store_id=store_id, store_owner_id=owner_id, customer_name="C", customer_phone="1",
+                        customer_address="A", items="[]", status=status, total_amount=amount,
+                        created_at=created_at)
+    db.add(delivery)
+    db.flush()
+    analytics.apply_delivery_change(db, None, delivery)
+    return delivery
+
+def store_totals(store_id):
+    with SessionLocal() as db:
+        return {
+            status: (count, revenue)
+            for status, count, revenue in db.query(
+                DeliveryRollup.status, DeliveryRollup.delivery_count, DeliveryRollup.revenue
+            ).filter(DeliveryRollup.period == analytics.ALL_PERIOD, DeliveryRollup.scope == "store",
+                     DeliveryRollup.scope_id == store_id)
+            if count
+        }
+
+def test_summary_cache_is_cleared_only_after_commit(client, make_user):
+    owner_id, _ = make_user(UserRole.STORE_OWNER)
+    store_id = make_store(owner_id)
+    key = ("store", owner_id)
+
+    analytics.summary_cache.set(key, {"cached": True})
+    with SessionLocal() as db:
+        add_delivery(db, store_id, owner_id, DeliveryStatus.PENDING, 10)
+        assert analytics.summary_cache.get(key) is not None
+        db.rollback()
+    assert analytics.summary_cache.get(key) is not None
+
+    with SessionLocal() as db:
+        add_delivery(db, store_id, owner_id, DeliveryStatus.PENDING, 10)
+        db.commit()
+    assert analytics.summary_cache.get(key) is None
+
+def test_rebuild_keeps_archived_orders(client, make_user, tmp_path):
+    owner_id, _ = make_user(UserRole.STORE_OWNER)
+    store_id = make_store(owner_id)
+    old = datetime.utcnow() - timedelta(days=400)
+    with SessionLocal() as db:
+        add_delivery(db, store_id, owner_id, DeliveryStatus.DELIVERED, 25, created_at=old)
+        add_delivery(db, store_id, owner_id, DeliveryStatus.CANCELLED, 5, created_at=old)
+        add_delivery(db, store_id, owner_id, DeliveryStatus.PENDING, 7)
+        db.commit()
+        assert archive_deliveries(db, older_than_days=365, directory=str(tmp_path)) == 2
+    before = store_totals(store_id)
+
+    with SessionLocal() as db:
+        analytics.rebuild_rollups(db, archive_dir=str(tmp_path))
+    assert store_totals(store_id) == before == {
+        DeliveryStatus.DELIVERED: (1, Decimal("25.00")),
+        DeliveryStatus.CANCELLED: (1, Decimal("5.00")),
+        DeliveryStatus.PENDING: (1, Decimal("7.00")),
+    }
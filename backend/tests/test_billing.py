@@ -0,0 +1,52 @@
+import threading
+import uuid
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app import billing
+from app.database import engine as sqlite_engine
+from app.models import DeliveryRollup, DeliveryStatus, Invoice, Store, User, UserRole
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def bind(request, client):
+    if request.param == "sqlite":
+        return sqlite_engine
+    return request.getfixturevalue("postgres")
+
+def test_concurrent_overlapping_runs_bill_once(bind):
+    Session = sessionmaker(bind=bind, autoflush=False)
+    suffix = uuid.uuid4().hex[:8]
+    with Session() as db:
+        owner = User(username=f"bill_{suffix}", email=f"bill_{suffix}@example.com",
+                     hashed_password="!", role=UserRole.STORE_OWNER)
+        db.add(owner)
+        db.flush()
+        store = Store(name="Billing", address="1 Main St", owner_id=owner.id)
+        db.add(store)
+        db.flush()
+        db.add(DeliveryRollup(period="2025-09-20", scope="store", scope_id=store.id,
+                              status=DeliveryStatus.DELIVERED, delivery_count=3, revenue=30))
+        db.commit()
+        store_id = store.id
+
+    periods = [(date(2025, 9, 1), date(2025, 10, 1)), (date(2025, 9, 15), date(2025, 10, 15))]
+    barrier = threading.Barrier(len(periods))
+    outcomes = []
+
+    def run(start, end):
+        with Session() as db:
+            barrier.wait()
+            try:
+                outcomes.append(billing.generate_invoices(db, start, end, 1, [store_id]))
+            except billing.OverlappingPeriod:
+                outcomes.append("overlap")
+
+    threads = [threading.Thread(target=run, args=period) for period in periods]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes, key=str) == [1, "overlap"]
+    with Session() as db:
+        assert db.query(Invoice).filter(Invoice.store_id == store_id).count() == 1
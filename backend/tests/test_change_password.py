@@ -0,0 +1,37 @@
+import uuid
+from app.database import SessionLocal
+from app.models import User, UserRole
+from app.security import SecurityUtils
+
+OLD_PASSWORD = "Old-passw0rd!x"
+NEW_PASSWORD = "New-passw0rd!y"
+
+def login(client, username, password):
+    response = client.post("/api/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def test_change_password_signs_out_other_sessions_and_renews_the_callers(client):
+    username = f"pw_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        db.add(User(username=username, email=f"{username}@example.com",
+                    hashed_password=SecurityUtils.hash_password(OLD_PASSWORD), role=UserRole.DRIVER))
+        db.commit()
+    mine = login(client, username, OLD_PASSWORD)
+    other = login(client, username, OLD_PASSWORD)
+
+    response = client.post("/api/auth/change-password", headers=bearer(mine),
+                           params={"current_password": OLD_PASSWORD, "new_password": NEW_PASSWORD})
+    assert response.status_code == 200
+    renewed = response.json()
+
+    # Access tokens issued before the change stop working at once, the caller's included
+    assert client.get("/api/auth/me", headers=bearer(other)).status_code == 401
+    assert client.get("/api/auth/me", headers=bearer(mine)).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": other["refresh_token"]}).status_code == 401
+
+    assert client.get("/api/auth/me", headers=bearer(renewed)).status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": renewed["refresh_token"]}).status_code == 200
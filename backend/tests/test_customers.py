@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import create_engine, insert, select
+from app.customers import backfill_customers
+from app.models import Base, Customer, Delivery
+
+def test_backfill_groups_deliveries_by_store_and_phone():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    deliveries = Delivery.__table__
+    orders = [
+        # store, phone, name, created day
+        (1, "+91 98765 43210", "Asha", 1),
+        (1, "098765-43210", "Asha  Rao", 2),
+        (2, "9876543210", "Asha at work", 3),
+        (1, "91234 56789", "Ravi", 4),
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(deliveries), [
+            {"store_id": store_id, "store_owner_id": 1, "customer_name": name, "customer_phone": phone,
+             "customer_phone_digits": "".join(ch for ch in phone if ch.isdigit())[-10:],
+             "customer_address": "1 Main St", "items": "[]", "created_at": datetime(2026, 9, day)}
+            for store_id, phone, name, day in orders
+        ])
+        assert backfill_customers(conn) == 3
+        assert backfill_customers(conn) == 0
+        customers = Customer.__table__.c
+        rows = conn.execute(select(
+            customers.store_id, customers.phone_digits, customers.name, customers.order_count, customers.last_order_at
+        ).order_by(customers.store_id, customers.phone_digits)).all()
+
+    assert [tuple(row) for row in rows] == [
+        (1, "9123456789", "Ravi", 1, datetime(2026, 9, 4)),
+        (1, "9876543210", "Asha Rao", 2, datetime(2026, 9, 2)),
+        (2, "9876543210", "Asha at work", 1, datetime(2026, 9, 3)),
+    ]
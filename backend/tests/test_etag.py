@@ -0,0 +1,38 @@
+import uuid
+from app.database import SessionLocal
+from app.models import Delivery, DeliveryStatus, Store, User, UserRole
+
+def etag_of(client, headers):
+    response = client.get("/api/deliveries/?limit=5", headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+def test_delivery_list_etag_follows_changes_timestamps_miss(client, make_user):
+    owner_id, headers = make_user(UserRole.STORE_OWNER)
+    with SessionLocal() as db:
+        store = Store(name=f"Store {uuid.uuid4().hex[:6]}", address="1 Main St", owner_id=owner_id)
+        db.add(store)
+        db.flush()
+        delivery = Delivery(store_id=store.id, store_owner_id=owner_id, customer_name="C", customer_phone="1",
+                            customer_address="A", items="[]")
+        db.add(delivery)
+        db.commit()
+        store_id, delivery_id = store.id, delivery.id
+    first = etag_of(client, headers)
+    assert client.get("/api/deliveries/?limit=5", headers={**headers, "If-None-Match": first}).status_code == 304
+
+    # An update that leaves max(updated_at) where it was
+    with SessionLocal() as db:
+        delivery = db.get(Delivery, delivery_id)
+        updated_at = delivery.updated_at
+        delivery.status = DeliveryStatus.CANCELLED
+        delivery.updated_at = updated_at
+        db.commit()
+    second = etag_of(client, headers)
+    assert second != first
+
+    # A joined value changing in another table
+    with SessionLocal() as db:
+        db.get(Store, store_id).name = "Renamed"
+        db.commit()
+    assert etag_of(client, headers) != second
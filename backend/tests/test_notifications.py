@@ -0,0 +1,118 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app import notifications
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Delivery, DeliveryStatus, Job, Notification, Store, User, UserRole
+
+@pytest.fixture
+def gateway(client, monkeypatch):
+    """A fake gateway under its own provider name, so tests do not flush each other's messages."""
+    fake = notifications.FakeGateway(keep=10)
+    fake.name = f"fake-{uuid.uuid4().hex[:8]}"
+    monkeypatch.setitem(notifications.gateways, fake.name, fake)
+    monkeypatch.setattr(notifications, "_limiters", {})
+    monkeypatch.setattr(settings, "NOTIFY_ENABLED", True)
+    monkeypatch.setattr(settings, "NOTIFY_PROVIDER", fake.name)
+    monkeypatch.setattr(settings, "NOTIFY_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "NOTIFY_RATE_PER_SECOND", 1000.0)
+    monkeypatch.setattr(settings, "NOTIFY_MAX_ATTEMPTS", 2)
+    return fake
+
+@pytest.fixture
+def make_deliveries(client):
+    def make(count):
+        suffix = uuid.uuid4().hex[:8]
+        with SessionLocal() as db:
+            owner = User(username=f"nt_owner_{suffix}", email=f"nt_owner_{suffix}@example.com",
+                         hashed_password="!", role=UserRole.STORE_OWNER)
+            db.add(owner)
+            db.flush()
+            store = Store(name=f"Store {suffix}", address="1 Main St", owner_id=owner.id)
+            db.add(store)
+            db.flush()
+            rows = [
+                Delivery(store_id=store.id, store_owner_id=owner.id, customer_name=f"Customer {i}",
+                         customer_phone=f"98765 {i:05d}", customer_phone_digits=f"98765{i:05d}",
+                         customer_address=f"{i} Lake Road", items="[]", status=DeliveryStatus.PICKED_UP)
+                for i in range(count)
+            ]
+            db.add_all(rows)
+            db.commit()
+            return [row.id for row in rows]
+    return make
+
+def notify(delivery_ids):
+    with SessionLocal() as db:
+        queued = [notifications.notify_status_change(db, db.get(Delivery, i)) for i in delivery_ids]
+        db.commit()
+    return queued
+
+def provider_rows(provider):
+    with SessionLocal() as db:
+        return db.query(Notification).filter(Notification.provider == provider).order_by(Notification.id).all()
+
+def waiting_flushes(provider):
+    with SessionLocal() as db:
+        return db.query(Job).filter(
+            Job.job_type == notifications.FLUSH_JOB, Job.status == "queued",
+            Job.payload == json.dumps({"provider": provider})
+        ).all()
+
+def test_status_change_is_queued_once(gateway, make_deliveries):
+    delivery_ids = make_deliveries(2)
+
+    assert notify(delivery_ids) == [True, True]
+    assert notify(delivery_ids) == [False, False]
+    assert len(provider_rows(gateway.name)) == 2
+    assert len(waiting_flushes(gateway.name)) == 1
+
+def test_disabled_by_default_and_fake_refused_outside_debug(gateway, make_deliveries, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_ENABLED", False)
+    assert notify(make_deliveries(1)) == [False]
+    notifications.check_settings()
+
+    monkeypatch.setattr(settings, "NOTIFY_ENABLED", True)
+    monkeypatch.setattr(settings, "NOTIFY_PROVIDER", notifications.FakeGateway.name)
+    monkeypatch.setattr(settings, "DEBUG", False)
+    with pytest.raises(RuntimeError):
+        notifications.check_settings()
+
+def test_flush_sends_in_batches(gateway, make_deliveries):
+    notify(make_deliveries(5))
+
+    assert notifications.flush(gateway.name) == 5
+    assert gateway.batches == 3
+    assert {row.status for row in provider_rows(gateway.name)} == {notifications.SENT}
+
+def test_failed_messages_are_retried_then_given_up(gateway, make_deliveries):
+    notify(make_deliveries(2))
+    gateway.fail_next = 1
+
+    assert notifications.flush(gateway.name) == 1
+    failed = [row for row in provider_rows(gateway.name) if row.status == notifications.PENDING]
+    assert len(failed) == 1 and failed[0].attempts == 1
+    assert failed[0].next_attempt_at > datetime.utcnow()
+    # A delayed flush is queued for the retry
+    assert waiting_flushes(gateway.name)[-1].run_at > datetime.utcnow()
+
+    def make_due():
+        with SessionLocal() as db:
+            db.query(Notification).filter(Notification.id == failed[0].id).update(
+                {Notification.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)}
+            )
+            db.commit()
+
+    make_due()
+    gateway.fail_next = 1
+    assert notifications.flush(gateway.name) == 0
+    [row] = [row for row in provider_rows(gateway.name) if row.id == failed[0].id]
+    assert (row.status, row.attempts) == (notifications.FAILED, 2)
+
+def test_fake_gateway_keeps_only_recent_messages(gateway, make_deliveries):
+    notify(make_deliveries(12))
+
+    assert notifications.flush(gateway.name) == 12
+    assert (len(gateway.sent), gateway.sent_count) == (10, 12)
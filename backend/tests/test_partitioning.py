@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import text
+from app import jobs
+from app.database import SessionLocal
+from app.models import Job
+from app.partitioning import (DEFAULT_PARTITION, add_months, ensure_partitions, month_start,
+                              partition_deliveries, partition_name)
+
+def test_rows_in_default_partition_move_to_new_partition(postgres):
+    assert partition_deliveries(postgres, months_ahead=0)
+    later = add_months(month_start(datetime.utcnow()), 2)
+    with postgres.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, hashed_password, role, is_active, token_version) "
+            "VALUES (1, 'owner', 'owner@example.com', '!', 'STORE_OWNER', true, 0)"
+        ))
+        conn.execute(text("INSERT INTO stores (id, name, address, owner_id) VALUES (1, 'Store', '1 Main St', 1)"))
+        # A month with no partition yet, as when the app outlives the months created at startup
+        conn.execute(text(
+            "INSERT INTO deliveries (id, store_id, store_owner_id, customer_name, customer_phone, "
+            "customer_address, items, status, total_amount, created_at) "
+            "VALUES (1, 1, 1, 'C', '1', 'A', '[]', 'PENDING', 0, :created_at)"
+        ), {"created_at": datetime(later.year, later.month, 3)})
+        assert conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 1
+
+    with postgres.begin() as conn:
+        assert ensure_partitions(conn, months_ahead=2) == 2
+
+    with postgres.connect() as conn:
+        assert conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 0
+        assert conn.execute(text(f"SELECT count(*) FROM {partition_name(later)}")).scalar() == 1
+        assert conn.execute(text("SELECT count(*) FROM deliveries")).scalar() == 1
+
+def test_partition_job_is_scheduled_once(client):
+    with SessionLocal() as db:
+        db.query(Job).filter(Job.job_type == "partitions.ensure").delete()
+        db.commit()
+        jobs.schedule_recurring(db)
+        jobs.schedule_recurring(db)
+        queued = db.query(Job).filter(Job.job_type == "partitions.ensure", Job.status == jobs.QUEUED).all()
+    assert len(queued) == 1
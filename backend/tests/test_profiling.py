@@ -0,0 +1,30 @@
+import threading
+import time
+from app.models import UserRole
+from app.profiling import Profile, Sampler
+
+def profiled(client, headers, path="/api/deliveries/?limit=1"):
+    response = client.get(path, headers={**headers, "X-Profile": "1"})
+    return response.headers.get("X-Profile-Id")
+
+def test_only_developers_can_request_a_profile(client, make_user):
+    _, developer = make_user(UserRole.DEVELOPER)
+    _, driver = make_user(UserRole.DRIVER)
+    assert profiled(client, developer)
+    assert profiled(client, driver) is None
+
+def sampler_threads():
+    return sum(thread.name == "profiler" for thread in threading.enumerate())
+
+def test_concurrent_profiles_share_one_sampler_thread():
+    before = sampler_threads()
+    sampler = Sampler(0.001)
+    profiles = [Profile("GET", f"/{i}", 0.001) for i in range(5)]
+    for profile in profiles:
+        sampler.attach(profile)
+    time.sleep(0.05)
+    for profile in profiles:
+        sampler.detach(profile)
+
+    assert all(profile.samples for profile in profiles)
+    assert sampler_threads() == before + 1
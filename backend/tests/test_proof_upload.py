@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from app import proofs
+from app.config import settings
+
+BOUNDARY = "proofboundary"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + b"\x00" * 64
+
+def multipart(data: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="proof.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+async def in_pieces(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+def upload(body: bytes, piece_size: int):
+    return asyncio.run(proofs.receive_upload(
+        f"multipart/form-data; boundary={BOUNDARY}", in_pieces(body, piece_size)
+    ))
+
+@pytest.fixture(autouse=True)
+def proof_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROOF_DIR", str(tmp_path))
+
+@pytest.mark.parametrize("piece_size", [1, 3, 7, 4096])
+def test_image_type_is_sniffed_across_small_chunks(piece_size):
+    _, size, media_type = upload(multipart(PNG), piece_size)
+    assert (size, media_type) == (len(PNG), "image/png")
+
+@pytest.mark.parametrize("data", [b"not an image at all", b"tiny"])
+def test_unsupported_type_is_rejected(data):
+    with pytest.raises(proofs.UploadError) as exc:
+        upload(multipart(data), 3)
+    assert exc.value.status_code == 415
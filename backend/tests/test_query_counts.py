@@ -0,0 +1,81 @@
+import threading
+import uuid
+import pytest
+from sqlalchemy import event
+from app.database import SessionLocal, engine
+from app.models import Delivery, Store, User, UserRole
+from app.sync import current_cursor
+
+SMALL_PAGE = 3
+LARGE_PAGE = 30
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+@pytest.fixture(scope="module")
+def deliveries(client):
+    """Deliveries spread over several stores, owners and drivers; returns the sync cursor before them."""
+    suffix = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        since = current_cursor(db)
+        owners = [
+            User(username=f"qc_owner{i}_{suffix}", email=f"qc_owner{i}_{suffix}@example.com",
+                 hashed_password="!", role=UserRole.STORE_OWNER)
+            for i in range(3)
+        ]
+        drivers = [
+            User(username=f"qc_driver{i}_{suffix}", email=f"qc_driver{i}_{suffix}@example.com",
+                 hashed_password="!", role=UserRole.DRIVER)
+            for i in range(4)
+        ]
+        db.add_all(owners + drivers)
+        db.flush()
+        stores = [Store(name=f"Store {i}", address="1 Main St", owner_id=owners[i % 3].id) for i in range(6)]
+        db.add_all(stores)
+        db.flush()
+        db.add_all([
+            Delivery(
+                store_id=stores[i % 6].id,
+                store_owner_id=stores[i % 6].owner_id,
+                driver_id=drivers[i % 4].id if i % 5 else None,
+                customer_name=f"Customer {i}",
+                customer_phone=f"+91 98765 {i:05d}",
+                customer_address=f"{i} Lake Road",
+                items="[]",
+            )
+            for i in range(LARGE_PAGE + 10)
+        ])
+        db.commit()
+    return since
+
+@pytest.fixture
+def count_statements():
+    counter = StatementCounter()
+    event.listen(engine, "after_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "after_cursor_execute", counter)
+
+def statements_for(client, counter, path, headers):
+    client.get(path, headers=headers)  # Warm per-worker caches so both page sizes are measured alike
+    counter.count = 0
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return counter.count, response.json()
+
+@pytest.mark.parametrize("path, size_of", [
+    ("/api/deliveries/?limit={size}", len),
+    ("/api/sync/?since={since}&limit={size}", lambda body: len(body["deliveries"])),
+])
+def test_query_count_does_not_grow_with_page_size(client, make_user, deliveries, count_statements, path, size_of):
+    _, headers = make_user(UserRole.DEVELOPER)
+    small, small_body = statements_for(client, count_statements, path.format(size=SMALL_PAGE, since=deliveries), headers)
+    large, large_body = statements_for(client, count_statements, path.format(size=LARGE_PAGE, since=deliveries), headers)
+
+    assert (size_of(small_body), size_of(large_body)) == (SMALL_PAGE, LARGE_PAGE)
+    assert small == large
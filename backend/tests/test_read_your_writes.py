@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine
+from app import database
+from app.database import ReplicaRouter, LAST_WRITE_HEADER
+from app.models import Base, UserRole
+
+def lagging_replica(monkeypatch, tmp_path):
+    """Route reads to a second SQLite database that never receives the primary's writes."""
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica)
+    router = ReplicaRouter(database.engine, [replica], check_interval=60, sticky_seconds=5)
+    monkeypatch.setattr(database, "replica_router", router)
+
+def create_store(client, headers):
+    response = client.post("/api/stores/", json={"name": "Corner Shop", "address": "1 Main St"}, headers=headers)
+    assert response.status_code == 200
+    return response
+
+def test_reads_without_marker_use_replica(client, make_user, monkeypatch, tmp_path):
+    lagging_replica(monkeypatch, tmp_path)
+    _, headers = make_user(UserRole.STORE_OWNER)
+    create_store(client, headers)
+    client.cookies.clear()
+
+    assert client.get("/api/stores/", headers=headers).json() == []
+
+def test_header_marker_reads_own_write_from_primary(client, make_user, monkeypatch, tmp_path):
+    lagging_replica(monkeypatch, tmp_path)
+    _, headers = make_user(UserRole.STORE_OWNER)
+    written = create_store(client, headers).headers[LAST_WRITE_HEADER]
+    client.cookies.clear()
+
+    stores = client.get("/api/stores/", headers={**headers, LAST_WRITE_HEADER: written}).json()
+    assert [store["name"] for store in stores] == ["Corner Shop"]
+
+def test_cookie_marker_reads_own_write_from_primary(client, make_user, monkeypatch, tmp_path):
+    lagging_replica(monkeypatch, tmp_path)
+    _, headers = make_user(UserRole.STORE_OWNER)
+    create_store(client, headers)
+
+    stores = client.get("/api/stores/", headers=headers).json()
+    assert [store["name"] for store in stores] == ["Corner Shop"]
+    client.cookies.clear()
+
+def test_stale_marker_uses_replica(client, make_user, monkeypatch, tmp_path):
+    lagging_replica(monkeypatch, tmp_path)
+    _, headers = make_user(UserRole.STORE_OWNER)
+    written = float(create_store(client, headers).headers[LAST_WRITE_HEADER])
+    client.cookies.clear()
+
+    stale = {**headers, LAST_WRITE_HEADER: f"{written - 60:.3f}"}
+    assert client.get("/api/stores/", headers=stale).json() == []
@@ -0,0 +1,96 @@
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app import scheduling
+from app.config import settings
+from app.database import engine as sqlite_engine
+from app.models import SlotBooking, SlotUsage, Store, User, UserRole
+
+DELIVERIES = 8
+MOVES = 5
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def bind(request, client):
+    if request.param == "sqlite":
+        return sqlite_engine
+    return request.getfixturevalue("postgres")
+
+def run_retrying(Session, work):
+    """Run ``work(db)`` in its own transaction, retrying only SQLite's busy errors."""
+    while True:
+        db = Session()
+        try:
+            work(db)
+            db.commit()
+            return
+        except OperationalError as exc:
+            db.rollback()
+            if "database is locked" not in str(exc):
+                raise
+        finally:
+            db.close()
+
+def test_concurrent_reschedules_across_overlapping_windows(bind):
+    Session = sessionmaker(bind=bind, autoflush=False)
+    suffix = uuid.uuid4().hex[:8]
+    with Session() as db:
+        owner = User(username=f"sl_owner_{suffix}", email=f"sl_owner_{suffix}@example.com",
+                     hashed_password="!", role=UserRole.STORE_OWNER)
+        driver = User(username=f"sl_driver_{suffix}", email=f"sl_driver_{suffix}@example.com",
+                      hashed_password="!", role=UserRole.DRIVER)
+        db.add_all([owner, driver])
+        db.flush()
+        store = Store(name="Slots", address="1 Main St", owner_id=owner.id)
+        db.add(store)
+        db.commit()
+        store_id, driver_id = store.id, driver.id
+
+    step = timedelta(minutes=settings.SLOT_MINUTES)
+    opens, _ = scheduling.day_bounds((datetime.utcnow() + timedelta(days=1)).date())
+    windows = [(opens, opens + 2 * step), (opens + step, opens + 3 * step)]
+    with Session() as db:
+        scheduling.set_capacity(db, scheduling.STORE, store_id, opens, opens + 3 * step, 100)
+        scheduling.set_capacity(db, scheduling.DRIVER, driver_id, opens, opens + 3 * step, 100)
+    delivery_ids = [10_000_000 + i for i in range(DELIVERIES)]
+    for i, delivery_id in enumerate(delivery_ids):
+        run_retrying(Session, lambda db, d=delivery_id, w=windows[i % 2]:
+                     scheduling.reserve(db, d, store_id, driver_id, *w))
+
+    # Each delivery moves back and forth; half start in each window, so moves cross
+    barrier = threading.Barrier(DELIVERIES)
+    errors = []
+
+    def move(i, delivery_id):
+        try:
+            barrier.wait()
+            for n in range(1, MOVES + 1):
+                window = windows[(i + n) % 2]
+                run_retrying(Session, lambda db: scheduling.reserve(db, delivery_id, store_id, driver_id, *window))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=move, args=(i, d)) for i, d in enumerate(delivery_ids)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    with Session() as db:
+        expected = Counter()
+        for booking in db.query(SlotBooking).filter(SlotBooking.delivery_id.in_(delivery_ids)):
+            for slot in scheduling.buckets(booking.slot_start, booking.slot_end):
+                expected[(scheduling.STORE, slot)] += 1
+                expected[(scheduling.DRIVER, slot)] += 1
+        booked = {
+            (row.scope, row.slot_start): row.booked
+            for row in db.query(SlotUsage).filter(
+                ((SlotUsage.scope == scheduling.STORE) & (SlotUsage.scope_id == store_id))
+                | ((SlotUsage.scope == scheduling.DRIVER) & (SlotUsage.scope_id == driver_id))
+            )
+        }
+    assert {key: count for key, count in booked.items() if count} == dict(expected)
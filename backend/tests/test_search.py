@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import Delivery, Store, UserRole
+from app.search import contains_pattern, search_deliveries
+
+def add_deliveries(owner_id, name, count):
+    with SessionLocal() as db:
+        store = Store(name="Search", address="1 Main St", owner_id=owner_id)
+        db.add(store)
+        db.flush()
+        db.add_all([
+            Delivery(store_id=store.id, store_owner_id=owner_id, customer_name=name, customer_phone="1",
+                     customer_address="A", items="[]")
+            for _ in range(count)
+        ])
+        db.commit()
+
+def test_best_matches_are_ranked_within_the_callers_deliveries(client, make_user):
+    owner_id, headers = make_user(UserRole.STORE_OWNER)
+    other_id, _ = make_user(UserRole.STORE_OWNER)
+    # Other stores' matches outrank and outnumber the caller's one
+    add_deliveries(other_id, "Zephyrine Zephyrine", 10)
+    add_deliveries(owner_id, "Zephyrine Quill", 1)
+
+    response = client.get("/api/deliveries/search?q=zephyrine&limit=1", headers=headers)
+    assert [row["customer_name"] for row in response.json()] == ["Zephyrine Quill"]
+
+@pytest.mark.parametrize("term, expected", [("50%", ["50% Off Lane"]), ("a_b", ["a_b Street"])])
+def test_like_wildcards_in_the_term_match_literally(term, expected):
+    engine = create_engine("sqlite://")
+    Delivery.__table__.create(engine)
+    with Session(engine) as db:
+        db.add_all([
+            Delivery(store_id=1, store_owner_id=1, customer_name="C", customer_phone="1", customer_address=address,
+                     items="[]")
+            for address in ("50% Off Lane", "500 Main Road", "a_b Street", "axb Street")
+        ])
+        db.commit()
+        pattern = contains_pattern(term)
+        rows = db.query(Delivery.customer_address).filter(Delivery.customer_address.ilike(pattern, escape="\\"))
+        assert [address for (address,) in rows] == expected
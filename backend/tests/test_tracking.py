@@ -0,0 +1,50 @@
+import time
+from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.eta import ETAService, RouteStop, eta_service
+from app.models import Delivery, Store, UserRole
+
+def make_delivery(owner_id, driver_id=None):
+    with SessionLocal() as db:
+        store = Store(name="Tracking", address="1 Main St", owner_id=owner_id)
+        db.add(store)
+        db.flush()
+        delivery = Delivery(store_id=store.id, store_owner_id=owner_id, driver_id=driver_id, customer_name="C",
+                            customer_phone="1", customer_address="A", items="[]")
+        db.add(delivery)
+        db.commit()
+        return delivery.id
+
+def plan(client, headers, driver_id, delivery_id):
+    return client.put(f"/api/tracking/drivers/{driver_id}/route", headers=headers,
+                      json={"stops": [{"delivery_id": delivery_id, "latitude": 12.97, "longitude": 77.59}]})
+
+def test_route_needs_an_active_driver_and_the_callers_deliveries(client, make_user):
+    owner_id, owner_headers = make_user(UserRole.STORE_OWNER)
+    other_owner_id, _ = make_user(UserRole.STORE_OWNER)
+    driver_id, _ = make_user(UserRole.DRIVER)
+    mine, theirs = make_delivery(owner_id), make_delivery(other_owner_id)
+
+    assert plan(client, owner_headers, driver_id, mine).status_code == 200
+    assert plan(client, owner_headers, driver_id, theirs).status_code == 404
+    assert plan(client, owner_headers, other_owner_id, mine).status_code == 404
+
+def test_future_ping_does_not_block_later_pings(client, make_user):
+    driver_id, headers = make_user(UserRole.DRIVER)
+    ahead = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    client.post("/api/tracking/ping", headers=headers, json={"latitude": 12.97, "longitude": 77.59, "recorded_at": ahead})
+    time.sleep(0.01)
+    response = client.post("/api/tracking/ping", headers=headers, json={"latitude": 12.98, "longitude": 77.60})
+    assert response.json()["latitude"] == 12.98
+    eta_service.clear(driver_id)
+
+def test_idle_routes_are_evicted_unless_watched():
+    service = ETAService()
+    service.plan_route(1, [RouteStop(1, 12.97, 77.59, 0)])
+    service.plan_route(2, [RouteStop(2, 12.97, 77.59, 0)])
+    service.subscribe(2)
+    for route in service.routes.values():
+        route.touched_at -= 3600
+
+    assert service.evict_idle(timedelta(minutes=30)) == 1
+    assert list(service.routes) == [2]
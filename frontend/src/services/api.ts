@@ -9,6 +9,10 @@ const api = axios.create({
   },
 });
 
+// Time of this client's latest write, echoed back so reads right after it
+// are served from the primary database rather than a lagging replica
+let lastWrite: string | null = null;
+
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
@@ -16,6 +20,9 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (lastWrite) {
+      config.headers['X-Last-Write'] = lastWrite;
+    }
     return config;
   },
   (error) => {
@@ -23,12 +30,46 @@ api.interceptors.request.use(
   }
 );
 
-// Response interceptor to handle auth errors
+// Single in-flight refresh shared by concurrent 401s
+let refreshPromise: Promise<string> | null = null;
+
+const refreshAccessToken = async (): Promise<string> => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) {
+    throw new Error('No refresh token');
+  }
+  const response = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken });
+  localStorage.setItem('access_token', response.data.access_token);
+  localStorage.setItem('refresh_token', response.data.refresh_token);
+  return response.data.access_token;
+};
+
+// Response interceptor to refresh expired access tokens and handle auth errors
 api.interceptors.response.use(
-  (response) => response,
-  (error) => {
+  (response) => {
+    if (response.headers['x-last-write']) {
+      lastWrite = response.headers['x-last-write'];
+    }
+    return response;
+  },
+  async (error) => {
+    const originalRequest = error.config;
+    if (error.response?.status === 401 && originalRequest && !originalRequest._retry) {
+      originalRequest._retry = true;
+      try {
+        refreshPromise = refreshPromise || refreshAccessToken();
+        const token = await refreshPromise;
+        originalRequest.headers.Authorization = `Bearer ${token}`;
+        return api(originalRequest);
+      } catch (refreshError) {
+        // Fall through to logout below
+      } finally {
+        refreshPromise = null;
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -50,6 +91,14 @@ export const authAPI = {
     return response.data;
   },
   
+  logout: async (accessToken: string, refreshToken: string | null) => {
+    await axios.post(
+      `${API_BASE_URL}/auth/logout`,
+      refreshToken ? { refresh_token: refreshToken } : undefined,
+      { headers: { Authorization: `Bearer ${accessToken}` } }
+    );
+  },
+  
   getCurrentUser: async () => {
     const response = await api.get('/auth/me');
     return response.data;
@@ -78,6 +127,106 @@ export const usersAPI = {
   },
 };
 
+export const billingAPI = {
+  getAccount: async () => {
+    const response = await api.get('/billing/account');
+    return response.data;
+  },
+
+  getInvoices: async (params?: { start?: string; end?: string; store_id?: number; status?: string }) => {
+    const response = await api.get('/billing/invoices', { params });
+    return response.data;
+  },
+
+  generateInvoices: async (run: { start: string; end: string; rate_per_order?: number }) => {
+    const response = await api.post('/billing/invoices/generate', run);
+    return response.data;
+  },
+
+  markPaid: async (invoiceId: number, payerUpiId?: string) => {
+    const response = await api.post(`/billing/invoices/${invoiceId}/pay`, { payer_upi_id: payerUpiId });
+    return response.data;
+  },
+};
+
+export const schedulingAPI = {
+  getAvailability: async (params: { store_id: number; day: string; driver_id?: number; window_minutes?: number }) => {
+    const response = await api.get('/scheduling/availability', { params });
+    return response.data;
+  },
+
+  bookSlot: async (deliveryId: number, start: string, end: string) => {
+    const response = await api.put(`/scheduling/deliveries/${deliveryId}/slot`, { start, end });
+    return response.data;
+  },
+
+  releaseSlot: async (deliveryId: number) => {
+    await api.delete(`/scheduling/deliveries/${deliveryId}/slot`);
+  },
+
+  setStoreCapacity: async (storeId: number, day: string, capacity: number) => {
+    const response = await api.put(`/scheduling/stores/${storeId}/capacity`, { day, capacity });
+    return response.data;
+  },
+};
+
+export const notificationsAPI = {
+  getNotifications: async (deliveryId: number) => {
+    const response = await api.get(`/deliveries/${deliveryId}/notifications`);
+    return response.data;
+  },
+};
+
+export const proofsAPI = {
+  upload: async (deliveryId: number, photo: Blob, filename = 'proof.jpg') => {
+    const form = new FormData();
+    form.append('file', photo, filename);
+    const response = await api.post(`/deliveries/${deliveryId}/proof`, form);
+    return response.data;
+  },
+
+  getProofs: async (deliveryId: number) => {
+    const response = await api.get(`/deliveries/${deliveryId}/proof`);
+    return response.data;
+  },
+};
+
+export const bootstrapAPI = {
+  load: async () => {
+    const response = await api.get('/bootstrap/');
+    return response.data;
+  },
+};
+
+export const customersAPI = {
+  getCustomers: async (storeId: number) => {
+    const response = await api.get('/customers/', { params: { store_id: storeId } });
+    return response.data;
+  },
+
+  typeahead: async (storeId: number, q: string, limit: number = 8) => {
+    const response = await api.get('/customers/typeahead', { params: { store_id: storeId, q, limit } });
+    return response.data;
+  },
+};
+
+export const syncAPI = {
+  pull: async (since: number) => {
+    const response = await api.get('/sync/', { params: { since } });
+    return response.data;
+  },
+
+  push: async (changes: {
+    client_id: string;
+    delivery_id: number;
+    status: string;
+    base_seq?: number;
+  }[]) => {
+    const response = await api.post('/sync/', { changes });
+    return response.data;
+  },
+};
+
 // aiAPI removed (GPT disabled)
 
 export default api;
@@ -14,7 +14,9 @@ export interface LoginCredentials {
 
 export interface AuthResponse {
   access_token: string;
+  refresh_token: string;
   token_type: string;
+  expires_in: number;
   user: User;
 }
 